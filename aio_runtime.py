@@ -0,0 +1,280 @@
+import asyncio
+import argparse
+import random
+import wire
+import metrics
+from metrics import log
+
+class AsyncPeer:
+    def __init__(self, runtime, address, max_queue=1024, connect_timeout=1.0, retry_delay=0.5):
+        """Conexión persistente hacia un par atendida por una corrutina:
+        - address: (host, puerto) del par
+        - max_queue: Tamaño máximo de la cola de envío"""
+        self.runtime = runtime
+        self.address = address
+        self.connect_timeout = connect_timeout
+        self.retry_delay = retry_delay
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.writer = None
+        self.retry_at = 0.0  # Momento a partir del cual se puede reconectar
+        self.sent = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self.task = runtime.loop.create_task(self.sender_loop())
+
+    def send(self, data):
+        """Encola datos ya serializados; devuelve False si el par no es alcanzable"""
+        if self.writer is None and self.runtime.now() < self.retry_at:
+            self.dropped += 1
+            return False
+        try:
+            self.queue.put_nowait(data)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    async def connect(self):
+        if self.writer is not None:
+            return True
+        try:
+            _, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(*self.address), self.connect_timeout)
+            self.reconnects += 1
+            return True
+        except (OSError, asyncio.TimeoutError):
+            self.retry_at = self.runtime.now() + self.retry_delay
+            return False
+
+    async def sender_loop(self):
+        """Vacía la cola de envío, agrupando lo pendiente en una sola escritura"""
+        while True:
+            chunks = [await self.queue.get()]
+            while not self.queue.empty() and len(chunks) < 64:
+                chunks.append(self.queue.get_nowait())
+
+            # Un reintento tras reconectar si la conexión se había caído
+            for _ in range(2):
+                if not await self.connect():
+                    self.dropped += len(chunks)
+                    break
+                try:
+                    self.writer.write(b''.join(chunks))
+                    await self.writer.drain()
+                    self.sent += len(chunks)
+                    break
+                except OSError:
+                    self.writer.close()
+                    self.writer = None
+            else:
+                self.dropped += len(chunks)
+
+    def close(self):
+        self.task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+
+
+class AsyncTransport:
+    def __init__(self, runtime, address, handler, max_queue=1024, codec=None):
+        """Misma interfaz que transport.Transport, sin hilos:
+        - address: (host, puerto) donde escuchar
+        - handler: Función llamada con cada mensaje recibido (dict)"""
+        self.runtime = runtime
+        self.address = address
+        self.handler = handler
+        self.max_queue = max_queue
+        self.codec = codec
+        self.peers = {}  # {(host, puerto): AsyncPeer}
+        self.server = None
+        self.local_messages = 0  # Mensajes entregados en memoria
+        self.closed = False
+        self.ready = runtime.loop.create_task(self.start())
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.read_loop, *self.address)
+
+    def send(self, address, message):
+        """Envía un mensaje; si el destino vive en el mismo proceso se entrega en memoria"""
+        if self.closed:
+            return False
+        local = self.runtime.transports.get(address) if self.runtime.local_delivery else None
+        if local is not None:
+            self.local_messages += 1
+            self.runtime.loop.call_soon(local.deliver, wire.local_copy(message))
+            return True
+        peer = self.peers.get(address)
+        if peer is None:
+            peer = AsyncPeer(self.runtime, address, self.max_queue)
+            self.peers[address] = peer
+        return peer.send(wire.encode_frame(message, self.codec))
+
+    def deliver(self, message):
+        try:
+            self.handler(message)
+        except Exception as e:
+            log(f"[Transporte {self.address[1]}] Error procesando mensaje: {e}")
+
+    async def read_loop(self, reader, writer):
+        """Lee los mensajes de una conexión entrante"""
+        try:
+            while True:
+                payload = await wire.read_frame_async(reader)
+                if payload is None:
+                    break
+                self.deliver(wire.decode(payload))
+        except ConnectionError:
+            pass
+        except ValueError as e:
+            log(f"[Transporte {self.address[1]}] Conexión descartada: {e}")
+        finally:
+            writer.close()
+
+    def stats(self):
+        peers = list(self.peers.values())
+        return {
+            'sent': sum(p.sent for p in peers) + self.local_messages,
+            'dropped': sum(p.dropped for p in peers),
+            'connections': sum(p.reconnects for p in peers),
+        }
+
+    def close(self):
+        self.closed = True
+        self.runtime.transports.pop(self.address, None)
+        if self.server is not None:
+            self.server.close()
+        for peer in self.peers.values():
+            peer.close()
+
+
+class AsyncioRuntime:
+    """Entorno de ejecución sobre un único bucle de asyncio: todos los nodos
+    creados con él comparten el bucle, sin hilos por nodo ni por conexión.
+    Debe crearse dentro de una corrutina (usa el bucle en ejecución)"""
+    serial = True  # Mensajes y temporizadores se ejecutan de uno en uno
+
+    def __init__(self, seed=None, local_delivery=True):
+        """- seed: Semilla para el generador aleatorio de los nodos
+        - local_delivery: Entregar en memoria los mensajes entre nodos del mismo proceso"""
+        self.loop = asyncio.get_running_loop()
+        self.random = random.Random(seed)
+        self.local_delivery = local_delivery
+        self.transports = {}  # {(host, puerto): AsyncTransport} de este proceso
+
+    def now(self):
+        return self.loop.time()
+
+    def call_later(self, delay, callback, *args):
+        return self.loop.call_later(delay, callback, *args)
+
+    def listen(self, address, handler):
+        transport = AsyncTransport(self, address, handler)
+        self.transports[address] = transport
+        return transport
+
+    async def ready(self):
+        """Espera a que todos los nodos estén escuchando"""
+        await asyncio.gather(*(t.ready for t in list(self.transports.values())))
+
+    async def close(self):
+        """Cierra todos los transportes y espera a que terminen sus corrutinas"""
+        transports = list(self.transports.values())
+        for transport in transports:
+            transport.close()
+        tasks = [peer.task for t in transports for peer in t.peers.values()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def serve_frames(port, on_message, name, raw_vector=False):
+    """Servidor asyncio que llama a on_message con cada mensaje recibido; si
+    devuelve un mensaje, se envía como respuesta por la misma conexión"""
+    async def handle(reader, writer):
+        try:
+            while True:
+                payload = await wire.read_frame_async(reader)
+                if payload is None:
+                    break
+                reply = on_message(wire.decode(payload, raw_vector))
+                if reply is not None:
+                    writer.write(wire.encode_frame(reply))
+                    await writer.drain()  # No acumular respuestas si el cliente no las lee
+        except ConnectionError:
+            pass
+        except ValueError as e:
+            log(f"[{name}] Mensaje inválido: {e}")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, 'localhost', port)
+    log(f"[{name}] Escuchando en puerto {port}...")
+    async with server:
+        await server.serve_forever()
+
+async def serve_vector_clock(server):
+    """Atiende a un VectorClockServer como corrutina en lugar de un hilo por conexión"""
+    await serve_frames(server.port, server.handle_message,
+                       f"Servidor {server.process_id}", raw_vector=True)
+
+async def serve_lamport(port):
+    """Atiende al servidor de Lamport como corrutina"""
+    import lamport_server
+    await serve_frames(port, lamport_server.procesar_mensaje, "Servidor", raw_vector=True)
+
+
+async def run_bully(nodes, base_port, seed):
+    from bully_algorithm import BullyNode
+    runtime = AsyncioRuntime(seed=seed)
+    all_ports = {node_id: base_port + node_id for node_id in range(1, nodes + 1)}
+    cluster = [BullyNode(node_id, port, all_ports, runtime) for node_id, port in all_ports.items()]
+    await runtime.ready()
+    log(f"[Runtime] {len(cluster)} nodos del abusón en un solo bucle de eventos")
+    await asyncio.Event().wait()
+
+async def run_ricart(processes, base_port, seed, engine):
+    from mutual_exclusion import create_process
+    runtime = AsyncioRuntime(seed=seed)
+    ports = [base_port + pid for pid in range(processes)]
+    cluster = [create_process(pid, ports, ports, runtime, engine) for pid in range(processes)]
+    await runtime.ready()
+    log(f"[Runtime] {len(cluster)} procesos de exclusión mutua en un solo bucle de eventos")
+    for process in cluster:
+        process.simulate()
+    await asyncio.Event().wait()
+
+async def run_clocks(vector_port, lamport_port, total_processes):
+    from vector_clock_server import VectorClockServer
+    server = VectorClockServer(vector_port, 0, total_processes)
+    await asyncio.gather(serve_vector_clock(server), serve_lamport(lamport_port))
+
+def main():
+    metrics.configure_from_env()  # PROYECTO2_METRICS_PORT / PROYECTO2_METRICS_FILE
+    parser = argparse.ArgumentParser(description="Ejecuta varios nodos lógicos en un solo proceso con asyncio")
+    sub = parser.add_subparsers(dest='mode', required=True)
+    bully = sub.add_parser('bully', help="Clúster del algoritmo del abusón")
+    bully.add_argument('--nodes', type=int, default=100)
+    bully.add_argument('--base-port', type=int, default=6000)
+    ricart = sub.add_parser('ricart', help="Procesos de exclusión mutua (Ricart-Agrawala por defecto)")
+    ricart.add_argument('--processes', type=int, default=10)
+    ricart.add_argument('--base-port', type=int, default=7000)
+    ricart.add_argument('--engine', default=None, help="Motor de exclusión mutua (ver mutual_exclusion.ENGINES)")
+    clocks = sub.add_parser('clocks', help="Servidores de reloj vectorial y de Lamport")
+    clocks.add_argument('--vector-port', type=int, default=9099)
+    clocks.add_argument('--lamport-port', type=int, default=9100)
+    clocks.add_argument('--total-processes', type=int, default=2)
+    for p in (bully, ricart):
+        p.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.mode == 'bully':
+        coroutine = run_bully(args.nodes, args.base_port, args.seed)
+    elif args.mode == 'ricart':
+        coroutine = run_ricart(args.processes, args.base_port, args.seed, args.engine)
+    else:
+        coroutine = run_clocks(args.vector_port, args.lamport_port, args.total_processes)
+    try:
+        asyncio.run(coroutine)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+"""Benchmarks del proyecto. Se ejecutan desde la raíz del repositorio:
+    python -m benchmarks.bench_transport"""
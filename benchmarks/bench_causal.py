@@ -0,0 +1,131 @@
+"""Entrega causal con mucho desorden: los mensajes de una ejecución causal
+llegan a un receptor barajados o al revés, de modo que miles quedan en el
+búfer. Compara CausalOrder (búfer indexado por emisor/secuencia y por
+dependencia) con un búfer ingenuo que vuelve a recorrerse entero tras cada
+entrega. Reporta mensajes/s, revisiones por mensaje y memoria por pendiente.
+    python -m benchmarks.bench_causal --processes 8 --messages 2000 10000 50000"""
+import argparse
+import random
+import time
+import tracemalloc
+import numpy as np
+
+import wire
+from causal_broadcast import CausalOrder
+from vector_clock import as_counters
+from benchmarks.util import print_table
+
+def causal_execution(processes, messages, rng):
+    """Genera difusiones con dependencias reales: cada emisor entrega, en el
+    orden de generación, una parte al azar de lo que le falta antes de difundir"""
+    nodes = [CausalOrder(pid, processes) for pid in range(processes)]
+    cursors = [0] * processes
+    history = []
+    for i in range(messages):
+        pid = rng.randrange(processes)
+        node = nodes[pid]
+        target = rng.randint(cursors[pid], len(history))
+        for message in history[cursors[pid]:target]:
+            if message['sender_id'] != pid:
+                node.receive(message)
+        cursors[pid] = target
+        history.append(node.broadcast(f"m{i}"))
+    # Como en el cable: el vector viaja como bytes
+    return [wire.decode(wire.encode(m, 'binary'), raw_vector=True) for m in history]
+
+class NaiveOrder:
+    """Búfer en una lista: tras cada llegada se recorre completo hasta que
+    ninguna pasada entregue nada"""
+    def __init__(self, process_id, total_processes):
+        self.delivered = np.zeros(total_processes, dtype=np.uint64)
+        self.pending = []
+        self.rechecks = 0
+
+    def receive(self, message):
+        self.pending.append((as_counters(message['vector']), message))
+        delivered = []
+        progress = True
+        while progress:
+            progress = False
+            i = 0
+            while i < len(self.pending):
+                self.rechecks += 1
+                vector, message = self.pending[i]
+                sender = message['sender_id']
+                behind = vector > self.delivered
+                behind[sender] = False
+                if message['clock'] == self.delivered[sender] + 1 and not behind.any():
+                    del self.pending[i]
+                    self.delivered[sender] = message['clock']
+                    delivered.append(message)
+                    progress = True
+                else:
+                    i += 1
+        return delivered
+
+def deliver_all(make, processes, arrivals):
+    """Entrega todos los mensajes; devuelve (segundos, revisiones, máximo pendiente, orden)"""
+    receiver = make(processes, processes)  # Un proceso que no difunde
+    order = []
+    peak = 0
+    start = time.perf_counter()
+    for message in arrivals:
+        order.extend(receiver.receive(message))
+        peak = max(peak, len(receiver.pending))
+    elapsed = time.perf_counter() - start
+    return elapsed, receiver.rechecks, peak, order
+
+def check_causal(order, processes):
+    """Verifica que cada mensaje se entregó después de todo lo que su emisor había visto"""
+    seen = np.zeros(processes + 1, dtype=np.uint64)
+    for message in order:
+        vector = as_counters(message['vector'])
+        sender = message['sender_id']
+        assert vector[sender] == seen[sender] + 1
+        assert (np.delete(vector, sender) <= np.delete(seen[:processes], sender)).all()
+        seen[sender] += 1
+
+def buffer_memory(arrivals, processes):
+    """Bytes por mensaje pendiente cuando todos quedan en el búfer"""
+    receiver = CausalOrder(processes, processes)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for message in arrivals[:-1]:  # Al revés y sin el primer mensaje generado: casi todo queda pendiente
+        receiver.receive(message)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / max(1, len(receiver.pending))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--messages', type=int, nargs='+', default=[2000, 10000, 50000])
+    parser.add_argument('--naive-max', type=int, default=2000,
+                        help="Tamaño máximo para el búfer ingenuo (es cuadrático)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    for messages in args.messages:
+        rng = random.Random(args.seed)
+        history = causal_execution(args.processes, messages, rng)
+        shuffled = history[:]
+        rng.shuffle(shuffled)
+        for arrival, arrivals in (("barajado", shuffled), ("al revés", history[::-1])):
+            buffers = [("indexado", CausalOrder)]
+            if messages <= args.naive_max:
+                buffers.append(("ingenuo", NaiveOrder))
+            for name, make in buffers:
+                elapsed, rechecks, peak, order = deliver_all(make, args.processes, arrivals)
+                assert len(order) == messages
+                check_causal(order, args.processes)
+                rows.append([messages, arrival, name, peak, f"{messages / elapsed:,.0f}",
+                             f"{rechecks / messages:.1f}"])
+        rows.append([messages, "al revés", "memoria", "", "",
+                     f"{buffer_memory(history[::-1], args.processes):,.0f} B/pendiente"])
+
+    print_table(f"Difusión causal: {args.processes} procesos",
+                ["mensajes", "llegada", "búfer", "máx. pendientes", "mensajes/s", "revisiones/msg"], rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Prueba de carga de los relojes compartidos por varios hilos: cuenta las
+actualizaciones perdidas y mide actualizaciones/s de 1 a 32 hilos, comparando
+LamportClock y StripedVectorClock con las versiones sin sincronizar y con un
+único lock global.
+    python -m benchmarks.bench_clock_store --updates 20000 --size 65536"""
+import argparse
+import threading
+import time
+import numpy as np
+
+from clock_store import LamportClock, StripedVectorClock
+from benchmarks.util import print_table
+
+class UnsafeLamport:
+    """La regla original: leer, calcular y escribir sin lock"""
+    def __init__(self):
+        self.value = 0
+
+    def update(self, remote):
+        self.value = max(self.value, remote) + 1
+
+class GlobalLockVector(StripedVectorClock):
+    """Un solo lock para todo el vector"""
+    def __init__(self, size, process_id):
+        super().__init__(size, process_id, stripes=1)
+
+class UnsafeVector(StripedVectorClock):
+    """Sin locks: incremento y fusión sin sincronizar"""
+    def __init__(self, size, process_id):
+        super().__init__(size, process_id, stripes=1)
+
+    def merge(self, received_vector):
+        counters = self.clock.counters
+        counters[self.process_id] += 1
+        np.maximum(counters, received_vector, out=counters)
+
+def run(threads, work):
+    """Ejecuta work(t) en threads hilos a la vez; devuelve los segundos transcurridos"""
+    barrier = threading.Barrier(threads + 1)
+    def worker(t):
+        barrier.wait()
+        work(t)
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start
+
+def stress_lamport(make, threads, updates):
+    clock = make()
+    elapsed = run(threads, lambda t: [clock.update(0) for _ in range(updates)])
+    # Con relojes remotos en 0 cada actualización suma exactamente 1
+    return threads * updates - clock.value, threads * updates / elapsed
+
+def stress_vector(make, threads, updates, size):
+    clock = make(size, 0)
+    def work(t):
+        received = np.zeros(size, dtype=np.uint64)
+        slot = 1 + t  # Cada hilo avanza su propia posición del vector recibido
+        for k in range(1, updates + 1):
+            received[slot] = k
+            clock.merge(received)
+    elapsed = run(threads, work)
+    counters = clock.clock.counters
+    lost_ticks = threads * updates - int(counters[0])
+    lost_merges = sum(updates - int(counters[1 + t]) for t in range(threads))
+    return lost_ticks + lost_merges, threads * updates / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--updates', type=int, default=20000, help="Actualizaciones de Lamport por hilo")
+    parser.add_argument('--merges', type=int, default=500, help="Fusiones vectoriales por hilo")
+    parser.add_argument('--size', type=int, default=65536, help="Tamaño del vector")
+    args = parser.parse_args()
+
+    rows = []
+    stripes = len(StripedVectorClock(args.size, 0).locks)
+    for threads in args.threads:
+        for name, make in (("lamport sin lock", UnsafeLamport), ("LamportClock", LamportClock)):
+            lost, rate = stress_lamport(make, threads, args.updates)
+            rows.append([threads, name, lost, f"{rate:,.0f}"])
+        for name, make in (("vector sin lock", UnsafeVector), ("vector lock global", GlobalLockVector),
+                           ("StripedVectorClock", StripedVectorClock)):
+            lost, rate = stress_vector(make, threads, args.merges, args.size)
+            rows.append([threads, name, lost, f"{rate:,.0f}"])
+
+    print_table(f"Relojes compartidos (vector de {args.size} posiciones, {stripes} franjas)",
+                ["hilos", "reloj", "perdidas", "actualizaciones/s"], rows)
+    if any(row[2] for row in rows if "sin lock" not in row[1]):
+        raise SystemExit("Se perdieron actualizaciones en un reloj sincronizado")
+
+if __name__ == '__main__':
+    main()
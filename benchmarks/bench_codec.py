@@ -0,0 +1,58 @@
+"""Compara json.dumps/json.loads (formato original) con el códec binario
+y el modo JSON de depuración de wire.py, para los mensajes del proyecto.
+    python -m benchmarks.bench_codec --rounds 20000"""
+import argparse
+import json
+import time
+
+import wire
+from benchmarks.util import print_table
+
+def throughput(function, argument, rounds):
+    """Operaciones por segundo de function(argument)"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        function(argument)
+    return rounds / (time.perf_counter() - start)
+
+def scenarios():
+    """(nombre, mensaje original, mensaje del protocolo)"""
+    yield ("ricart-agrawala",
+           {'type': 'request', 'pid': 2, 'clock': 1234},
+           wire.new_message('request', 2, 1234))
+    yield ("abusón",
+           {'type': 'election', 'sender_id': 3, 'sender_port': 5003},
+           wire.new_message('election', 3))
+    for size in (2, 100, 1000):
+        vector = list(range(1000, 1000 + size))
+        yield (f"vector N={size}", vector, wire.new_message('vector', 0, vector=vector))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=20000)
+    args = parser.parse_args()
+
+    rows = []
+    for name, original, message in scenarios():
+        rounds = max(200, args.rounds // max(1, len(message['vector']) // 10))
+        legacy = json.dumps(original).encode()
+        binary = wire.encode(message, 'binary')
+        debug = wire.encode(message, 'json')
+        assert wire.decode(binary) == wire.decode(debug)
+
+        for mode, size, enc, dec in (
+            ("json original", len(legacy), lambda m: json.dumps(m).encode(), json.loads),
+            ("binario", len(binary), lambda m: wire.encode(m, 'binary'), wire.decode),
+            ("json depuración", len(debug), lambda m: wire.encode(m, 'json'), wire.decode),
+        ):
+            sample = original if mode == "json original" else message
+            payload = enc(sample)
+            rows.append([name, mode, size,
+                         f"{throughput(enc, sample, rounds):,.0f}",
+                         f"{throughput(dec, payload, rounds):,.0f}"])
+
+    print_table("Serialización de mensajes",
+                ["mensaje", "códec", "bytes", "encode/s", "decode/s"], rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Tormentas de elecciones del algoritmo del abusón: tras la caída del líder,
+todos los seguidores sospechan casi a la vez. Compara la elección clásica
+(cada nodo mayor que recibe ELECTION inicia la suya) con la elección por
+sondeo descendente y términos (BullyNode(probing=True)), en el simulador:
+mensajes por recuperación (sin latidos), anuncios VICTORY, elecciones
+iniciadas y tiempo hasta que todos los nodos activos conocen al nuevo líder.
+También mide una falsa sospecha (el seguidor más bajo cree caído al líder,
+que sigue vivo): ahí cualquier cambio de líder es espurio.
+    python -m benchmarks.bench_election --sizes 10 50 200 --seeds 1 2 3"""
+import argparse
+
+import metrics
+from bully_algorithm import BullyNode
+from simulator import SimRuntime
+from benchmarks.util import print_table
+
+def counter(name):
+    return metrics.REGISTRY.counter(name).value
+
+def failover(size, probing, seed, heartbeat_interval=0.1, settle=2.0, quiet=2.0, false_suspicion=False):
+    """Hace caer al líder de un clúster estable (o, con false_suspicion, hace
+    que el seguidor más bajo sospeche de él sin que caiga); devuelve las
+    métricas de la recuperación"""
+    metrics.REGISTRY.reset()
+    runtime = SimRuntime(seed)
+    all_ports = {node_id: 5000 + node_id for node_id in range(1, size + 1)}
+    cluster = [BullyNode(node_id, port, all_ports, runtime, heartbeat_interval, probing=probing)
+               for node_id, port in all_ports.items()]
+    for node in cluster:
+        node.failure_probability = 0
+    runtime.run(settle)  # Historial de latidos para el detector
+
+    messages_before = sum(count for kind, count in runtime.messages.items() if kind != 'heartbeat')
+    victories_before = counter('elections_won')
+    started_before = counter('elections_started')
+    changes_before = counter('leader_changes')
+    crashed_at = runtime.now()
+    if false_suspicion:
+        suspicious = cluster[0]
+        suspicious.start_election(skip=suspicious.leader_id)
+        alive = cluster
+    else:
+        cluster[-1].active = False
+        alive = cluster[:-1]
+    expected = alive[-1].node_id
+    recovered = runtime.run_until(lambda: all(n.leader_id == expected for n in alive), timeout=60)
+    elapsed = runtime.now() - crashed_at
+    runtime.run(quiet)  # Elecciones rezagadas
+
+    victories = counter('elections_won') - victories_before
+    return {
+        'recovered': recovered and all(n.leader_id == expected for n in alive),
+        'seconds': elapsed,
+        'messages': sum(count for kind, count in runtime.messages.items() if kind != 'heartbeat') - messages_before,
+        'victories': victories,
+        'duplicates': max(0, victories - 1),
+        'started': counter('elections_started') - started_before,
+        # Cambios de líder de más: con una caída real basta uno
+        'spurious': counter('leader_changes') - changes_before - (0 if false_suspicion else 1),
+        'suppressed': counter('elections_suppressed'),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2, 3])
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    for false_suspicion in (False, True):
+        rows = []
+        for size in args.sizes:
+            for probing in (False, True):
+                runs = [failover(size, probing, seed, false_suspicion=false_suspicion) for seed in args.seeds]
+                mean = lambda key: sum(run[key] for run in runs) / len(runs)
+                rows.append([size, "sondeo" if probing else "clásica",
+                             f"{sum(run['recovered'] for run in runs)}/{len(runs)}",
+                             f"{mean('seconds') * 1000:.0f}", f"{mean('messages'):,.0f}",
+                             f"{mean('messages') / size:.1f}", f"{mean('victories'):.1f}",
+                             f"{mean('duplicates'):.1f}", f"{mean('spurious'):.1f}",
+                             f"{mean('started'):.1f}", f"{mean('suppressed'):.1f}"])
+        title = ("Falsa sospecha del seguidor más bajo (el líder sigue vivo)" if false_suspicion
+                 else "Recuperación tras la caída del líder")
+        print_table(f"{title} (medias por semilla)",
+                    ["N", "elección", "recuperado", "tiempo ms", "mensajes", "mensajes/N",
+                     "VICTORY", "duplicados", "cambios espurios", "elecciones", "suprimidas"], rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Registro de eventos causales (event_log): velocidad de escritura y
+latencia de las consultas sobre un registro grande.
+
+La traza es sintética pero causalmente válida: P procesos donde el evento i
+del proceso p conoce hasta el evento i - d[p][q] de cada q, con d una
+métrica de distancias aleatorias (caminos mínimos), así que cada vector es
+consistente con los demás. Las consultas se comparan con un barrido del
+registro completo (lo que haría falta sin el índice).
+    python -m benchmarks.bench_event_log --processes 8 --events 4000000 --queries 2000"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import metrics
+from event_log import CausalIndex, EventLog, RECEIVE
+from vector_clock_server import VectorClockServer
+from benchmarks.util import percentile, print_table
+
+def distances(processes, max_lag, rng):
+    """Retrasos d[p][q] >= 1 que cumplen la desigualdad triangular"""
+    d = rng.integers(1, max_lag + 1, size=(processes, processes)).astype(np.int64)
+    np.fill_diagonal(d, 0)
+    for k in range(processes):  # Floyd-Warshall
+        d = np.minimum(d, d[:, k:k + 1] + d[k:k + 1, :])
+    return d
+
+def trace_chunk(process, first, count, lags):
+    """Vectores de los eventos first..first+count-1 (contados desde 1) de process"""
+    own = np.arange(first, first + count, dtype=np.int64)
+    return np.maximum(own[:, None] - lags[process][None, :], 0).astype(np.uint64)
+
+def anonymous_mb():
+    """Memoria propia del proceso (Linux), sin contar las páginas de los
+    archivos proyectados, que son caché del sistema; None si no se puede leer"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('RssAnon:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def ingest_single(directory, width, events, lags):
+    """Un evento por llamada, como lo escriben los servidores"""
+    log = EventLog(directory, 0, width)
+    vectors = trace_chunk(0, 1, events, lags)
+    start = time.perf_counter()
+    for vector in vectors:
+        log.append(RECEIVE, vector)
+    log.close()
+    return events / (time.perf_counter() - start)
+
+def ingest_batched(directory, width, events, lags, chunk=65536):
+    """Lotes de chunk eventos por proceso, turnándose entre procesos"""
+    logs = [EventLog(directory, process, width) for process in range(width)]
+    per_process = events // width
+    start = time.perf_counter()
+    for first in range(1, per_process + 1, chunk):
+        count = min(chunk, per_process - first + 1)
+        for process, log in enumerate(logs):
+            log.append_many(RECEIVE, trace_chunk(process, first, count, lags))
+    for log in logs:
+        log.close()
+    return per_process * width / (time.perf_counter() - start), per_process
+
+def ingest_server(directory, width, events, with_log):
+    """Fusiones de VectorClockServer con y sin registro"""
+    event_log = EventLog(directory, 0, width) if with_log else None
+    server = VectorClockServer(0, 0, width, event_log=event_log)
+    server.server_socket.close()
+    vectors = [np.arange(width, dtype=np.uint64) * (i + 1) for i in range(64)]
+    start = time.perf_counter()
+    for i in range(events):
+        server.update_vector_clock(vectors[i % 64])
+    elapsed = time.perf_counter() - start
+    if event_log is not None:
+        event_log.close()
+    return events / elapsed
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def scan_concurrent(index, event):
+    """Sin índice: compara el vector de event con todos los del registro"""
+    vector = index.vector(event)
+    count = 0
+    for process in index.processes():
+        vectors = index.records(process)['vector']
+        before = np.all(vectors <= vector, axis=1)
+        after = vectors[:, event[0]] >= event[1]
+        count += int(np.count_nonzero(~before & ~after))
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=8, help="Procesos (ancho del vector)")
+    parser.add_argument('--events', type=int, default=4_000_000, help="Eventos del registro grande")
+    parser.add_argument('--single-events', type=int, default=200_000, help="Eventos agregados de a uno")
+    parser.add_argument('--max-lag', type=int, default=50, help="Retraso máximo entre dos procesos")
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--scans', type=int, default=3, help="Consultas por barrido completo")
+    parser.add_argument('--directory', help="Directorio de trabajo (por defecto, uno temporal)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    rng = np.random.default_rng(args.seed)
+    lags = distances(args.processes, args.max_lag, rng)
+    root = args.directory or tempfile.mkdtemp(prefix='event_log_')
+    os.makedirs(root, exist_ok=True)
+    try:
+        single = ingest_single(os.path.join(root, 'single'), args.processes, args.single_events, lags)
+        server_plain = ingest_server(os.path.join(root, 'server'), args.processes, args.single_events, False)
+        server_logged = ingest_server(os.path.join(root, 'server'), args.processes, args.single_events, True)
+        big = os.path.join(root, 'big')
+        batched, per_process = ingest_batched(big, args.processes, args.events, lags)
+        size = per_process * args.processes * (16 + 8 * args.processes)
+        print_table(f"Escritura ({args.processes} procesos, registros de {16 + 8 * args.processes} bytes)",
+                    ["modo", "eventos/s"],
+                    [["append (de a uno)", f"{single:,.0f}"],
+                     ["append_many (lotes)", f"{batched:,.0f}"],
+                     ["VectorClockServer sin registro", f"{server_plain:,.0f}"],
+                     ["VectorClockServer con registro", f"{server_logged:,.0f}"]])
+
+        memory_before = anonymous_mb()
+        open_seconds, index = timed(CausalIndex, big)
+        picker = random.Random(args.seed)
+        def pick():
+            return picker.randrange(args.processes), picker.randint(1, per_process)
+
+        latencies = {'happened_before': [], 'history': [], 'concurrent': []}
+        concurrent_sizes = []
+        for _ in range(args.queries):
+            a, b = pick(), pick()
+            latencies['happened_before'].append(timed(index.happened_before, a, b)[0])
+            latencies['history'].append(timed(index.history, a)[0])
+            elapsed, ranges = timed(index.concurrent, a)
+            latencies['concurrent'].append(elapsed)
+            concurrent_sizes.append(sum(stop - start for start, stop in ranges.values()))
+        memory_after = anonymous_mb()
+
+        scans = []
+        for _ in range(args.scans):
+            event = pick()
+            elapsed, count = timed(scan_concurrent, index, event)
+            expected = sum(stop - start for start, stop in index.concurrent(event).values())
+            assert count == expected, f"Índice {expected} != barrido {count}"
+            scans.append(elapsed)
+        index.close()
+
+        rows = [[name, f"{percentile(values, 50) * 1e6:,.1f}", f"{percentile(values, 99) * 1e6:,.1f}"]
+                for name, values in latencies.items()]
+        rows.append(["concurrent (barrido)", f"{percentile(scans, 50) * 1e6:,.0f}", f"{max(scans) * 1e6:,.0f}"])
+        memory = (f", memoria propia {memory_before:,.0f} -> {memory_after:,.0f} MB"
+                  if memory_before is not None and memory_after is not None else "")
+        print_table(f"Consultas sobre {per_process * args.processes:,} eventos ({size / 2 ** 20:,.0f} MB de registros, "
+                    f"abierto en {open_seconds * 1000:.1f} ms{memory}; "
+                    f"{np.mean(concurrent_sizes):,.0f} concurrentes por evento en promedio)",
+                    ["consulta", "p50 µs", "p99 µs"], rows)
+    finally:
+        if not args.directory:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Tiempo de recuperación ante la caída del líder en el algoritmo del
+abusón: desde el último latido del líder hasta que todos los nodos activos
+conocen al nuevo líder. Compara la elección por eventos con tiempo de
+espera adaptativo contra la espera fija de 2 s original.
+    python -m benchmarks.bench_failover --sizes 5 20 100 --trials 3"""
+import argparse
+import asyncio
+
+import metrics
+from aio_runtime import AsyncioRuntime
+from bully_algorithm import BullyNode
+from benchmarks.util import percentile, print_table
+
+class FixedWaitNode(BullyNode):
+    """Elección original: envía ELECTION y decide tras una espera fija de 2 s"""
+
+    def start_election(self):
+        if not self.active or self.election_in_progress:
+            return
+        self.election_in_progress = True
+        self.ok_received = False
+        self.election_round += 1
+        higher_nodes = [n_id for n_id in self.membership if n_id > self.node_id]
+        for n_id in higher_nodes:
+            self.send_message(n_id, 'election', self.election_round)
+        self.runtime.call_later(2, self.decide, higher_nodes)
+
+    def decide(self, higher_nodes):
+        if not higher_nodes or not self.ok_received:
+            self.declare_victory()
+        else:
+            self.election_in_progress = False
+
+    def handle_answer(self, message):
+        self.ok_received = True
+
+async def failover(cls, size, base_port, heartbeat_interval, seed):
+    runtime = AsyncioRuntime(seed=seed)
+    all_ports = {node_id: base_port + node_id for node_id in range(1, size + 1)}
+    cluster = {node_id: cls(node_id, port, all_ports, runtime, heartbeat_interval)
+               for node_id, port in all_ports.items()}
+    for node in cluster.values():
+        node.failure_probability = 0
+    await runtime.ready()
+    await asyncio.sleep(heartbeat_interval * 5)  # Historial de latidos
+
+    # El líder cae justo después de enviar un latido
+    leader = cluster[size]
+    killed = asyncio.Event()
+    original = leader.send_heartbeats
+
+    def send_and_fail():
+        original()
+        if not killed.is_set():
+            leader.active = False
+            killed.set()
+    leader.send_heartbeats = send_and_fail
+    await killed.wait()
+    last_heartbeat = runtime.now()
+    sent_before = sum(n.transport.stats()['sent'] for n in cluster.values())
+
+    alive = [n for n in cluster.values() if n.active]
+    expected = max(n.node_id for n in alive)
+    while not all(n.leader_id == expected for n in alive):
+        await asyncio.sleep(0.001)
+    elapsed = runtime.now() - last_heartbeat
+    messages = sum(n.transport.stats()['sent'] for n in cluster.values()) - sent_before
+    await runtime.close()
+    return elapsed, messages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 20, 100])
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--heartbeat-interval', type=float, default=0.1)
+    parser.add_argument('--port', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    rows = []
+    port = args.port
+    for size in args.sizes:
+        for cls, mode in ((BullyNode, "por eventos"), (FixedWaitNode, "espera fija 2 s")):
+            times, messages = [], []
+            for trial in range(args.trials):
+                elapsed, sent = asyncio.run(failover(cls, size, port, args.heartbeat_interval,
+                                                     args.seed + trial))
+                port += size + 1
+                times.append(elapsed)
+                messages.append(sent)
+            rows.append([size, mode, f"{percentile(times, 50):.3f}", f"{max(times):.3f}",
+                         f"{sum(messages) / len(messages):,.0f}"])
+
+    print_table(f"Recuperación ante caída del líder (latido cada {args.heartbeat_interval} s)",
+                ["N", "elección", "p50 s", "máx s", "mensajes"], rows)
+
+if __name__ == '__main__':
+    main()
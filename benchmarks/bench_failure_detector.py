@@ -0,0 +1,109 @@
+"""Tiempo de detección y tasa de falsos positivos de los detectores de
+failure_detector.py sobre trazas de latidos sintéticas (reproducibles con
+--seed): intervalo fijo con variación aleatoria y pausas ocasionales largas
+(accept lento, recolector de basura). Se compara con la verificación
+original de BullyNode: un ping cada 5-10 s con 1 s de espera al conectar.
+    python -m benchmarks.bench_failure_detector --hours 2"""
+import argparse
+import random
+
+from failure_detector import TimeoutDetector, PhiAccrualDetector
+from benchmarks.util import percentile, print_table
+
+def trace(rng, interval, seconds, pause_probability, max_pause):
+    """Instantes de llegada de los latidos de un par vivo"""
+    arrivals = []
+    t = 0.0
+    while t < seconds:
+        delay = max(0.0, rng.gauss(interval, interval * 0.05))
+        if rng.random() < pause_probability:
+            delay += rng.uniform(0.2, max_pause)
+        t += delay
+        arrivals.append(t)
+    return arrivals
+
+def false_positives(detector, arrivals, check_interval):
+    """Episodios de sospecha sobre un par que nunca falla"""
+    detector.watch('p', 0.0)
+    episodes, suspected, now, index = 0, False, 0.0, 0
+    while index < len(arrivals):
+        now += check_interval
+        while index < len(arrivals) and arrivals[index] <= now:
+            detector.heartbeat('p', arrivals[index])
+            index += 1
+        if detector.suspects('p', now):
+            if not suspected:
+                episodes += 1
+            suspected = True
+        else:
+            suspected = False
+    return episodes
+
+def detection_times(make_detector, rng, interval, crashes, check_interval, pause_probability, max_pause):
+    """Tiempo entre el último latido y la sospecha, para varias caídas"""
+    times = []
+    for _ in range(crashes):
+        detector = make_detector()
+        arrivals = trace(rng, interval, rng.uniform(30, 120), pause_probability, max_pause)
+        detector.watch('p', 0.0)
+        for t in arrivals:
+            detector.heartbeat('p', t)
+        now = arrivals[-1] + rng.uniform(0, check_interval)  # Fase de la verificación
+        while not detector.suspects('p', now):
+            now += check_interval
+        times.append(now - arrivals[-1])
+    return times
+
+def legacy_ping(rng, arrivals, crashes, pause_probability, max_pause):
+    """Ping original: verificación cada 5-10 s; falla si el par tarda más de 1 s"""
+    episodes, t = 0, 0.0
+    end = arrivals[-1]
+    while t < end:
+        t += rng.randint(5, 10)
+        if rng.random() < pause_probability and rng.uniform(0.2, max_pause) > 1.0:
+            episodes += 1
+    times = []
+    for _ in range(crashes):
+        times.append(rng.uniform(0, rng.randint(5, 10)) + 1.0)  # Hasta la próxima verificación + timeout
+    return episodes, times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--interval', type=float, default=1.0, help="Intervalo entre latidos (s)")
+    parser.add_argument('--hours', type=float, default=2.0, help="Duración de la traza sin fallas")
+    parser.add_argument('--crashes', type=int, default=200)
+    parser.add_argument('--pause-probability', type=float, default=0.01)
+    parser.add_argument('--max-pause', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    check = args.interval / 2
+    arrivals = trace(rng, args.interval, args.hours * 3600, args.pause_probability, args.max_pause)
+    configs = [
+        ("timeout 2x", lambda: TimeoutDetector(2 * args.interval)),
+        ("timeout 3x", lambda: TimeoutDetector(3 * args.interval)),
+        ("phi 4", lambda: PhiAccrualDetector(4, expected_interval=args.interval)),
+        ("phi 8", lambda: PhiAccrualDetector(8, expected_interval=args.interval)),
+        ("phi 12", lambda: PhiAccrualDetector(12, expected_interval=args.interval)),
+        ("phi 8 + pausa 1x", lambda: PhiAccrualDetector(8, expected_interval=args.interval,
+                                                         acceptable_pause=args.interval)),
+    ]
+
+    rows = []
+    for name, make_detector in configs:
+        fp = false_positives(make_detector(), arrivals, check)
+        times = detection_times(make_detector, rng, args.interval, args.crashes, check,
+                                args.pause_probability, args.max_pause)
+        rows.append([name, f"{fp / args.hours:.2f}", f"{percentile(times, 50):.2f}", f"{percentile(times, 99):.2f}"])
+
+    fp, times = legacy_ping(rng, arrivals, args.crashes, args.pause_probability, args.max_pause)
+    rows.append(["ping 5-10 s (original)", f"{fp / args.hours:.2f}",
+                 f"{percentile(times, 50):.2f}", f"{percentile(times, 99):.2f}"])
+
+    print_table(f"Detectores de fallas: latido cada {args.interval} s, "
+                f"pausas {args.pause_probability:.0%} hasta {args.max_pause} s",
+                ["detector", "falsos positivos/h", "detección p50 s", "detección p99 s"], rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Concesiones del líder del abusón: ¿cuánto le cuesta al líder que los
+seguidores pregunten quién es? Compara preguntarle al líder en cada
+búsqueda (ping y latido de respuesta, como hacía check_leader antes de los
+latidos) con current_leader_async(), que responde con la concesión que
+renuevan los latidos. Mide mensajes por segundo que recibe y envía el líder,
+latencia de la búsqueda según el número de seguidores (asyncio y TCP) y,
+en el simulador, cuánto tiempo siguen los seguidores dando por bueno a un
+líder caído y cuánto tardan en tener una respuesta nueva.
+    python -m benchmarks.bench_lease --followers 4 16 64 --rate 20 --seconds 2"""
+import argparse
+import asyncio
+import time
+
+import metrics
+from aio_runtime import AsyncioRuntime
+from bully_algorithm import LEASE_HEARTBEATS, BullyNode
+from simulator import SimRuntime
+from benchmarks.util import percentile, print_table
+
+class CountingNode(BullyNode):
+    """Nodo que cuenta sus mensajes y resuelve búsquedas por ping"""
+
+    def __init__(self, *args, **kwargs):
+        self.inbound = self.outbound = 0
+        self.pings = {}  # {número de ping: futuro de la búsqueda}
+        self.ping_count = 0
+        super().__init__(*args, **kwargs)
+
+    def handle_message(self, message):
+        self.inbound += 1
+        super().handle_message(message)
+
+    def send_message(self, dest_id, msg_type, clock=0, data=''):
+        self.outbound += 1
+        return super().send_message(dest_id, msg_type, clock, data)
+
+    def handle_heartbeat(self, message):
+        super().handle_heartbeat(message)
+        reply = self.pings.pop(message['clock'], None)
+        if reply is not None and not reply.done():
+            reply.set_result(message['sender_id'])
+
+    async def ping_leader(self):
+        """Búsqueda preguntándole al líder: un ping y su latido de respuesta"""
+        self.ping_count += 1
+        reply = asyncio.get_running_loop().create_future()
+        self.pings[self.ping_count] = reply
+        self.send_message(self.leader_id, 'ping', self.ping_count)
+        try:
+            return await asyncio.wait_for(reply, 1.0)
+        except asyncio.TimeoutError:
+            self.pings.pop(self.ping_count, None)
+            return None
+
+async def lookups(node, mode, rate, deadline, latencies, misses):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if mode == 'ping':
+            leader = await node.ping_leader()
+        else:
+            leader = await node.current_leader_async(timeout=1.0)
+        latencies.append(time.perf_counter() - start)
+        if leader is None:
+            misses[0] += 1
+        await asyncio.sleep(1 / rate)
+
+async def scenario(followers, mode, rate, seconds, heartbeat_interval, base_port, seed, in_memory):
+    metrics.REGISTRY.reset()
+    runtime = AsyncioRuntime(seed=seed, local_delivery=in_memory)
+    all_ports = {node_id: base_port + node_id for node_id in range(1, followers + 2)}
+    cluster = [CountingNode(node_id, port, all_ports, runtime, heartbeat_interval)
+               for node_id, port in all_ports.items()]
+    for node in cluster:
+        node.failure_probability = 0
+    await runtime.ready()
+    await asyncio.sleep(heartbeat_interval * 1.5)  # Primer latido: primeras concesiones
+
+    leader = cluster[-1]
+    inbound, outbound = leader.inbound, leader.outbound
+    latencies, misses = [], [0]
+    start = time.perf_counter()
+    await asyncio.gather(*(lookups(node, mode, rate, start + seconds, latencies, misses)
+                           for node in cluster[:-1]))
+    elapsed = time.perf_counter() - start
+    inbound, outbound = leader.inbound - inbound, leader.outbound - outbound
+    await runtime.close()
+    return [followers, "ping" if mode == 'ping' else "concesión",
+            f"{len(latencies) / elapsed:,.0f}", f"{inbound / elapsed:,.1f}", f"{outbound / elapsed:,.1f}",
+            f"{percentile(latencies, 50) * 1e6:,.1f}", f"{percentile(latencies, 99) * 1e6:,.1f}",
+            misses[0]]
+
+def crash(followers, heartbeat_interval, seed, step=0.01, limit=30.0):
+    """En el simulador: cae el líder y se consulta current_leader() cada step
+    segundos. Devuelve, por seguidor, cuánto siguió respondiendo con el líder
+    caído y cuándo volvió a tener respuesta (el nuevo líder)"""
+    metrics.REGISTRY.reset()
+    runtime = SimRuntime(seed)
+    all_ports = {node_id: 5000 + node_id for node_id in range(1, followers + 2)}
+    cluster = [BullyNode(node_id, port, all_ports, runtime, heartbeat_interval)
+               for node_id, port in all_ports.items()]
+    for node in cluster:
+        node.failure_probability = 0
+    runtime.run(2.0)
+
+    dead = cluster[-1]
+    dead.active = False
+    crashed_at = runtime.now()
+    stale, answered = {}, {}
+    alive = cluster[:-1]
+    while len(answered) < len(alive) and runtime.now() - crashed_at < limit:
+        runtime.run(step)
+        elapsed = runtime.now() - crashed_at
+        for node in alive:
+            leader = node.current_leader()
+            if leader == dead.node_id:
+                stale[node.node_id] = elapsed
+            elif leader is not None and node.node_id not in answered:
+                answered[node.node_id] = elapsed
+    return list(stale.values()), list(answered.values())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--followers', type=int, nargs='+', default=[4, 16, 64])
+    parser.add_argument('--rate', type=float, default=20.0, help="Búsquedas por segundo de cada seguidor")
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--heartbeat-interval', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--in-memory', action='store_true',
+                        help="Entregar los mensajes en memoria en lugar de por TCP")
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    rows = []
+    port = args.port
+    for followers in args.followers:
+        for mode in ('ping', 'lease'):
+            rows.append(asyncio.run(scenario(followers, mode, args.rate, args.seconds,
+                                             args.heartbeat_interval, port, args.seed, args.in_memory)))
+            port += followers + 1
+    print_table(f"Búsqueda del líder ({args.rate:g} por segundo y seguidor, latido {args.heartbeat_interval:g} s)",
+                ["seguidores", "búsqueda", "búsquedas/s", "líder recibe/s", "líder envía/s",
+                 "p50 µs", "p99 µs", "sin líder"], rows)
+
+    rows = []
+    for followers in args.followers:
+        stale, answered = crash(followers, args.heartbeat_interval, args.seed)
+        rows.append([followers, f"{max(stale, default=0) * 1000:.0f}",
+                     f"{percentile(answered, 50) * 1000:.0f}", f"{max(answered, default=0) * 1000:.0f}",
+                     f"{len(answered)}/{followers}"])
+    print_table(f"Tras la caída del líder (simulador, concesión de {LEASE_HEARTBEATS} latidos)",
+                ["seguidores", "líder caído hasta ms", "nuevo líder p50 ms", "nuevo líder máx ms",
+                 "con respuesta"], rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Adquisiciones por segundo del gestor de recursos con nombre (lock_manager)
+según el número de recursos y de clientes: cada cliente toma un recurso al
+azar, lo libera en el acto y repite. Con un solo recurso equivale a un único
+Process de Ricart-Agrawala; con muchos, los recursos distintos se toman a la
+vez y las solicitudes hacia un mismo par viajan en un solo mensaje.
+    python -m benchmarks.bench_lock_manager --processes 3 --keys 1 10 100 1000 --clients 1 4 16"""
+import argparse
+import asyncio
+import random
+import time
+
+import metrics
+from aio_runtime import AsyncioRuntime
+from lock_manager import LockManager
+from benchmarks.util import print_table
+
+async def client(manager, keys, rng, deadline, holders, counters):
+    while time.perf_counter() < deadline:
+        name = f"k{rng.randrange(keys)}"
+        await manager.acquire_async(name)
+        if name in holders:
+            counters['violations'] += 1
+        holders.add(name)
+        counters['acquisitions'] += 1
+        await asyncio.sleep(0)  # Sección crítica vacía, pero cediendo el bucle
+        holders.discard(name)
+        manager.release(name)
+
+async def scenario(processes, keys, clients, seconds, base_port, seed, in_memory):
+    metrics.REGISTRY.reset()
+    runtime = AsyncioRuntime(seed=seed, local_delivery=in_memory)
+    ports = [base_port + pid for pid in range(processes)]
+    managers = [LockManager(pid, ports, runtime) for pid in range(processes)]
+    await runtime.ready()
+
+    rng = random.Random(seed)
+    holders = set()
+    counters = {'acquisitions': 0, 'violations': 0}
+    start = time.perf_counter()
+    deadline = start + seconds
+    tasks = [client(manager, keys, random.Random(rng.random()), deadline, holders, counters)
+             for manager in managers for _ in range(clients)]
+    await asyncio.wait_for(asyncio.gather(*tasks), seconds + 30)
+    elapsed = time.perf_counter() - start
+    await runtime.close()
+
+    assert not counters['violations'], "Dos clientes con el mismo recurso a la vez"
+    acquisitions = max(1, counters['acquisitions'])
+    messages = metrics.REGISTRY.counter('messages_sent', algorithm='lock-manager', type='lock_batch').value
+    entries = metrics.REGISTRY.counter('lock_batch_entries').value
+    wait = metrics.REGISTRY.histogram('lock_wait_seconds')
+    return [keys, clients * processes, counters['acquisitions'],
+            f"{counters['acquisitions'] / elapsed:,.0f}",
+            f"{messages / acquisitions:.2f}",
+            f"{entries / max(1, messages):.1f}",
+            f"{wait.quantile(0.5) * 1000:.2f}"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=3)
+    parser.add_argument('--keys', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16], help="Clientes por proceso")
+    parser.add_argument('--seconds', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--port', type=int, default=8700)
+    parser.add_argument('--in-memory', action='store_true',
+                        help="Entregar los mensajes en memoria en lugar de por TCP")
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    rows = []
+    port = args.port
+    for keys in args.keys:
+        for clients in args.clients:
+            rows.append(asyncio.run(scenario(args.processes, keys, clients, args.seconds,
+                                             port, args.seed, args.in_memory)))
+            port += args.processes
+    print_table(f"Gestor de recursos con nombre: {args.processes} procesos",
+                ["recursos", "clientes", "adquisiciones", "adquisiciones/s",
+                 "mensajes/adquisición", "entradas/mensaje", "espera p50 ms"], rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Rendimiento de los motores de exclusión mutua (mutual_exclusion.ENGINES)
+con contención alta (todos los procesos piden el recurso continuamente) y
+baja (un proceso al azar a la vez), en un mismo bucle de asyncio.
+    python -m benchmarks.bench_mutex_engines --processes 10 --seconds 2"""
+import argparse
+import asyncio
+import random
+import time
+
+import metrics
+from aio_runtime import AsyncioRuntime
+from mutual_exclusion import ENGINES, create_process
+from benchmarks.util import print_table
+
+def sent(cluster):
+    return sum(p.transport.stats()['sent'] for p in cluster)
+
+def instrument(cluster, counters):
+    """Cuenta entradas y comprueba la exclusión mutua"""
+    for process in cluster:
+        process.cs_duration = 0
+        original = process.access_resource
+
+        def access(original=original):
+            if any(p.in_cs for p in cluster):
+                counters['violations'] += 1
+            counters['entries'] += 1
+            original()
+        process.access_resource = access
+
+async def high_contention(runtime, cluster, seconds):
+    """Cada proceso vuelve a pedir el recurso apenas lo libera"""
+    running = True
+    for process in cluster:
+        original = process.release_resource
+
+        def release(process=process, original=original):
+            original()
+            if running:
+                runtime.loop.call_soon(process.request_resource)
+        process.release_resource = release
+        process.request_resource()
+    await asyncio.sleep(seconds)
+    running = False
+
+async def low_contention(runtime, cluster, seconds, rng):
+    """Un solo proceso (elegido al azar) pide el recurso cada vez"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        process = rng.choice(cluster)
+        process.request_resource()
+        while process.requesting:
+            await asyncio.sleep(0)
+
+async def scenario(engine, size, contention, seconds, base_port, seed):
+    runtime = AsyncioRuntime(seed=seed)
+    ports = [base_port + pid for pid in range(size)]
+    cluster = [create_process(pid, ports, ports, runtime, engine) for pid in range(size)]
+    await runtime.ready()
+    counters = {'entries': 0, 'violations': 0}
+    instrument(cluster, counters)
+
+    start = time.perf_counter()
+    if contention == "alta":
+        await high_contention(runtime, cluster, seconds)
+    else:
+        await low_contention(runtime, cluster, seconds, random.Random(seed))
+    elapsed = time.perf_counter() - start
+    messages = sent(cluster)
+    await runtime.close()
+
+    assert not counters['violations'], f"{engine}: dos procesos en la sección crítica a la vez"
+    entries = counters['entries']
+    return [engine, contention, entries, f"{entries / elapsed:,.0f}", f"{messages / max(1, entries):.1f}"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=10)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--port', type=int, default=8400)
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    rows = []
+    port = args.port
+    for contention in ("alta", "baja"):
+        for engine in ENGINES:
+            rows.append(asyncio.run(scenario(engine, args.processes, contention,
+                                             args.seconds, port, args.seed)))
+            port += args.processes
+
+    print_table(f"Motores de exclusión mutua: {args.processes} procesos",
+                ["motor", "contención", "entradas", "entradas/s", "mensajes/entrada"], rows)
+
+if __name__ == '__main__':
+    main()
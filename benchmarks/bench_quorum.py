@@ -0,0 +1,48 @@
+"""Compara el quórum de Maekawa con Ricart-Agrawala (permiso de todos los
+pares) en el simulador: mensajes por entrada a la sección crítica y espera
+desde la solicitud hasta la entrada, para N = 9, 25 y 100. Cada proceso pide
+el recurso cada 5 s (Process.simulate), así que la carga crece con N.
+    python -m benchmarks.bench_quorum --sizes 9 25 100 --seconds 300"""
+import argparse
+
+import metrics
+from maekawa import grid_quorum
+from simulator import simulate_mutex
+from benchmarks.util import print_table
+
+ENGINES = ('ricart-agrawala', 'maekawa')
+
+def measure(engine, size, seconds, seed, cs_duration, delay):
+    result = simulate_mutex(size, seconds, seed, delay, engine=engine, cs_duration=cs_duration)
+    assert not result['violations'], f"{engine}: dos procesos en la sección crítica a la vez"
+    entries = max(1, result['entries'])
+    wait = metrics.REGISTRY.histogram('cs_wait_seconds', algorithm=engine)
+    messages = result['messages']
+    return [size, engine, result['entries'],
+            f"{sum(messages.values()) / entries:.1f}",
+            f"{result['mean_wait'] * 1000:.1f}",
+            f"{wait.quantile(0.99) * 1000:.1f}",
+            f"{(messages.get('inquire', 0) + messages.get('relinquish', 0)) / entries:.2f}"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[9, 25, 100])
+    parser.add_argument('--seconds', type=float, default=300, help="Segundos simulados")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--cs-duration', type=float, default=0.01)
+    parser.add_argument('--delay', type=float, nargs=2, default=[0.001, 0.005])
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    rows = []
+    for size in args.sizes:
+        for engine in ENGINES:
+            rows.append(measure(engine, size, args.seconds, args.seed, args.cs_duration, tuple(args.delay)))
+    print_table(f"Quórum de Maekawa frente a Ricart-Agrawala ({args.seconds:.0f} s simulados, "
+                f"sección crítica de {args.cs_duration * 1000:.0f} ms)",
+                ["N", "motor", "entradas", "mensajes/entrada", "espera media ms", "espera p99 ms",
+                 "inquire+relinquish/entrada"], rows)
+    print("Tamaño del quórum: " + ", ".join(f"N={size}: {len(grid_quorum(0, size))}" for size in args.sizes))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Compara el despacho de mensajes de Process (cola bloqueante) con el
+bucle original que sondeaba la cola sin bloquear:
+- CPU consumida por un grupo de procesos inactivos
+- latencia solicitud -> concesión con todos los procesos compitiendo
+    python -m benchmarks.bench_ricart_dispatch --processes 3 --rounds 50"""
+import argparse
+import time
+
+import metrics
+from ricart_agrawala import Process
+from benchmarks.util import percentile, wait_until, print_table
+
+class SpinningProcess(Process):
+    """Despacho original: sondea la cola en un bucle sin bloquear"""
+    stopped = False
+
+    def process_messages(self):
+        while not self.stopped:
+            if not self.queue.empty():
+                message = self.queue.get()
+                if callable(message):
+                    message()
+                else:
+                    self.handle_message(message)
+
+def build(cls, processes, base_port, waits):
+    ports = [base_port + pid for pid in range(processes)]
+    cluster = [cls(pid, ports, ports) for pid in range(processes)]
+    for process in cluster:
+        process.cs_duration = 0.001
+        process.requested_at = 0.0
+        original = process.access_resource
+
+        def access(process=process, original=original):
+            waits.append((time.perf_counter() - process.requested_at) * 1000)
+            original()
+        process.access_resource = access
+    return cluster
+
+def request(process):
+    process.requested_at = time.perf_counter()
+    process.request_resource()
+
+def measure(name, cls, processes, rounds, base_port, idle_seconds):
+    waits = []
+    cluster = build(cls, processes, base_port, waits)
+
+    # CPU en reposo
+    time.sleep(0.2)
+    cpu, wall = time.process_time(), time.perf_counter()
+    time.sleep(idle_seconds)
+    idle_cpu = (time.process_time() - cpu) / (time.perf_counter() - wall) * 100
+
+    # Todos los procesos piden el recurso a la vez en cada ronda
+    for r in range(rounds):
+        for process in cluster:
+            process.queue.put(lambda process=process: request(process))
+        wait_until(lambda: len(waits) >= (r + 1) * processes
+                   and not any(p.requesting for p in cluster), timeout=10)
+
+    for process in cluster:
+        process.stopped = True
+        process.transport.close()
+    return [name, f"{idle_cpu:.1f}", len(waits),
+            f"{percentile(waits, 50):.2f}", f"{percentile(waits, 99):.2f}"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=3)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--idle-seconds', type=float, default=2.0)
+    parser.add_argument('--port', type=int, default=7600)
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    rows = [
+        measure("cola bloqueante", Process, args.processes, args.rounds,
+                args.port, args.idle_seconds),
+        measure("sondeo (original)", SpinningProcess, args.processes, args.rounds,
+                args.port + args.processes, args.idle_seconds),
+    ]
+    print_table(f"Ricart-Agrawala: {args.processes} procesos, {args.rounds} rondas con contención",
+                ["despacho", "CPU reposo %", "entradas", "espera p50 ms", "espera p99 ms"], rows)
+
+if __name__ == '__main__':
+    main()
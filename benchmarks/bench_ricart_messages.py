@@ -0,0 +1,78 @@
+"""Mensajes por entrada a la sección crítica de Ricart-Agrawala, con y sin
+la optimización de Roucairol-Carvalho (keep_permissions), para N procesos
+alojados en un mismo bucle de asyncio.
+    python -m benchmarks.bench_ricart_messages --sizes 3 10 50"""
+import argparse
+import asyncio
+
+import metrics
+from aio_runtime import AsyncioRuntime
+from ricart_agrawala import Process
+from benchmarks.util import print_table
+
+async def until(condition):
+    while not condition():
+        await asyncio.sleep(0.0005)
+
+def sent(cluster):
+    return sum(p.transport.stats()['sent'] for p in cluster)
+
+async def entries(cluster, pids):
+    """Ejecuta las entradas indicadas (un grupo de pids compite a la vez) y
+    devuelve los mensajes enviados por entrada"""
+    before = sent(cluster)
+    count = 0
+    for group in pids:
+        for pid in group:
+            cluster[pid].request_resource()
+        count += len(group)
+        await until(lambda: not any(p.requesting for p in cluster))
+    return (sent(cluster) - before) / count
+
+async def scenario(size, keep_permissions, base_port, rounds):
+    runtime = AsyncioRuntime()
+    ports = [base_port + pid for pid in range(size)]
+    cluster = [Process(pid, ports, ports, runtime, keep_permissions) for pid in range(size)]
+    await runtime.ready()
+
+    violations = []
+    for process in cluster:
+        process.cs_duration = 0
+        original = process.access_resource
+
+        def access(original=original):
+            if any(p.in_cs for p in cluster):
+                violations.append(1)
+            original()
+        process.access_resource = access
+
+    results = [
+        await entries(cluster, [[1 % size]] * rounds),  # Mismo proceso, sin contención
+        await entries(cluster, [[k % size] for k in range(rounds)]),  # Por turnos
+        await entries(cluster, [range(size)] * max(1, rounds // size)),  # Todos a la vez
+    ]
+    await runtime.close()
+    assert not violations, "Dos procesos en la sección crítica a la vez"
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3, 10, 50])
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    rows = []
+    for size in args.sizes:
+        for keep_permissions, mode in ((False, "ricart-agrawala"), (True, "roucairol-carvalho")):
+            repeated, turns, contended = asyncio.run(
+                scenario(size, keep_permissions, args.port, args.rounds))
+            rows.append([size, mode, f"{repeated:.1f}", f"{turns:.1f}", f"{contended:.1f}"])
+            args.port += size
+
+    print_table("Mensajes por entrada a la sección crítica",
+                ["N", "modo", "mismo proceso", "por turnos", "todos a la vez"], rows)
+
+if __name__ == '__main__':
+    main()
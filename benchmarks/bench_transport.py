@@ -0,0 +1,96 @@
+"""Compara el envío con un socket por mensaje (implementación original de
+BullyNode/Process) contra las conexiones persistentes de transport.py.
+
+Mide mensajes/s con envío en ráfaga y latencia de extremo a extremo
+(p50/p99) enviando un mensaje a la vez.
+    python -m benchmarks.bench_transport --messages 2000"""
+import argparse
+import json
+import socket
+import threading
+import time
+
+from transport import Transport
+from benchmarks.util import percentile, wait_until, print_table
+
+def legacy_listener(port, arrivals):
+    """Servidor como el original: accept, un recv(1024), close"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('localhost', port))
+    sock.listen(128)
+
+    def loop():
+        while True:
+            try:
+                conn, addr = sock.accept()
+            except OSError:
+                return
+            data = conn.recv(1024).decode()
+            conn.close()
+            message = json.loads(data)
+            arrivals[message['clock']] = time.perf_counter()
+
+    threading.Thread(target=loop, daemon=True).start()
+    return sock
+
+def legacy_send(port, message):
+    """Envío como el original: conectar, enviar un mensaje y cerrar"""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.settimeout(1.0)
+        s.connect(('localhost', port))
+        s.send(json.dumps(message).encode())
+        s.close()
+        return True
+    except OSError:
+        return False
+
+def run(name, send, arrivals, messages):
+    """Envía los mensajes y calcula rendimiento y latencias"""
+    # Rendimiento: ráfaga de mensajes
+    start = time.perf_counter()
+    for i in range(messages):
+        send({'type': 'request', 'sender_id': 0, 'clock': i})
+    wait_until(lambda: len(arrivals) >= messages)
+    elapsed = time.perf_counter() - start
+    delivered = len(arrivals)
+
+    # Latencia: un mensaje en vuelo a la vez
+    latencies = []
+    for i in range(messages, messages + min(messages, 1000)):
+        sent_at = time.perf_counter()
+        send({'type': 'request', 'sender_id': 0, 'clock': i})
+        if wait_until(lambda: i in arrivals, timeout=1.0, interval=0):
+            latencies.append((arrivals[i] - sent_at) * 1000)
+
+    return [name, delivered, f"{delivered / elapsed:,.0f}",
+            f"{percentile(latencies, 50):.3f}", f"{percentile(latencies, 99):.3f}"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--port', type=int, default=7100)
+    args = parser.parse_args()
+
+    rows = []
+
+    arrivals = {}
+    listener = legacy_listener(args.port, arrivals)
+    rows.append(run("socket por mensaje", lambda m: legacy_send(args.port, m), arrivals, args.messages))
+    listener.close()
+
+    arrivals = {}
+    sink = Transport(('localhost', args.port + 1),
+                     lambda m: arrivals.__setitem__(m['clock'], time.perf_counter()))
+    source = Transport(('localhost', args.port + 2), lambda m: None, max_queue=args.messages)
+    address = ('localhost', args.port + 1)
+    rows.append(run("conexión persistente", lambda m: source.send(address, m), arrivals, args.messages))
+    source.close()
+    sink.close()
+
+    print_table(f"Transporte: {args.messages} mensajes",
+                ["modo", "entregados", "msg/s", "p50 ms", "p99 ms"], rows)
+
+if __name__ == '__main__':
+    main()
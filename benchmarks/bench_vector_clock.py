@@ -0,0 +1,76 @@
+"""Compara el reloj vectorial con listas de Python (fusión con un bucle, como
+el VectorClockServer original) contra VectorClock sobre NumPy: fusión,
+comparación happens-before y serialización, para N = 10, 1k y 100k.
+    python -m benchmarks.bench_vector_clock --budget 0.5"""
+import argparse
+import random
+import time
+
+import wire
+from vector_clock import VectorClock
+from benchmarks.util import print_table
+
+def list_merge(local, received):
+    local[0] += 1
+    for i in range(len(local)):
+        local[i] = max(local[i], received[i])
+
+def list_happens_before(a, b):
+    return all(x <= y for x, y in zip(a, b)) and a != b
+
+def throughput(function, budget):
+    """Operaciones por segundo de function() durante unos budget segundos"""
+    rounds, elapsed = 0, 0.0
+    batch = 1
+    start = time.perf_counter()
+    while elapsed < budget:
+        for _ in range(batch):
+            function()
+        rounds += batch
+        batch *= 2
+        elapsed = time.perf_counter() - start
+    return rounds / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000])
+    parser.add_argument('--budget', type=float, default=0.5, help="Segundos por medición")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    rows = []
+    for size in args.sizes:
+        a = [rng.randrange(1000) for _ in range(size)]
+        b = [x + rng.randrange(2) for x in a]  # a precede a b: se recorre todo el vector
+        clock_a, clock_b = VectorClock.from_list(a), VectorClock.from_list(b)
+        merged, merged_clock = list(a), clock_a.copy()  # Las fusiones no alteran a
+        list_message = wire.new_message('vector', 1, vector=a)
+        clock_message = wire.new_message('vector', 1, vector=clock_a.to_bytes())
+        payload = wire.encode(list_message, 'binary')
+        assert payload == wire.encode(clock_message, 'binary')
+        assert list_happens_before(a, b) == clock_a.happens_before(clock_b)
+
+        for operation, legacy, vectorized in (
+            ("fusión",
+             lambda: list_merge(merged, b),
+             lambda: (merged_clock.increment(0), merged_clock.merge(clock_b))),
+            ("happens-before",
+             lambda: list_happens_before(a, b),
+             lambda: clock_a.happens_before(clock_b)),
+            ("serializar",
+             lambda: wire.encode(list_message, 'binary'),
+             lambda: wire.encode(clock_message, 'binary')),
+            ("deserializar",
+             lambda: wire.decode(payload)['vector'],
+             lambda: VectorClock.from_bytes(wire.decode(payload, raw_vector=True)['vector'], copy=False)),
+        ):
+            slow = throughput(legacy, args.budget)
+            fast = throughput(vectorized, args.budget)
+            rows.append([size, operation, f"{slow:,.0f}", f"{fast:,.0f}", f"{fast / slow:.1f}x"])
+
+    print_table("Reloj vectorial: listas contra NumPy",
+                ["N", "operación", "listas op/s", "VectorClock op/s", "mejora"], rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Compara el envío del vector completo con el envío diferencial
+(Singhal-Kshemkalyani, DeltaTracker): bytes en el cable y CPU de la fusión
+en el receptor. Cada proceso solo conversa con unos pocos vecinos, así que
+la mayor parte del vector no cambia entre mensajes.
+    python -m benchmarks.bench_vector_delta --sizes 1000 10000 --processes 64 --peers 4"""
+import argparse
+import random
+import time
+
+import wire
+from vector_clock import VectorClock, DeltaTracker
+from benchmarks.util import print_table
+
+def run(size, processes, peers, messages, seed, delta):
+    """Intercambia messages mensajes entre vecinos; devuelve (bytes, segundos de fusión, relojes)"""
+    rng = random.Random(seed)
+    trackers = [DeltaTracker(VectorClock.zeros(size), pid) for pid in range(processes)]
+    sent_bytes = 0
+    merge_time = 0.0
+    for _ in range(messages):
+        sender = rng.randrange(processes)
+        receiver = (sender + rng.randint(1, peers)) % processes
+        source = trackers[sender]
+        source.tick()  # Evento de envío
+        if delta:
+            message = wire.new_message('vector_delta', sender, vector=source.delta_for(receiver))
+        else:
+            message = wire.new_message('vector', sender, vector=source.clock.to_bytes())
+        payload = wire.encode(message, 'binary')
+        sent_bytes += len(payload)
+
+        start = time.perf_counter()
+        received = wire.decode(payload, raw_vector=True)
+        if delta:
+            trackers[receiver].merge_delta(received['vector'])
+        else:
+            trackers[receiver].merge(received['vector'])
+        merge_time += time.perf_counter() - start
+    return sent_bytes, merge_time, [t.clock for t in trackers]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--processes', type=int, default=64, help="Procesos que intercambian mensajes")
+    parser.add_argument('--peers', type=int, default=4, help="Vecinos de cada proceso")
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        full_bytes, full_time, full_clocks = run(size, args.processes, args.peers,
+                                                 args.messages, args.seed, delta=False)
+        delta_bytes, delta_time, delta_clocks = run(size, args.processes, args.peers,
+                                                    args.messages, args.seed, delta=True)
+        assert full_clocks == delta_clocks, "el modo diferencial produjo relojes distintos"
+        for mode, sent_bytes, merge_time in (("completo", full_bytes, full_time),
+                                             ("diferencial", delta_bytes, delta_time)):
+            rows.append([size, mode, f"{sent_bytes / args.messages:,.0f}",
+                         f"{sent_bytes / 1e6:,.1f}", f"{merge_time / args.messages * 1e6:.1f}"])
+
+    print_table(f"Reloj vectorial: {args.processes} procesos, {args.peers} vecinos, {args.messages} mensajes",
+                ["N", "modo", "bytes/msg", "MB totales", "fusión µs/msg"], rows)
+
+if __name__ == '__main__':
+    main()
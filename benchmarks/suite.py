@@ -0,0 +1,238 @@
+"""Suite de regresión de rendimiento: ejecuta escenarios reproducibles
+(semillas, tamaños de clúster y contención fijos) para cada algoritmo,
+guarda los resultados en JSON y los compara con una línea base.
+    python -m benchmarks.suite --output resultados.json
+    python -m benchmarks.suite --save-baseline   # Actualiza benchmarks/baseline.json
+
+Las métricas que terminan en '_per_s' son mejores cuanto más altas; el resto
+(segundos, mensajes, bytes) cuanto más bajas. Los escenarios 'sim_*' usan el
+simulador con reloj virtual, así que sus resultados no dependen de la máquina"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import threading
+import time
+
+import metrics
+import wire
+from aio_runtime import AsyncioRuntime
+from bully_algorithm import BullyNode
+from mutual_exclusion import create_process
+from simulator import simulate_bully, simulate_mutex
+from benchmarks.bench_codec import throughput
+from benchmarks.bench_failover import failover
+from benchmarks.bench_mutex_engines import instrument, high_contention, low_contention, sent
+from benchmarks.util import percentile, print_table, wait_until
+
+SEED = 1
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+async def mutex_run(engine, size, contention, seconds, base_port):
+    """Entradas/s, mensajes por entrada y espera media de la sección crítica"""
+    metrics.REGISTRY.reset()
+    runtime = AsyncioRuntime(seed=SEED)
+    ports = [base_port + pid for pid in range(size)]
+    cluster = [create_process(pid, ports, ports, runtime, engine) for pid in range(size)]
+    await runtime.ready()
+    counters = {'entries': 0, 'violations': 0}
+    instrument(cluster, counters)
+    start = time.perf_counter()
+    if contention == 'alta':
+        await high_contention(runtime, cluster, seconds)
+    else:
+        await low_contention(runtime, cluster, seconds, random.Random(SEED))
+    elapsed = time.perf_counter() - start
+    messages = sent(cluster)
+    await runtime.close()
+    assert not counters['violations'], f"{engine}: dos procesos en la sección crítica a la vez"
+    wait = metrics.REGISTRY.histogram('cs_wait_seconds', algorithm=cluster[0].algorithm)
+    return {
+        'entries_per_s': counters['entries'] / elapsed,
+        'messages_per_entry': messages / max(1, counters['entries']),
+        'wait_mean_s': wait.sum / max(1, wait.count),
+    }
+
+def scenario_ricart(args):
+    """Ricart-Agrawala: 5 procesos con contención alta y baja"""
+    results = {}
+    for offset, contention in enumerate(('alta', 'baja')):
+        run = asyncio.run(mutex_run('ricart-agrawala', 5, contention, args.seconds,
+                                    args.port + 10 * offset))
+        results.update({f"{contention}_{name}": value for name, value in run.items()})
+    return results
+
+def scenario_bully(args):
+    """Abusón: recuperación ante la caída del líder con 5 y 20 nodos"""
+    results = {}
+    port = args.port + 100
+    for size in (5, 20):
+        times, messages = [], []
+        for trial in range(3):
+            elapsed, count = asyncio.run(failover(BullyNode, size, port, 0.1, SEED + trial))
+            port += size + 1
+            times.append(elapsed)
+            messages.append(count)
+        results[f"n{size}_failover_p50_s"] = percentile(times, 50)
+        results[f"n{size}_election_messages"] = sum(messages) / len(messages)
+    return results
+
+def scenario_sim_mutex(args):
+    """Ricart-Agrawala simulado: 5 procesos durante una hora virtual"""
+    result = simulate_mutex(5, 3600, SEED)
+    return {
+        'messages_per_entry': sum(result['messages'].values()) / max(1, result['entries']),
+        'wait_mean_s': result['mean_wait'],
+        'violations': result['violations'],
+    }
+
+def scenario_sim_bully(args):
+    """Abusón simulado: 10 nodos con fallas aleatorias durante una hora virtual"""
+    result = simulate_bully(10, 3600, SEED)
+    elections = max(1, result['elections'])
+    election_messages = sum(count for kind, count in result['messages'].items() if kind != 'heartbeat')
+    return {
+        'messages_per_election': election_messages / elections,
+        'disagreement_fraction': 1 - result['agreement'],
+    }
+
+def serve_forever(target, *args):
+    threading.Thread(target=target, args=args, daemon=True).start()
+
+def scenario_lamport(args):
+    """Servidor de Lamport: eventos en lotes de 1000 y un mensaje por evento"""
+    import lamport_server
+    import lamport_client
+    port = args.port + 300
+    serve_forever(lamport_server.iniciar_servidor, port)
+    wait_until(lambda: can_connect(port))
+    return {
+        'batched_events_per_s': lamport_client.generar_carga(200000, 1000, port),
+        'pipelined_events_per_s': lamport_client.generar_carga(20000, 1, port),
+    }
+
+def scenario_vector(args):
+    """Servidor de reloj vectorial (N=1000): vectores completos y deltas por una conexión"""
+    from vector_clock_server import VectorClockServer
+    from vector_clock import VectorClock, DeltaTracker
+    size, messages = 1000, 5000
+    port = args.port + 301
+    server = VectorClockServer(port, 0, size)
+    serve_forever(server.start)
+    wait_until(lambda: can_connect(port))
+
+    results = {}
+    tracker = DeltaTracker(VectorClock.zeros(size), 1)
+    for mode in ('full', 'delta'):
+        frames = []
+        for _ in range(messages):
+            tracker.tick()
+            if mode == 'delta':
+                message = wire.new_message('vector_delta', 1, vector=tracker.delta_for(port))
+            else:
+                message = wire.new_message('vector', 1, vector=tracker.clock.to_bytes())
+            frames.append(wire.encode_frame(message))
+        target = server.vector_clock[0] + messages  # Cada fusión incrementa la posición del servidor
+        start = time.perf_counter()
+        with socket.create_connection(('localhost', port)) as s:
+            s.sendall(b''.join(frames))
+            wait_until(lambda: server.vector_clock[0] >= target, timeout=60)
+        results[f"{mode}_events_per_s"] = messages / (time.perf_counter() - start)
+        results[f"{mode}_bytes_per_message"] = sum(map(len, frames)) / messages
+    return results
+
+def scenario_codec(args):
+    """Serialización binaria de un mensaje de Ricart-Agrawala y de un vector N=1000"""
+    results = {}
+    for name, message, rounds in (('ricart', wire.new_message('request', 2, 1234), 20000),
+                                  ('vector1000', wire.new_message('vector', 0, vector=range(1000)), 2000)):
+        payload = wire.encode(message, 'binary')
+        results[f"{name}_encode_per_s"] = throughput(lambda m: wire.encode(m, 'binary'), message, rounds)
+        results[f"{name}_decode_per_s"] = throughput(wire.decode, payload, rounds)
+    return results
+
+def can_connect(port):
+    try:
+        socket.create_connection(('localhost', port), timeout=0.1).close()
+        return True
+    except OSError:
+        return False
+
+SCENARIOS = {
+    'ricart': scenario_ricart,
+    'bully': scenario_bully,
+    'sim_mutex': scenario_sim_mutex,
+    'sim_bully': scenario_sim_bully,
+    'lamport': scenario_lamport,
+    'vector': scenario_vector,
+    'codec': scenario_codec,
+}
+
+def higher_is_better(metric):
+    return metric.endswith('_per_s')
+
+def compare(results, baseline, tolerance):
+    """Filas de la comparación y lista de regresiones (cambio peor que tolerance)"""
+    rows, regressions = [], []
+    for scenario, values in results.items():
+        for metric, value in values.items():
+            base = baseline.get(scenario, {}).get(metric)
+            if base is None:
+                rows.append([scenario, metric, f"{value:,.4g}", "-", "nueva"])
+                continue
+            change = (value - base) / base if base else (0.0 if value == base else float('inf'))
+            worse = -change if higher_is_better(metric) else change
+            status = "REGRESIÓN" if worse > tolerance else "ok"
+            if worse > tolerance:
+                regressions.append(f"{scenario}.{metric}")
+            rows.append([scenario, metric, f"{value:,.4g}", f"{base:,.4g}", f"{change:+.1%} {status}"])
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--output', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Guardar los resultados como línea base")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Empeoramiento relativo permitido antes de marcar una regresión")
+    parser.add_argument('--seconds', type=float, default=1.0, help="Duración de cada medición de exclusión mutua")
+    parser.add_argument('--port', type=int, default=12000)
+    args = parser.parse_args()
+
+    metrics.set_logging(False)
+    results = {}
+    for name in args.scenarios:
+        print(f"[Suite] {name}...", flush=True)
+        results[name] = SCENARIOS[name](args)
+
+    report = {
+        'meta': {'time': time.time(), 'python': platform.python_version(),
+                 'machine': platform.machine(), 'cpus': os.cpu_count(), 'seed': SEED},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[Suite] Línea base guardada en {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"[Suite] No hay línea base en {args.baseline}; use --save-baseline")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    rows, regressions = compare(results, baseline, args.tolerance)
+    print_table(f"Comparación con {args.baseline} (tolerancia {args.tolerance:.0%})",
+                ["escenario", "métrica", "actual", "base", "cambio"], rows)
+    if regressions:
+        raise SystemExit(f"Regresiones: {', '.join(regressions)}")
+
+if __name__ == '__main__':
+    main()
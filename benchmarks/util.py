@@ -0,0 +1,26 @@
+import time
+
+def percentile(values, p):
+    """Percentil p (0-100) por el método del vecino más cercano"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def wait_until(condition, timeout=10.0, interval=0.001):
+    """Espera hasta que condition() sea verdadera o se agote el tiempo"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+def print_table(title, columns, rows):
+    """Imprime una tabla simple alineada a la derecha"""
+    print(f"\n{title}")
+    widths = [max(len(str(c)), *(len(str(r[i])) for r in rows)) for i, c in enumerate(columns)]
+    print("  ".join(str(c).rjust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(v).rjust(w) for v, w in zip(row, widths)))
@@ -1,212 +1,592 @@
-import socket
-import threading
-import time
-import random
-import json
-
-class BullyNode:
-    def __init__(self, node_id, port, all_ports):
-        self.node_id = node_id
-        self.port = port
-        self.all_ports = all_ports  # {id: port}
-        self.leader_id = max(all_ports.keys())
-        self.active = True
-        self.election_in_progress = False
-        self.ok_received = False
-        
-        # Configurar socket
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.sock.bind(('localhost', port))
-        self.sock.listen(5)
-        
-        # Iniciar hilos
-        threading.Thread(target=self.listen_for_messages, daemon=True).start()
-        threading.Thread(target=self.node_behavior, daemon=True).start()
-        threading.Thread(target=self.print_status, daemon=True).start()
-
-    def listen_for_messages(self):
-        """Escucha mensajes entrantes"""
-        while True:
-            try:
-                conn, addr = self.sock.accept()
-                data = conn.recv(1024).decode()
-                conn.close()
-                if data:
-                    message = json.loads(data)
-                    self.handle_message(message)
-            except:
-                pass
-
-    def handle_message(self, message):
-        """Procesa mensajes recibidos"""
-        msg_type = message['type']
-        
-        if msg_type == 'election':
-            self.handle_election(message)
-        elif msg_type == 'answer':
-            self.handle_answer()
-        elif msg_type == 'victory':
-            self.handle_victory(message)
-        elif msg_type == 'ping':
-            self.handle_ping()
-
-    def send_message(self, dest_port, msg_type):
-        """Envía mensaje a otro nodo"""
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(1.0)
-            s.connect(('localhost', dest_port))
-            message = {
-                'type': msg_type,
-                'sender_id': self.node_id,
-                'sender_port': self.port
-            }
-            s.send(json.dumps(message).encode())
-            s.close()
-            return True
-        except:
-            return False
-
-    def start_election(self):
-        """Inicia proceso de elección"""
-        if not self.active or self.election_in_progress:
-            return
-            
-        self.election_in_progress = True
-        self.ok_received = False
-        print(f"\n[Nodo {self.node_id}] Iniciando elección")
-        
-        # Enviar a nodos con mayor ID
-        higher_nodes = [n_id for n_id in self.all_ports if n_id > self.node_id]
-        
-        for n_id in higher_nodes:
-            if self.send_message(self.all_ports[n_id], 'election'):
-                print(f"[Nodo {self.node_id}] Enviado ELECTION a {n_id}")
-        
-        # Esperar respuestas
-        time.sleep(2)
-        
-        # Si no hay nodos mayores o no respondieron
-        if not higher_nodes or not self.ok_received:
-            self.declare_victory()
-        else:
-            print(f"[Nodo {self.node_id}] Elección fallida, recibió OK")
-            self.election_in_progress = False
-
-    def handle_election(self, message):
-        """Procesa mensaje de elección"""
-        if not self.active:
-            return
-            
-        print(f"[Nodo {self.node_id}] Recibido ELECTION de {message['sender_id']}")
-        
-        # Responder OK
-        if self.send_message(message['sender_port'], 'answer'):
-            print(f"[Nodo {self.node_id}] Enviado ANSWER a {message['sender_id']}")
-        
-        # Iniciar propia elección si tiene mayor ID
-        if self.node_id > message['sender_id']:
-            self.start_election()
-
-    def handle_answer(self):
-        """Procesa respuesta OK"""
-        self.ok_received = True
-
-    def declare_victory(self):
-        """Se declara líder"""
-        self.leader_id = self.node_id
-        self.election_in_progress = False
-        print(f"\n=== [Nodo {self.node_id}] ¡Soy el nuevo LÍDER! ===")
-        
-        # Notificar a todos
-        for n_id, port in self.all_ports.items():
-            if n_id != self.node_id:
-                if self.send_message(port, 'victory'):
-                    print(f"[Nodo {self.node_id}] Notificado VICTORY a {n_id}")
-
-    def handle_victory(self, message):
-        """Procesa anuncio de victoria"""
-        print(f"[Nodo {self.node_id}] Reconociendo nuevo líder: {message['sender_id']}")
-        self.leader_id = message['sender_id']
-        self.election_in_progress = False
-
-    def handle_ping(self):
-        """Responde a ping"""
-        if self.active:
-            return True
-        return False
-
-    def check_leader(self):
-        """Verifica si el líder está activo"""
-        if self.leader_id == self.node_id:
-            return True
-            
-        leader_port = self.all_ports.get(self.leader_id)
-        if not leader_port:
-            return False
-            
-        try:
-            return self.send_message(leader_port, 'ping')
-        except:
-            return False
-
-    def node_behavior(self):
-        """Comportamiento automático del nodo"""
-        while True:
-            # Intervalo aleatorio entre 5-10 segundos
-            time.sleep(random.randint(5, 10))
-            
-            if not self.active:
-                continue
-                
-            # Verificar líder (excepto si soy el líder)
-            if self.node_id != self.leader_id:
-                if not self.check_leader():
-                    print(f"[Nodo {self.node_id}] ¡Líder {self.leader_id} no responde!")
-                    self.start_election()
-            
-            # Simular falla aleatoria (10% de probabilidad, AHORA INCLUYE AL LÍDER)
-            if random.random() < 0.1:  # Eliminada la restricción para el líder
-                self.active = False
-                print(f"\n[Nodo {self.node_id}] ¡HE FALLADO!")
-                time.sleep(random.randint(8, 12))
-                self.active = True
-                print(f"\n[Nodo {self.node_id}] ¡RECUPERADO!")
-                # Si era el líder, iniciar elección al recuperarse
-                if self.node_id == self.leader_id:
-                    self.start_election()
-
-    def print_status(self):
-        """Muestra estado periódicamente"""
-        while True:
-            time.sleep(2)
-            if self.active:
-                status = "LÍDER" if self.node_id == self.leader_id else f"seguidor (Líder: {self.leader_id})"
-                print(f"[Nodo {self.node_id}] Estado: {status}")
-
-def main():
-    # Configuración de nodos
-    nodes_config = {
-        1: 5001,
-        2: 5002,
-        3: 5003,
-        4: 5004,
-        5: 5005
-    }
-    
-    node_id = int(input("Ingrese ID del nodo (1-5): "))
-    if node_id not in nodes_config:
-        print("ID inválido")
-        return
-    
-    print(f"\nIniciando nodo {node_id} en puerto {nodes_config[node_id]}")
-    print("----------------------------------------")
-    
-    node = BullyNode(node_id, nodes_config[node_id], nodes_config)
-    
-    # Mantener programa ejecutando
-    while True:
-        time.sleep(1)
-
-main()
+import argparse
+import asyncio
+import contextlib
+import signal
+import threading
+import time
+from runtime import ThreadRuntime
+from membership import Membership, add_arguments, from_args, format_address, parse_address
+from failure_detector import DETECTORS, RttEstimator
+from wire import new_message
+import metrics
+from metrics import REGISTRY, log
+
+# Turnos máximos de espera antes de una elección por sondeo: si tampoco
+# entonces hay líder, los nodos restantes compiten a la vez
+MAX_PROBE_RANK = 4
+
+# Latidos que cubre cada concesión del líder (tolera perder dos seguidos) y
+# fracción del plazo que el seguidor descuenta por la deriva de su reloj
+LEASE_HEARTBEATS = 3
+LEASE_DRIFT = 0.05
+
+class BullyNode:
+    def __init__(self, node_id, port, all_ports, runtime=None,
+                 heartbeat_interval=1.0, detector=None, probing=False, lease_duration=None):
+        """- port: Puerto propio (None: el de este nodo en all_ports)
+        - all_ports: Membership del clúster o dict {id: puerto} en localhost
+        - detector: Detector de fallas o su nombre en DETECTORS (por defecto, 'phi')
+        - probing: Elección por sondeo descendente (O(N) mensajes) en lugar
+          de la elección clásica en la que cada nodo mayor inicia la suya
+        - lease_duration: Plazo de cada concesión del líder (por defecto,
+          LEASE_HEARTBEATS latidos)"""
+        self.runtime = runtime or ThreadRuntime()  # Hilos, asyncio o simulación
+        self.random = self.runtime.random
+        self.node_id = node_id
+        self.membership = Membership.coerce(all_ports)  # Cambia con los mensajes JOIN y LEAVE
+        if node_id not in self.membership:
+            self.membership.join(node_id, ('localhost', port))
+        self.address = self.membership.address(node_id)
+        self.port = self.address[1]
+        self.leader_id = max(self.membership)
+        self.active = True
+        self.election_in_progress = False
+        self.ok_received = False
+        self.failure_probability = 0.1  # Probabilidad de falla simulada en cada ronda
+        
+        # Estado de la elección: el número de ronda viaja en 'clock' y las
+        # respuestas lo repiten para descartar temporizadores y respuestas viejas
+        self.election_round = 0
+        self.election_started = 0.0
+        self.election_timer = None
+        self.rtt = RttEstimator()  # Tiempo de espera adaptado al tiempo de ida y vuelta
+        
+        # Elección por sondeo: el candidato pregunta a los nodos mayores de
+        # uno en uno, del mayor al menor, y el primero que responde asume el
+        # liderazgo. Cada VICTORY lleva un término creciente en 'clock' para
+        # descartar anuncios de elecciones superadas
+        self.probing = probing
+        self.probe_queue = []  # Nodos mayores que faltan por sondear, del mayor al menor
+        self.probed = set()  # Nodos ya sondeados en la elección en curso
+        self.term = 0  # Mayor término de VICTORY conocido
+        
+        # Detección de fallas: el líder envía latidos, los seguidores lo vigilan
+        self.heartbeat_interval = heartbeat_interval
+        if detector is None or isinstance(detector, str):
+            detector = DETECTORS[detector or 'phi'](heartbeat_interval)
+        self.detector = detector
+        self.suspicions = 0  # Veces que se sospechó del líder
+        self.detector.watch(self.leader_id, self.runtime.now())
+        
+        # Concesiones (leases): cada latido y cada VICTORY del líder conceden a
+        # todos los seguidores a la vez un plazo durante el cual current_leader
+        # responde sin preguntarle a nadie. Una sospecha, una elección o un
+        # VICTORY de un nodo menor la revocan antes. Un líder nuevo no concede
+        # hasta que vencen las concesiones que vio dar a otro nodo
+        self.lease_duration = lease_duration or LEASE_HEARTBEATS * heartbeat_interval
+        self.lease_expiry = 0.0  # Instante local en que vence la concesión vigente
+        self.lease_holder = None  # Nodo que dio la concesión vigente
+        self.foreign_leases_until = 0.0  # Hasta cuándo pueden valer concesiones de otro nodo
+        self.lease_waiters = []  # Funciones de quienes esperan una concesión vigente
+        self.lock = contextlib.nullcontext() if self.runtime.serial else self.runtime.lock
+        self.membership.subscribe(self.membership_changed)
+        
+        # Transporte con una conexión persistente por nodo
+        self.transport = self.runtime.listen(self.address, self.handle_message)
+        
+        # Programar comportamiento periódico
+        self.schedule_behavior()
+        self.runtime.call_later(heartbeat_interval, self.send_heartbeats)
+        self.runtime.call_later(heartbeat_interval / 2, self.monitor_leader)
+        self.runtime.call_later(2, self.print_status)
+
+    def handle_message(self, message):
+        """Procesa mensajes recibidos"""
+        msg_type = message['type']
+        REGISTRY.counter('messages_received', algorithm='bully', type=msg_type).inc()
+        
+        if msg_type == 'election':
+            self.handle_election(message)
+        elif msg_type == 'answer':
+            self.handle_answer(message)
+        elif msg_type == 'victory':
+            self.handle_victory(message)
+        elif msg_type == 'ping':
+            self.handle_ping(message)
+        elif msg_type == 'heartbeat':
+            self.handle_heartbeat(message)
+        elif msg_type == 'join':
+            self.handle_join(message)
+        elif msg_type == 'leave':
+            self.handle_leave(message)
+
+    def send_message(self, dest_id, msg_type, clock=0, data=''):
+        """Envía mensaje a otro nodo (False si ya no pertenece al clúster)"""
+        address = self.membership.address(dest_id)
+        if address is None:
+            return False
+        message = new_message(msg_type, self.node_id, clock, data=data)
+        start = time.perf_counter()
+        sent = self.transport.send(address, message)
+        REGISTRY.histogram('send_seconds', algorithm='bully').observe(time.perf_counter() - start)
+        REGISTRY.counter('messages_sent', algorithm='bully', type=msg_type).inc()
+        return sent
+
+    def set_election_timer(self, delay, callback):
+        """Reemplaza el temporizador de la elección en curso"""
+        if self.election_timer is not None:
+            self.election_timer.cancel()
+        self.election_timer = self.runtime.call_later(delay, callback, self.election_round)
+
+    def start_election(self, skip=None):
+        """Inicia proceso de elección (al sondear, sin preguntar a skip: el líder del que se sospecha)"""
+        if not self.active or self.election_in_progress:
+            return
+            
+        self.election_in_progress = True
+        self.ok_received = False
+        self.election_round += 1
+        self.election_started = self.runtime.now()
+        self.revoke_lease()  # El resultado puede ser otro líder
+        REGISTRY.counter('elections_started').inc()
+        log(f"\n[Nodo {self.node_id}] Iniciando elección")
+        
+        # Enviar a nodos con mayor ID, salvo a los que el detector ya da por caídos
+        now = self.runtime.now()
+        higher_nodes = [n_id for n_id in self.membership if n_id > self.node_id]
+        if self.probing:
+            self.probed = set()
+            self.probe_queue = [n_id for n_id in reversed(higher_nodes)
+                                if n_id != skip and not self.detector.suspects(n_id, now)]
+            self.probe_next(self.election_round)
+            return
+        contacted = 0
+        for n_id in higher_nodes:
+            if self.detector.suspects(n_id, now):
+                continue
+            if self.send_message(n_id, 'election', self.election_round):
+                contacted += 1
+                log(f"[Nodo {self.node_id}] Enviado ELECTION a {n_id}")
+        
+        # Si nadie mayor puede responder, el resultado ya se conoce
+        if not contacted:
+            self.declare_victory()
+            return
+        
+        # Esperar respuestas sin bloquear la recepción de mensajes
+        self.set_election_timer(self.rtt.timeout(), self.finish_election)
+
+    def probe_next(self, election_round):
+        """Sondea al mayor de los nodos que faltan; si el anterior no respondió
+        a tiempo, pasa al siguiente. Sin nadie mayor que responda, gana"""
+        if election_round != self.election_round or not self.election_in_progress or self.ok_received:
+            return
+        while self.probe_queue:
+            n_id = self.probe_queue.pop(0)
+            self.probed.add(n_id)
+            if self.send_message(n_id, 'election', self.election_round, data='probe'):
+                log(f"[Nodo {self.node_id}] Sondeando a {n_id}")
+                self.set_election_timer(self.rtt.timeout(), self.probe_next)
+                return
+        self.declare_victory()
+
+    def start_probe_election(self, suspected_leader):
+        """Elección diferida por monitor_leader; se omite si mientras tanto
+        llegó un VICTORY (otro candidato más cercano a la cima ya ganó)"""
+        if self.leader_id != suspected_leader:
+            REGISTRY.counter('elections_suppressed').inc()
+            return
+        self.start_election(skip=suspected_leader)
+
+    def finish_election(self, election_round):
+        """Decide la elección una vez agotado el tiempo de espera"""
+        if election_round != self.election_round or not self.election_in_progress:
+            return  # Temporizador de una elección ya resuelta
+        # Ningún nodo mayor respondió
+        if not self.ok_received:
+            self.declare_victory()
+
+    def victory_timeout(self, election_round):
+        """Un nodo mayor respondió pero no anunció su victoria: reintentar"""
+        if election_round != self.election_round or not self.election_in_progress:
+            return
+        log(f"[Nodo {self.node_id}] No llegó VICTORY, reintentando elección")
+        self.election_in_progress = False
+        self.start_election()
+
+    def handle_election(self, message):
+        """Procesa mensaje de elección"""
+        if not self.active:
+            return
+            
+        log(f"[Nodo {self.node_id}] Recibido ELECTION de {message['sender_id']}")
+        
+        # Sondeo: si este nodo aún ve vivo a su líder, la sospecha del candidato
+        # puede ser falsa; en lugar de asumir el liderazgo, se lo indica en la
+        # respuesta para que le pregunte a él
+        probe = message['data'] == 'probe'
+        known_leader = (self.leader_id if probe and self.leader_id is not None
+                        and self.leader_id > self.node_id and self.check_leader() else None)
+        
+        # Responder OK (con el número de ronda recibido)
+        if self.send_message(message['sender_id'], 'answer', message['clock'],
+                             data='' if known_leader is None else str(known_leader)):
+            log(f"[Nodo {self.node_id}] Enviado ANSWER a {message['sender_id']}")
+        
+        # Si ya es el líder basta con recordárselo al que preguntó
+        if self.leader_id == self.node_id and not self.election_in_progress:
+            self.send_message(message['sender_id'], 'victory', self.term, data=self.lease_grant())
+            return
+        
+        # Sondeo: el candidato ya preguntó sin respuesta a todos los nodos mayores
+        # que este, así que este asume el liderazgo sin otra elección (si hay
+        # uno mayor vivo, objetará al recibir el VICTORY)
+        if probe:
+            if known_leader is None:
+                self.declare_victory()
+            return
+        
+        # Iniciar propia elección si tiene mayor ID
+        if self.node_id > message['sender_id']:
+            self.start_election()
+
+    def handle_answer(self, message):
+        """Procesa respuesta OK: la elección está perdida, solo falta el VICTORY"""
+        if message['clock'] != self.election_round or not self.election_in_progress:
+            return
+        if self.probing and message['data']:
+            # El sondeado ve vivo al líder: preguntarle a él (una vez por elección);
+            # si ya se le preguntó sin respuesta, esperar como con cualquier OK
+            leader = int(message['data'])
+            if leader not in self.probed:
+                self.probe_queue.insert(0, leader)
+                self.probe_next(self.election_round)
+                return
+        if not self.ok_received:
+            self.rtt.sample(self.runtime.now() - self.election_started)
+            log(f"[Nodo {self.node_id}] Elección perdida, recibió OK de {message['sender_id']}")
+        self.ok_received = True
+        
+        # Esperar el anuncio del nodo mayor; si no llega, repetir la elección
+        # (al sondear, el que respondió lo anuncia sin otra elección)
+        higher_nodes = 1 if self.probing else sum(1 for n_id in self.membership if n_id > self.node_id)
+        self.set_election_timer(self.rtt.timeout() * (higher_nodes + 1), self.victory_timeout)
+
+    def declare_victory(self):
+        """Se declara líder"""
+        self.end_election()
+        REGISTRY.counter('elections_won').inc()
+        if self.leader_id == self.node_id:
+            REGISTRY.counter('duplicate_victories').inc()  # Ya se había anunciado
+        else:
+            REGISTRY.counter('leader_changes').inc()  # Más que caídas reales: elecciones espurias
+        self.term += 1
+        self.leader_id = self.node_id
+        REGISTRY.gauge('leader', node=self.node_id).set(self.leader_id)
+        if self.election_timer is not None:
+            self.election_timer.cancel()
+        hold = self.foreign_leases_until - self.runtime.now()
+        if hold > 0:
+            self.runtime.call_later(hold, self.wake_lease_waiters)  # Cuando venzan las del líder anterior
+        else:
+            self.wake_lease_waiters()
+        log(f"\n=== [Nodo {self.node_id}] ¡Soy el nuevo LÍDER! ===")
+        
+        # Notificar a todos (el anuncio trae la primera concesión)
+        grant = self.lease_grant()
+        for n_id in self.membership:
+            if n_id != self.node_id:
+                if self.send_message(n_id, 'victory', self.term, data=grant):
+                    log(f"[Nodo {self.node_id}] Notificado VICTORY a {n_id}")
+
+    def end_election(self):
+        """Registra la duración de la elección en curso, si la hay"""
+        if self.election_in_progress:
+            REGISTRY.histogram('election_seconds').observe(self.runtime.now() - self.election_started)
+        self.election_in_progress = False
+
+    def handle_victory(self, message):
+        """Procesa anuncio de victoria"""
+        self.note_grant(message)
+        # Un anuncio que baja a un líder que el detector no da por caído puede
+        # ser de una elección ya superada: no concede, espera los latidos
+        demotes_live_leader = message['sender_id'] < self.leader_id and self.check_leader()
+        if self.probing:
+            if message['clock'] < self.term and message['sender_id'] < self.leader_id:
+                REGISTRY.counter('stale_victories').inc()
+                return  # Anuncio de una elección ya superada por otra
+            self.term = max(self.term, message['clock'])
+        log(f"[Nodo {self.node_id}] Reconociendo nuevo líder: {message['sender_id']}")
+        self.leader_id = message['sender_id']
+        REGISTRY.gauge('leader', node=self.node_id).set(self.leader_id)
+        self.end_election()
+        if self.election_timer is not None:
+            self.election_timer.cancel()
+        self.detector.watch(self.leader_id, self.runtime.now())
+        
+        # Un nodo menor no puede ser líder mientras este siga activo
+        if self.active and self.leader_id < self.node_id:
+            self.revoke_lease()
+            self.start_election()
+        elif not demotes_live_leader:
+            self.renew_lease(message)
+
+    def handle_ping(self, message):
+        """Responde a ping con un latido que repite su número (y, si este nodo
+        es el líder, renueva la concesión del que preguntó)"""
+        if self.active:
+            grant = self.lease_grant() if self.leader_id == self.node_id else ''
+            self.send_message(message['sender_id'], 'heartbeat', message['clock'], data=grant)
+
+    def handle_heartbeat(self, message):
+        """Registra el latido recibido"""
+        sender = message['sender_id']
+        self.detector.heartbeat(sender, self.runtime.now())
+        self.note_grant(message)
+        # Sondeo: hay pocas elecciones que corrijan a quien perdió un VICTORY.
+        # Solo un líder envía latidos con concesión, así que uno mayor que el
+        # líder conocido ganó una elección de la que este nodo no se enteró
+        if self.probing and message['data'] and self.active and sender > self.leader_id:
+            log(f"[Nodo {self.node_id}] Reconociendo líder por su latido: {sender}")
+            self.leader_id = sender
+            REGISTRY.gauge('leader', node=self.node_id).set(self.leader_id)
+            REGISTRY.counter('leaders_from_heartbeat').inc()
+        self.renew_lease(message)
+
+    # --- Concesiones del líder ---
+
+    def lease_grant(self):
+        """Plazo de concesión que viaja en 'data' de los latidos y VICTORY del
+        líder; vacío mientras puedan seguir vigentes concesiones de otro nodo"""
+        if self.runtime.now() < self.foreign_leases_until:
+            return ''
+        return f"{self.lease_duration:g}"
+
+    def note_grant(self, message):
+        """Recuerda hasta cuándo pueden valer las concesiones que da otro nodo
+        (el plazo completo desde la llegada, sin descontar la deriva)"""
+        if message['data'] and message['sender_id'] != self.node_id:
+            self.foreign_leases_until = max(self.foreign_leases_until,
+                                            self.runtime.now() + float(message['data']))
+
+    def renew_lease(self, message):
+        """Renueva la concesión si el mensaje la trae y viene del líder actual.
+        El plazo se cuenta desde la llegada, descontando la deriva del reloj"""
+        if message['sender_id'] != self.leader_id or not message['data']:
+            return
+        self.lease_holder = message['sender_id']
+        self.lease_expiry = self.runtime.now() + float(message['data']) * (1 - LEASE_DRIFT)
+        self.wake_lease_waiters()
+
+    def revoke_lease(self):
+        self.lease_expiry = 0.0
+        self.lease_holder = None
+
+    def wake_lease_waiters(self):
+        waiters, self.lease_waiters = self.lease_waiters, []
+        for waiter in waiters:
+            waiter()
+
+    def leased_leader(self):
+        """Líder con concesión vigente (este nodo si es el líder) o None"""
+        if not self.active:
+            return None
+        now = self.runtime.now()
+        if self.leader_id == self.node_id:
+            return self.node_id if now >= self.foreign_leases_until else None
+        if self.leader_id == self.lease_holder and now < self.lease_expiry:
+            return self.leader_id
+        return None
+
+    def current_leader(self, timeout=0.0):
+        """ID del líder mientras su concesión esté vigente, sin enviar mensajes.
+        Sin concesión (líder caído o en elección) devuelve None de inmediato
+        con timeout=0, o espera hasta timeout segundos (None: sin límite) a
+        que llegue una; esperar solo es posible con hilos.
+
+        Dos nodos no responden con líderes distintos a la vez siempre que el
+        líder nuevo haya visto las concesiones del anterior (recibe sus
+        latidos como los demás) y la deriva entre relojes no pase de
+        LEASE_DRIFT; si el líder nuevo estaba aislado del anterior, puede
+        haber un solapamiento de hasta un plazo"""
+        with self.lock:
+            leader = self.leased_leader()
+            if leader is not None or timeout == 0:
+                return leader
+            if self.runtime.serial:
+                raise RuntimeError("current_leader bloquea: con asyncio use current_leader_async")
+            renewed = threading.Event()
+            self.lease_waiters.append(renewed.set)
+        renewed.wait(timeout)
+        with self.lock:
+            if renewed.set in self.lease_waiters:
+                self.lease_waiters.remove(renewed.set)
+            return self.leased_leader()
+
+    async def current_leader_async(self, timeout=None):
+        """Como current_leader, pero espera sin bloquear el bucle de eventos"""
+        leader = self.leased_leader()
+        if leader is not None or timeout == 0:
+            return leader
+        renewed = asyncio.get_running_loop().create_future()
+        wake = lambda: renewed.done() or renewed.set_result(True)
+        self.lease_waiters.append(wake)
+        try:
+            await asyncio.wait_for(renewed, timeout)
+        except asyncio.TimeoutError:
+            if wake in self.lease_waiters:
+                self.lease_waiters.remove(wake)
+        return self.leased_leader()
+
+    def join(self):
+        """Anuncia este nodo a los demás miembros e inicia una elección: el nodo
+        que llega puede tener el mayor ID. JOIN y ELECTION viajan por la misma
+        conexión, así que cada par conoce al nodo antes de tener que responderle"""
+        for n_id in self.membership:
+            if n_id != self.node_id:
+                self.send_message(n_id, 'join', data=format_address(self.address))
+        # No vio las concesiones que pueda haber vigentes: si gana, espera un plazo
+        self.foreign_leases_until = self.runtime.now() + self.lease_duration
+        self.start_election()
+
+    def leave(self):
+        """Sale del clúster avisando a los demás miembros"""
+        for n_id in self.membership:
+            if n_id != self.node_id:
+                self.send_message(n_id, 'leave')
+        self.active = False
+        log(f"\n[Nodo {self.node_id}] Saliendo del clúster")
+
+    def handle_join(self, message):
+        """Agrega al clúster al nodo que se anuncia"""
+        self.membership.join(message['sender_id'], parse_address(message['data']))
+
+    def handle_leave(self, message):
+        """Quita al nodo que se va"""
+        self.membership.leave(message['sender_id'])
+
+    def membership_changed(self, event, member_id, address):
+        """Suscrito a la membresía: si sale el líder, elige otro"""
+        if event == 'join':
+            log(f"[Nodo {self.node_id}] Nodo {member_id} se unió al clúster ({len(self.membership)} miembros)")
+            return
+        self.detector.forget(member_id)
+        if member_id == self.leader_id:
+            self.revoke_lease()
+        log(f"[Nodo {self.node_id}] Nodo {member_id} salió del clúster ({len(self.membership)} miembros)")
+        if member_id == self.leader_id and self.active:
+            self.start_election()
+
+    def send_heartbeats(self):
+        """El líder envía latidos periódicos a todos los nodos; cada ronda
+        renueva a la vez las concesiones de todos los seguidores"""
+        if self.active and self.leader_id == self.node_id:
+            grant = self.lease_grant()
+            for n_id in self.membership:
+                if n_id != self.node_id:
+                    self.send_message(n_id, 'heartbeat', data=grant)
+        self.runtime.call_later(self.heartbeat_interval, self.send_heartbeats)
+
+    def monitor_leader(self):
+        """Consulta al detector de fallas; una sospecha inicia una elección"""
+        if self.active and not self.election_in_progress and not self.check_leader():
+            self.suspicions += 1
+            REGISTRY.counter('leader_suspicions').inc()
+            log(f"[Nodo {self.node_id}] ¡Líder {self.leader_id} no responde!")
+            self.revoke_lease()
+            if self.probing:
+                # Todos los seguidores sospechan casi a la vez: empieza ya el más
+                # cercano a la cima y los demás esperan un turno por cada nodo
+                # intermedio, de modo que normalmente les llega su VICTORY antes
+                now = self.runtime.now()
+                rank = sum(1 for n_id in self.membership
+                           if n_id > self.node_id and not self.detector.suspects(n_id, now))
+                if rank:
+                    self.runtime.call_later(self.rtt.timeout() * min(rank, MAX_PROBE_RANK),
+                                            self.start_probe_election, self.leader_id)
+                else:
+                    self.start_election(skip=self.leader_id)
+            else:
+                self.start_election()
+            self.detector.watch(self.leader_id, self.runtime.now())  # No repetir la sospecha
+        self.runtime.call_later(self.heartbeat_interval / 2, self.monitor_leader)
+
+    def check_leader(self):
+        """Verifica si el líder está activo según el detector de fallas"""
+        if self.leader_id == self.node_id:
+            return True
+        return not self.detector.suspects(self.leader_id, self.runtime.now())
+
+    def schedule_behavior(self):
+        """Programa la siguiente ronda con un intervalo aleatorio entre 5-10 segundos"""
+        self.runtime.call_later(self.random.randint(5, 10), self.node_behavior)
+
+    def node_behavior(self):
+        """Comportamiento automático del nodo"""
+        if not self.active:
+            self.schedule_behavior()
+            return
+        
+        # La verificación del líder la hace monitor_leader con los latidos
+        
+        # Simular falla aleatoria (10% de probabilidad, AHORA INCLUYE AL LÍDER)
+        if self.random.random() < self.failure_probability:  # Eliminada la restricción para el líder
+            self.active = False
+            log(f"\n[Nodo {self.node_id}] ¡HE FALLADO!")
+            self.runtime.call_later(self.random.randint(8, 12), self.recover)
+        else:
+            self.schedule_behavior()
+
+    def recover(self):
+        """Vuelve a activar el nodo tras una falla simulada"""
+        self.active = True
+        # Caído no vio las concesiones de otros: si gana, espera un plazo
+        self.foreign_leases_until = self.runtime.now() + self.lease_duration
+        log(f"\n[Nodo {self.node_id}] ¡RECUPERADO!")
+        # Si era el líder, iniciar elección al recuperarse
+        if self.node_id == self.leader_id:
+            self.start_election()
+        self.schedule_behavior()
+
+    def print_status(self):
+        """Muestra estado periódicamente"""
+        if self.active:
+            status = "LÍDER" if self.node_id == self.leader_id else f"seguidor (Líder: {self.leader_id})"
+            log(f"[Nodo {self.node_id}] Estado: {status}")
+        self.runtime.call_later(2, self.print_status)
+
+def main():
+    metrics.configure_from_env()  # PROYECTO2_METRICS_PORT / PROYECTO2_METRICS_FILE
+    parser = argparse.ArgumentParser(description="Nodo del algoritmo del abusón")
+    parser.add_argument('--id', type=int, help="ID del nodo (si falta, se pregunta)")
+    parser.add_argument('--address', help="host:puerto propio si el nodo no figura en el clúster")
+    parser.add_argument('--join', action='store_true',
+                        help="Anunciarse a los miembros existentes al arrancar")
+    parser.add_argument('--probing', action='store_true',
+                        help="Elección por sondeo descendente con términos (O(N) mensajes)")
+    parser.add_argument('--detector', choices=DETECTORS, default='phi',
+                        help="Detector de fallas del líder")
+    add_arguments(parser, nodes=5, base_port=5000)  # Por defecto: nodos 1-5 en los puertos 5001-5005
+    args = parser.parse_args()
+    membership = from_args(args, first_id=1)
+    
+    node_id = args.id
+    if node_id is None:
+        node_id = int(input(f"Ingrese ID del nodo ({', '.join(map(str, membership))}): "))
+    if args.address:
+        membership.join(node_id, parse_address(args.address))
+    if node_id not in membership:
+        print("ID inválido")
+        return
+    
+    print(f"\nIniciando nodo {node_id} en {format_address(membership.address(node_id))} "
+          f"({len(membership)} nodos)")
+    print("----------------------------------------")
+    
+    node = BullyNode(node_id, None, membership, detector=args.detector, probing=args.probing)
+    if args.join:
+        node.join()
+    
+    # El lanzador detiene a los nodos con SIGTERM: salir igual que con Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    
+    # Mantener programa ejecutando
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        node.leave()
+        time.sleep(0.5)  # Dar tiempo a que salgan los LEAVE
+
+if __name__ == '__main__':
+    main()
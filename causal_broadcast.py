@@ -0,0 +1,129 @@
+import threading
+from collections import defaultdict
+import numpy as np
+import wire
+from transport import Transport
+from membership import Membership
+from metrics import log
+from vector_clock import DTYPE, as_counters
+
+class CausalOrder:
+    """Entrega causal de difusiones (Birman-Schiper-Stephenson). El vector de
+    cada mensaje cuenta las difusiones que su emisor había entregado de cada
+    proceso; un mensaje (p, s) se entrega cuando es el siguiente de p y ya se
+    entregó todo lo que p había visto.
+
+    Los mensajes adelantados se guardan por (emisor, secuencia) y, si ya son
+    los siguientes de su emisor, también bajo la primera dependencia que les
+    falta. Cada entrega solo revisa el siguiente mensaje del mismo emisor y
+    los que esperaban justo esa entrega, nunca todo el búfer"""
+
+    def __init__(self, process_id, total_processes):
+        self.process_id = process_id
+        self.delivered = np.zeros(total_processes, dtype=DTYPE)  # Difusiones entregadas de cada proceso
+        self.pending = {}  # {(emisor, secuencia): (vector, mensaje)}
+        self.waiting = defaultdict(list)  # {(k, n): [(emisor, secuencia)]} esperan la entrega n de k
+        self.rechecks = 0  # Veces que se evaluó si un mensaje pendiente podía entregarse
+
+    def broadcast(self, data=''):
+        """Crea la siguiente difusión propia (se entrega localmente en el acto)"""
+        self.delivered[self.process_id] += 1
+        vector = self.delivered.copy()
+        return wire.new_message('causal', self.process_id, int(vector[self.process_id]),
+                                vector=memoryview(vector).cast('B'), data=data)
+
+    def receive(self, message):
+        """Recibe una difusión; devuelve la lista de mensajes que ahora pueden
+        entregarse, en orden causal (vacía si hay que esperar)"""
+        key = (message['sender_id'], message['clock'])
+        if key[1] <= self.delivered[key[0]] or key in self.pending:
+            return []  # Duplicado
+        self.pending[key] = (as_counters(message['vector']), message)
+        delivered = []
+        if key[1] == self.delivered[key[0]] + 1:
+            self.deliver_from(key, delivered)
+        # Si no, lo revisará la entrega del mensaje anterior del mismo emisor
+        return delivered
+
+    def missing_dependency(self, vector, sender):
+        """Primera entrega (k, n) que falta para poder entregar el mensaje, o None"""
+        behind = vector > self.delivered
+        behind[sender] = False
+        indices = np.flatnonzero(behind)
+        if not len(indices):
+            return None
+        k = int(indices[0])
+        return (k, int(vector[k]))
+
+    def deliver_from(self, key, delivered):
+        """Entrega key y, en cascada, los mensajes que su entrega desbloquea"""
+        candidates = [key]
+        while candidates:
+            key = candidates.pop()
+            entry = self.pending.get(key)
+            if entry is None:
+                continue
+            sender, sequence = key
+            if sequence != self.delivered[sender] + 1:
+                continue
+            self.rechecks += 1
+            vector, message = entry
+            dependency = self.missing_dependency(vector, sender)
+            if dependency is not None:
+                self.waiting[dependency].append(key)
+                continue
+
+            del self.pending[key]
+            self.delivered[sender] = sequence
+            delivered.append(message)
+            candidates.extend(self.waiting.pop(key, ()))
+            candidates.append((sender, sequence + 1))
+
+
+class CausalBroadcastServer:
+    def __init__(self, port, process_id, total_processes, peer_ports, on_deliver=None, host='localhost'):
+        """Proceso que difunde mensajes con orden causal. Su único reloj es el
+        vector de entregas del búfer causal (causal.delivered):
+        - port: Puerto de escucha
+        - process_id: Posición propia en el vector
+        - total_processes: Número total de procesos en el sistema
+        - peer_ports: Membership del clúster o {process_id: puerto} en localhost
+        - on_deliver: Función llamada con cada mensaje entregado (por defecto lo imprime)
+        - host: Dirección de escucha"""
+        self.process_id = process_id
+        self.peer_ports = Membership.coerce(peer_ports)
+        self.on_deliver = on_deliver or self.print_delivery
+        self.causal = CausalOrder(process_id, total_processes)
+        # Los mensajes de todas las conexiones y las difusiones propias pasan
+        # de uno en uno por el búfer con este lock, para que on_deliver vea
+        # las entregas en orden causal
+        self.causal_lock = threading.Lock()
+        self.transport = Transport((host, port), self.handle_message, dispatch_lock=self.causal_lock)
+
+    def broadcast(self, data):
+        """Difunde data a todos los procesos respetando el orden causal"""
+        with self.causal_lock:
+            message = self.causal.broadcast(data)
+            payload = wire.encode_frame(message)
+            for pid in self.peer_ports:
+                if pid != self.process_id:
+                    # Solo encola: las conexiones las abre el hilo de cada par
+                    if not self.transport.peer(self.peer_ports.address(pid)).send(payload):
+                        log(f"[Servidor {self.process_id}] Proceso {pid} no alcanzable")
+            self.on_deliver(message)
+        return message
+
+    def handle_message(self, message):
+        """Pasa cada difusión por el búfer causal (el transporte la entrega con causal_lock tomado)"""
+        if message['type'] != 'causal':
+            log(f"[Servidor {self.process_id}] Mensaje {message['type']!r} ignorado")
+            return
+        for ready in self.causal.receive(message):
+            self.on_deliver(ready)
+
+    def close(self):
+        self.transport.close()
+
+    def print_delivery(self, message):
+        log(f"[Servidor {self.process_id}] Entregado de {message['sender_id']} "
+              f"(#{message['clock']}): {message['data']} | Pendientes: {len(self.causal.pending)}")
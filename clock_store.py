@@ -0,0 +1,92 @@
+import itertools
+import threading
+import numpy as np
+from vector_clock import DTYPE, VectorClock, as_counters
+from lamport_clock import LamportClock  # Reexportado: sin NumPy para los scripts de Lamport
+
+# Una franja por cada STRIPE_SIZE posiciones: en franjas más chicas el costo
+# de tomar el lock supera al de la fusión
+STRIPE_SIZE = 8192
+MAX_STRIPES = 16
+
+class StripedVectorClock:
+    """Reloj vectorial compartido por varios hilos. El vector se divide en
+    franjas con un lock cada una, de modo que fusiones simultáneas solo se
+    esperan en la franja que están escribiendo. Ofrece la misma interfaz que
+    DeltaTracker (tick, merge, merge_delta)"""
+
+    def __init__(self, size, process_id, stripes=None, track_updates=False):
+        """- size: Número de procesos
+        - process_id: Posición propia en el vector
+        - stripes: Número de franjas (y de locks); por defecto una cada
+          STRIPE_SIZE posiciones, hasta MAX_STRIPES
+        - track_updates: Registrar last_update como DeltaTracker (solo hace
+          falta si este reloj envía deltas; cuesta una pasada extra por fusión)"""
+        self.clock = VectorClock.zeros(size)
+        self.process_id = process_id
+        self.last_update = np.zeros(size, dtype=DTYPE) if track_updates else None
+        if stripes is None:
+            stripes = min(MAX_STRIPES, size // STRIPE_SIZE)
+        stripes = max(1, min(stripes, size))
+        self.bounds = np.linspace(0, size, stripes + 1).astype(np.intp)
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.slices = [slice(low, high) for low, high in zip(self.bounds, self.bounds[1:])]
+        self.rotation = itertools.count()  # Franja inicial de cada fusión (next() es atómico)
+
+    def stripe(self, index):
+        """Franja que contiene la posición index"""
+        return int(np.searchsorted(self.bounds, index, side='right')) - 1
+
+    def tick(self):
+        """Evento local: incrementa la posición propia; devuelve su valor"""
+        counters = self.clock.counters
+        with self.locks[self.stripe(self.process_id)]:
+            counters[self.process_id] += 1
+            own = counters[self.process_id]
+            if self.last_update is not None:
+                self.last_update[self.process_id] = own
+            return own
+
+    def merge(self, received_vector):
+        """Evento de recepción con un vector completo, franja por franja.
+        Cada fusión empieza por una franja distinta para que los hilos no
+        avancen en fila detrás del mismo lock"""
+        received = as_counters(received_vector)
+        own = self.tick()
+        counters = self.clock.counters
+        stripes = len(self.locks)
+        first = next(self.rotation) % stripes
+        for stripe in range(first, first + stripes):
+            stripe %= stripes
+            part = self.slices[stripe]
+            incoming, current = received[part], counters[part]
+            with self.locks[stripe]:
+                if self.last_update is not None:
+                    np.copyto(self.last_update[part], own, where=incoming > current)
+                np.maximum(current, incoming, out=current)
+
+    def merge_delta(self, entries):
+        """Evento de recepción con pares (índice, valor); solo se bloquean
+        las franjas que contienen alguna de las posiciones recibidas"""
+        pairs = as_counters(entries)
+        indices, values = pairs[0::2].astype(np.intp), pairs[1::2]
+        own = self.tick()
+        counters = self.clock.counters
+        stripes = np.searchsorted(self.bounds, indices, side='right') - 1
+        for stripe in np.unique(stripes):
+            selected = stripes == stripe
+            stripe_indices, stripe_values = indices[selected], values[selected]
+            with self.locks[stripe]:
+                changed = stripe_values > counters[stripe_indices]
+                stripe_indices = stripe_indices[changed]
+                counters[stripe_indices] = stripe_values[changed]
+                if self.last_update is not None:
+                    self.last_update[stripe_indices] = own
+
+    def snapshot(self):
+        """Copia sin locks. No es un corte consistente entre franjas, pero
+        cada posición tiene un valor que el reloj tuvo durante la copia"""
+        return VectorClock(self.clock.counters.copy())
+
+    def __repr__(self):
+        return repr(self.clock)
@@ -0,0 +1,407 @@
+import argparse
+import bisect
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import numpy as np
+from vector_clock import DTYPE, as_counters
+from metrics import REGISTRY
+
+# Tipos de evento
+INTERNAL = 0
+RECEIVE = 1
+SEND = 2
+KIND_NAMES = {INTERNAL: 'interno', RECEIVE: 'recepción', SEND: 'envío'}
+
+# Cabecera de cada segmento: firma, versión, proceso, ancho del vector,
+# tamaño de registro y registros confirmados (los que ven los lectores)
+MAGIC = b'P2EVLOG1'
+HEADER = struct.Struct('<8sIIIIQ')
+COUNT = struct.Struct('<Q')
+COUNT_OFFSET = 24
+HEADER_SIZE = 64  # Los registros empiezan alineados
+VERSION = 1
+
+SEGMENT_BYTES = 64 << 20
+SEGMENT_NAME = re.compile(r'^(\d+)-(\d+)\.seg$')
+
+def record_dtype(width):
+    """Registro de ancho fijo: instante, tipo, proceso del que llegó el
+    mensaje (o el propio) y el reloj vectorial del evento"""
+    return np.dtype([('time', '<f8'), ('kind', '<u4'), ('peer', '<u4'), ('vector', DTYPE, (width,))])
+
+def segment_path(directory, process, index):
+    return os.path.join(directory, f"{process:06d}-{index:06d}.seg")
+
+def list_segments(directory):
+    """[(proceso, índice, ruta)] de los segmentos del directorio, en orden"""
+    found = []
+    for name in os.listdir(directory):
+        match = SEGMENT_NAME.match(name)
+        if match:
+            found.append((int(match[1]), int(match[2]), os.path.join(directory, name)))
+    return sorted(found)
+
+
+class Segment:
+    """Archivo de segmento proyectado en memoria: cabecera y hasta capacity
+    registros. Los arreglos son vistas del archivo, sin copias"""
+
+    def __init__(self, path, writable=False):
+        self.path = path
+        with open(path, 'r+b' if writable else 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, self.process, self.width, record_size, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: no es un segmento del registro de eventos")
+        dtype = record_dtype(self.width)
+        if record_size != dtype.itemsize:
+            raise ValueError(f"{path}: registros de {record_size} bytes, se esperaban {dtype.itemsize}")
+        self.capacity = (len(self.map) - HEADER_SIZE) // record_size
+        self.records = np.frombuffer(self.map, dtype, self.capacity, HEADER_SIZE)
+        self.times, self.kinds = self.records['time'], self.records['kind']
+        self.peers, self.vectors = self.records['peer'], self.records['vector']
+
+    @classmethod
+    def create(cls, path, process, width, capacity):
+        dtype = record_dtype(width)
+        with open(path, 'xb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, process, width, dtype.itemsize, 0).ljust(HEADER_SIZE, b'\0'))
+            f.truncate(HEADER_SIZE + capacity * dtype.itemsize)  # Disperso: ocupa disco a medida que se escribe
+        return cls(path, writable=True)
+
+    def committed(self):
+        """Registros confirmados según la cabecera (la escribe otro proceso)"""
+        return COUNT.unpack_from(self.map, COUNT_OFFSET)[0]
+
+    def commit(self):
+        COUNT.pack_into(self.map, COUNT_OFFSET, self.count)
+
+    def close(self):
+        self.records = self.times = self.kinds = self.peers = self.vectors = None
+        self.map.close()
+
+
+class EventLog:
+    """Registro de eventos de un proceso, solo de agregado, en segmentos
+    proyectados en memoria dentro de directory. Cada evento es un registro
+    de ancho fijo con el reloj vectorial que el proceso tenía tras él.
+
+    Los registros se escriben directamente en el archivo y se confirman en
+    lotes: la cabecera, que es lo que leen los demás procesos, se actualiza
+    cada batch eventos o al llamar a commit(). Al reabrir el directorio se
+    sigue agregando tras el último registro confirmado.
+
+    Las consultas de CausalIndex suponen que cada evento registrado
+    incrementa la posición propia del vector, de modo que (proceso, V[proceso])
+    identifica al evento"""
+
+    def __init__(self, directory, process, width, segment_bytes=SEGMENT_BYTES, batch=1024):
+        """- process: Posición propia en el vector (un registro por proceso)
+        - width: Número de posiciones del vector
+        - segment_bytes: Tamaño de cada archivo de segmento
+        - batch: Eventos entre confirmaciones de la cabecera"""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.process = process
+        self.width = width
+        self.capacity = max(1, (segment_bytes - HEADER_SIZE) // record_dtype(width).itemsize)
+        self.batch = batch
+        self.pending = 0  # Eventos escritos y aún no confirmados
+        self.lock = threading.Lock()  # Varios hilos pueden agregar a la vez
+
+        own = [(index, path) for process_id, index, path in list_segments(directory) if process_id == process]
+        if own:
+            self.index, path = own[-1]
+            self.segment = Segment(path, writable=True)
+            if self.segment.width != width:
+                raise ValueError(f"{path}: vectores de {self.segment.width} posiciones, no {width}")
+        else:
+            self.index = 0
+            self.segment = Segment.create(segment_path(directory, process, 0), process, width, self.capacity)
+
+    def next_segment(self):
+        """Confirma el segmento lleno y abre el siguiente"""
+        self.segment.commit()
+        self.segment.close()
+        self.index += 1
+        self.segment = Segment.create(segment_path(self.directory, self.process, self.index),
+                                      self.process, self.width, self.capacity)
+        return self.segment
+
+    def append(self, kind, vector, peer=None):
+        """Agrega un evento con su reloj vectorial (VectorClock.counters, lista o bytes)"""
+        with self.lock:
+            segment = self.segment
+            if segment.count == segment.capacity:
+                segment = self.next_segment()
+            i = segment.count
+            segment.vectors[i] = as_counters(vector)
+            segment.times[i] = time.time()
+            segment.kinds[i] = kind
+            segment.peers[i] = self.process if peer is None else peer
+            segment.count = i + 1
+            self.pending += 1
+            if self.pending >= self.batch:
+                self.commit_locked()
+
+    def append_many(self, kind, vectors, peers=None):
+        """Agrega varios eventos seguidos; vectors tiene una fila por evento"""
+        vectors = np.asarray(vectors)
+        now = time.time()
+        with self.lock:
+            done = 0
+            while done < len(vectors):
+                segment = self.segment
+                if segment.count == segment.capacity:
+                    segment = self.next_segment()
+                n = min(len(vectors) - done, segment.capacity - segment.count)
+                rows = slice(segment.count, segment.count + n)
+                segment.vectors[rows] = vectors[done:done + n]
+                segment.times[rows] = now
+                segment.kinds[rows] = kind
+                segment.peers[rows] = self.process if peers is None else peers[done:done + n]
+                segment.count += n
+                done += n
+            self.pending += len(vectors)
+            if self.pending >= self.batch:
+                self.commit_locked()
+
+    def commit(self):
+        """Hace visibles a los lectores los eventos agregados hasta ahora"""
+        with self.lock:
+            self.commit_locked()
+
+    def commit_locked(self):
+        self.segment.commit()
+        REGISTRY.counter('event_log_records', process=self.process).inc(self.pending)
+        self.pending = 0
+
+    def flush(self):
+        """Confirma y baja a disco el segmento actual"""
+        with self.lock:
+            self.commit_locked()
+            self.segment.map.flush()
+
+    def close(self):
+        self.flush()
+        self.segment.close()
+
+
+class Stream:
+    """Los eventos de un proceso en orden, repartidos en sus segmentos. En
+    cualquier columna del vector los valores no decrecen a lo largo del
+    flujo, así que se buscan por bisección"""
+
+    def __init__(self):
+        self.segments = []
+        self.offsets = [0]  # Posición del primer evento de cada segmento; la última es el total
+
+    def __len__(self):
+        return self.offsets[-1]
+
+    def recount(self):
+        for segment in self.segments:
+            segment.count = segment.committed()
+        self.offsets = [0]
+        for segment in self.segments:
+            self.offsets.append(self.offsets[-1] + segment.count)
+
+    def locate(self, position):
+        """(segmento, fila) del evento en la posición dada"""
+        k = bisect.bisect_right(self.offsets, position) - 1
+        return self.segments[k], position - self.offsets[k]
+
+    def vector(self, position):
+        segment, row = self.locate(position)
+        return segment.vectors[row].copy()
+
+    def search(self, column, value, side='left'):
+        """Cantidad de eventos con vector[column] < value (side='left') o
+        <= value (side='right')"""
+        right = side == 'right'
+        for k, segment in enumerate(self.segments):
+            if not segment.count:
+                continue
+            last = segment.vectors[segment.count - 1, column]
+            if last > value or (not right and last == value):
+                values = segment.vectors[:segment.count, column]  # Vista con paso, sin copia
+                find = bisect.bisect_right if right else bisect.bisect_left
+                return self.offsets[k] + find(values, value)
+        return len(self)
+
+    def records(self, start, stop):
+        """Copia de los registros entre las posiciones start y stop"""
+        parts = []
+        for k, segment in enumerate(self.segments):
+            low = max(start, self.offsets[k]) - self.offsets[k]
+            high = min(stop, self.offsets[k + 1]) - self.offsets[k]
+            if low < high:
+                parts.append(segment.records[low:high])
+        if not parts:
+            return np.empty(0, dtype=self.segments[0].records.dtype)
+        return np.concatenate(parts)
+
+
+class CausalIndex:
+    """Consultas de causalidad sobre los registros de un directorio (de uno o
+    varios procesos con vectores del mismo ancho), sin cargarlos en memoria.
+    Un evento se identifica con (proceso, contador): su posición propia del
+    vector. Todas las consultas usan bisección sobre columnas del vector
+    proyectadas desde los archivos:
+    - a ocurrió antes que b si V_b[p_a] >= V_a[p_a]
+    - la historia causal de x son, en cada proceso q, los eventos con
+      V[q] <= V_x[q]: un prefijo del flujo de q
+    - los eventos de q concurrentes con x son los que siguen a ese prefijo
+      y tienen V[p_x] < V_x[p_x]: un tramo contiguo del flujo de q"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.streams = {}  # {proceso: Stream}
+        self.paths = set()
+        self.width = None
+        self.refresh()
+
+    def refresh(self):
+        """Incorpora los segmentos nuevos y los eventos confirmados desde la última vez"""
+        for process, index, path in list_segments(self.directory):
+            if path in self.paths or os.path.getsize(path) < HEADER_SIZE:
+                continue  # Ya abierto, o recién creado y sin cabecera todavía
+            segment = Segment(path)
+            if self.width is None:
+                self.width = segment.width
+            elif segment.width != self.width:
+                segment.close()
+                raise ValueError(f"{path}: vectores de {segment.width} posiciones, no {self.width}")
+            self.streams.setdefault(process, Stream()).segments.append(segment)
+            self.paths.add(path)
+        for stream in self.streams.values():
+            stream.recount()
+
+    def __len__(self):
+        return sum(len(stream) for stream in self.streams.values())
+
+    def processes(self):
+        return sorted(self.streams)
+
+    def position(self, event):
+        """Posición del evento (proceso, contador) en el flujo de su proceso"""
+        process, counter = event
+        stream = self.streams.get(process)
+        if stream is not None:
+            position = stream.search(process, counter)
+            if position < len(stream) and stream.vector(position)[process] == counter:
+                return position
+        raise KeyError(f"No hay evento {process}:{counter} en {self.directory}")
+
+    def vector(self, event):
+        """Reloj vectorial del evento (copia)"""
+        return self.streams[event[0]].vector(self.position(event))
+
+    def event(self, event):
+        """Registro completo del evento: time, kind, peer y vector"""
+        position = self.position(event)
+        return self.streams[event[0]].records(position, position + 1)[0]
+
+    def happened_before(self, a, b):
+        """¿El evento a ocurrió antes que el evento b?"""
+        self.position(a)
+        return a != b and self.vector(b)[a[0]] >= a[1]
+
+    def concurrent_with(self, a, b):
+        return a != b and not self.happened_before(a, b) and not self.happened_before(b, a)
+
+    def history(self, event):
+        """{proceso: n}: los primeros n eventos de cada proceso ocurrieron
+        antes que event (event no se cuenta)"""
+        vector = self.vector(event)
+        result = {}
+        for process, stream in self.streams.items():
+            count = stream.search(process, vector[process], side='right')
+            if process == event[0]:
+                count -= 1
+            if count:
+                result[process] = count
+        return result
+
+    def concurrent(self, event):
+        """{proceso: (inicio, fin)}: posiciones de los eventos de cada proceso
+        concurrentes con event"""
+        vector = self.vector(event)
+        process_x, counter_x = event
+        result = {}
+        for process, stream in self.streams.items():
+            if process == process_x:
+                continue  # Los eventos de un mismo proceso están ordenados
+            start = stream.search(process, vector[process], side='right')
+            stop = stream.search(process_x, counter_x)
+            if start < stop:
+                result[process] = (start, stop)
+        return result
+
+    def records(self, process, start=0, stop=None):
+        """Copia de los registros de process entre las posiciones start y stop"""
+        stream = self.streams[process]
+        return stream.records(start, len(stream) if stop is None else stop)
+
+    def close(self):
+        for stream in self.streams.values():
+            for segment in stream.segments:
+                segment.close()
+        self.streams.clear()
+        self.paths.clear()
+
+
+def parse_event(text):
+    """'proceso:contador' -> (proceso, contador)"""
+    process, _, counter = text.partition(':')
+    return int(process), int(counter)
+
+def describe(record):
+    vector = record['vector']
+    shown = vector.tolist() if len(vector) <= 16 else f"{vector[:16].tolist()}... ({len(vector)} posiciones)"
+    return (f"{time.strftime('%H:%M:%S', time.localtime(record['time']))} "
+            f"{KIND_NAMES.get(int(record['kind']), record['kind'])} de {record['peer']} {shown}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas sobre un registro de eventos causales")
+    parser.add_argument('directory')
+    parser.add_argument('event', nargs='?', type=parse_event, help="proceso:contador")
+    parser.add_argument('--before', type=parse_event, metavar='EVENTO', help="¿event ocurrió antes que EVENTO?")
+    parser.add_argument('--history', action='store_true', help="Historia causal de event")
+    parser.add_argument('--concurrent', action='store_true', help="Eventos concurrentes con event")
+    args = parser.parse_args()
+
+    index = CausalIndex(args.directory)
+    if args.event is None:
+        print(f"{len(index)} eventos, vectores de {index.width} posiciones")
+        for process in index.processes():
+            print(f"  proceso {process}: {len(index.streams[process])} eventos")
+        return
+    print(f"{args.event[0]}:{args.event[1]} {describe(index.event(args.event))}")
+    if args.before is not None:
+        if index.happened_before(args.event, args.before):
+            relation = "ocurrió antes que"
+        elif index.happened_before(args.before, args.event):
+            relation = "ocurrió después de"
+        else:
+            relation = "es concurrente con" if args.event != args.before else "es"
+        print(f"{args.event[0]}:{args.event[1]} {relation} {args.before[0]}:{args.before[1]}")
+    if args.history:
+        history = index.history(args.event)
+        print(f"Historia causal: {sum(history.values())} eventos")
+        for process, count in sorted(history.items()):
+            print(f"  proceso {process}: los primeros {count}")
+    if args.concurrent:
+        ranges = index.concurrent(args.event)
+        print(f"Concurrentes: {sum(stop - start for start, stop in ranges.values())} eventos")
+        for process, (start, stop) in sorted(ranges.items()):
+            records = index.records(process, start, min(stop, start + 3))
+            first = records['vector'][:, process].tolist()
+            print(f"  proceso {process}: posiciones {start}-{stop - 1} (contadores {first}...)")
+
+if __name__ == '__main__':
+    main()
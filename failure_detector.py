@@ -0,0 +1,110 @@
+import math
+from collections import deque
+
+class TimeoutDetector:
+    def __init__(self, timeout=3.0):
+        """Detector por tiempo límite: sospecha de un par si pasan más de
+        timeout segundos sin recibir su latido"""
+        self.timeout = timeout
+        self.last_seen = {}  # {par: instante del último latido}
+
+    def watch(self, peer, now):
+        """Empieza (o reinicia) la vigilancia de peer a partir de now"""
+        self.last_seen[peer] = now
+
+    def forget(self, peer):
+        self.last_seen.pop(peer, None)
+
+    def heartbeat(self, peer, now):
+        self.last_seen[peer] = now
+
+    def suspicion(self, peer, now):
+        """Nivel de sospecha: segundos sin latido en unidades de timeout"""
+        if peer not in self.last_seen:
+            return 0.0
+        return (now - self.last_seen[peer]) / self.timeout
+
+    def suspects(self, peer, now):
+        return self.suspicion(peer, now) >= 1.0
+
+
+class PhiAccrualDetector:
+    def __init__(self, threshold=8.0, window=100, expected_interval=1.0, min_std=0.05,
+                 acceptable_pause=0.0):
+        """Detector phi-accrual (Hayashibara et al.): estima la distribución de
+        los intervalos entre latidos y devuelve phi = -log10(P(llegar más tarde))
+        - threshold: phi a partir del cual se sospecha del par
+        - window: Cantidad de intervalos recordados por par
+        - expected_interval: Intervalo supuesto antes de tener muestras
+        - min_std: Desviación mínima (segundos) para tolerar variaciones pequeñas
+        - acceptable_pause: Retraso adicional que se tolera sin aumentar phi"""
+        self.threshold = threshold
+        self.window = window
+        self.expected_interval = expected_interval
+        self.min_std = min_std
+        self.acceptable_pause = acceptable_pause
+        self.last_seen = {}  # {par: instante del último latido}
+        self.intervals = {}  # {par: deque de intervalos}
+
+    def watch(self, peer, now):
+        """Empieza (o reinicia) la vigilancia de peer a partir de now"""
+        self.last_seen[peer] = now
+        self.intervals[peer] = deque([self.expected_interval], maxlen=self.window)
+
+    def forget(self, peer):
+        self.last_seen.pop(peer, None)
+        self.intervals.pop(peer, None)
+
+    def heartbeat(self, peer, now):
+        if peer not in self.last_seen:
+            self.watch(peer, now)
+            return
+        self.intervals[peer].append(now - self.last_seen[peer])
+        self.last_seen[peer] = now
+
+    def suspicion(self, peer, now):
+        """Valor de phi para peer en el instante now"""
+        if peer not in self.last_seen:
+            return 0.0
+        samples = self.intervals[peer]
+        mean = sum(samples) / len(samples)
+        variance = sum((x - mean) ** 2 for x in samples) / len(samples)
+        std = max(math.sqrt(variance), self.min_std)
+        y = (now - self.last_seen[peer] - mean - self.acceptable_pause) / std
+        p_later = 0.5 * math.erfc(y / math.sqrt(2))  # Cola de la distribución normal
+        return -math.log10(max(p_later, 1e-300))
+
+    def suspects(self, peer, now):
+        return self.suspicion(peer, now) >= self.threshold
+
+
+class RttEstimator:
+    def __init__(self, initial=1.0, minimum=0.05, maximum=2.0):
+        """Estima el tiempo de ida y vuelta con medias móviles (como el RTO de
+        TCP) y deriva de él un tiempo de espera acotado entre minimum y maximum
+        - initial: Tiempo de espera antes de tener muestras"""
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.srtt = None  # Media suavizada
+        self.rttvar = None  # Variación suavizada
+
+    def sample(self, rtt):
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    def timeout(self):
+        if self.srtt is None:
+            return self.initial
+        return min(self.maximum, max(self.minimum, self.srtt + 4 * self.rttvar))
+
+
+# Detectores por nombre (BullyNode y la opción --detector), construidos a
+# partir del intervalo entre latidos
+DETECTORS = {
+    'timeout': lambda interval: TimeoutDetector(timeout=3 * interval),
+    'phi': lambda interval: PhiAccrualDetector(expected_interval=interval, acceptable_pause=interval),
+}
@@ -1,35 +1,124 @@
-import socket
-import time
-import random
-
-reloj_logico = 0
-
-def evento_interno():
-    global reloj_logico
-    reloj_logico += 1
-    print(f"\n[Cliente] Evento interno | Reloj: {reloj_logico} (+1)")
-
-def enviar_mensaje():
-    global reloj_logico
-    reloj_logico += 1
-    print(f"\n[Cliente] Enviando mensaje | Reloj: {reloj_logico} (+1)")
-    
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.connect(("localhost", 9099))
-        s.send(str(reloj_logico).encode())
-        print(f"[Cliente] Mensaje enviado con reloj: {reloj_logico}")
-        s.close()
-    except Exception as e:
-        print(f"[Cliente] Error al conectar: {e}")
-
-
-print("[Cliente] Iniciando simulación...")
-for i in range(5):
-    time.sleep(random.randint(1, 3))
-    accion = random.choice(["interno", "enviar"])
-    if accion == "interno":
-        evento_interno()
-    else:
-        enviar_mensaje()
-print("[Cliente] Simulación completada.")
+import argparse
+import socket
+import threading
+import time
+import random
+try:
+    import numpy as np  # Solo el generador de carga por lotes usa NumPy
+except ImportError:
+    np = None
+import wire
+from lamport_clock import LamportClock
+from metrics import log
+
+ID_CLIENTE = 1
+HOST = "localhost"
+PUERTO = 9099
+reloj_logico = LamportClock()  # Lo comparten el hilo que envía y el que lee respuestas
+
+def evento_interno():
+    nuevo = reloj_logico.tick()
+    log(f"\n[Cliente] Evento interno | Reloj: {nuevo} (+1)")
+
+def enviar_mensaje():
+    nuevo = reloj_logico.tick()
+    log(f"\n[Cliente] Enviando mensaje | Reloj: {nuevo} (+1)")
+    
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.connect((HOST, PUERTO))
+        wire.send_message(s, wire.new_message('clock', ID_CLIENTE, nuevo))
+        log(f"[Cliente] Mensaje enviado con reloj: {nuevo}")
+        s.close()
+    except Exception as e:
+        log(f"[Cliente] Error al conectar: {e}")
+
+def conectar(puerto=PUERTO, host=None):
+    """Abre una conexión persistente con el servidor"""
+    s = socket.create_connection((host or HOST, puerto))
+    s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return s
+
+def mensaje_lote(marcas, respuesta=False):
+    """Un solo mensaje 'clock_batch' con la marca de cada evento"""
+    marcas = np.asarray(marcas, dtype='<u8')
+    return wire.new_message('clock_batch', ID_CLIENTE, vector=memoryview(marcas).cast('B'),
+                            data='reply' if respuesta else '')
+
+def leer_respuestas(stream, esperadas):
+    """Aplica la regla de Lamport a cada respuesta del servidor"""
+    for _ in range(esperadas):
+        payload = wire.read_frame(stream)
+        if payload is None:
+            return
+        reloj_logico.update(wire.decode(payload)['clock'])
+
+def generar_carga(eventos, lote=1000, puerto=PUERTO, host=None):
+    """Generador de carga: produce eventos con marca de tiempo y los envía por
+    una sola conexión sin esperar respuesta entre envíos (pipelining).
+    - lote > 1: lotes de 'lote' eventos por mensaje, cada uno con respuesta
+    - lote = 1: un mensaje por evento, agrupados en las escrituras del búfer;
+      solo el último pide respuesta
+    Devuelve los eventos por segundo, contando hasta la última respuesta"""
+    if eventos <= 0 or lote <= 0:
+        raise ValueError(f"eventos y lote deben ser positivos (eventos={eventos}, lote={lote})")
+    if lote > 1 and np is None:
+        raise ImportError("Los lotes requieren NumPy (pip install numpy); use --lote 1")
+    s = conectar(puerto, host)
+    mensajes = -(-eventos // lote)
+    esperadas = mensajes if lote > 1 else 1
+    lector = threading.Thread(target=leer_respuestas, args=(s.makefile('rb'), esperadas))
+    lector.start()
+    inicio = time.perf_counter()
+    with s.makefile('wb') as salida:
+        if lote > 1:
+            for i in range(mensajes):
+                marcas = reloj_logico.tick_many(min(lote, eventos - i * lote))
+                salida.write(wire.encode_frame(mensaje_lote(marcas, respuesta=True)))
+        else:
+            for i in range(eventos):
+                respuesta = 'reply' if i == eventos - 1 else ''
+                mensaje = wire.new_message('clock', ID_CLIENTE, reloj_logico.tick(), data=respuesta)
+                salida.write(wire.encode_frame(mensaje))
+    lector.join()
+    segundos = time.perf_counter() - inicio
+    s.close()
+    return eventos / segundos
+
+def entero_positivo(texto):
+    """Tipo de argparse: entero mayor que cero"""
+    try:
+        valor = int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"no es un entero: {texto}")
+    if valor <= 0:
+        raise argparse.ArgumentTypeError(f"debe ser mayor que cero: {texto}")
+    return valor
+
+def simular():
+    log("[Cliente] Iniciando simulación...")
+    for i in range(5):
+        time.sleep(random.randint(1, 3))
+        accion = random.choice(["interno", "enviar"])
+        if accion == "interno":
+            evento_interno()
+        else:
+            enviar_mensaje()
+    log("[Cliente] Simulación completada.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cliente del reloj de Lamport")
+    parser.add_argument('--carga', type=entero_positivo,
+                        help="Modo generador de carga: número de eventos a enviar")
+    parser.add_argument('--lote', type=entero_positivo, default=1000, help="Eventos por mensaje en modo carga")
+    parser.add_argument('--host', default=HOST, help="Host del servidor")
+    parser.add_argument('--puerto', type=int, default=PUERTO)
+    args = parser.parse_args()
+    HOST = args.host
+    PUERTO = args.puerto
+    if args.carga:
+        tasa = generar_carga(args.carga, args.lote, args.puerto)
+        print(f"[Cliente] {args.carga} eventos enviados | {tasa:,.0f} eventos/s | Reloj: {reloj_logico.value}")
+    else:
+        simular()
@@ -0,0 +1,44 @@
+import threading
+try:
+    import numpy as np  # Solo los lotes (tick_many, update_many) usan NumPy
+except ImportError:
+    np = None
+
+class LamportClock:
+    """Reloj de Lamport compartido por varios hilos: cada actualización es
+    atómica y la lectura de value no toma el lock"""
+
+    def __init__(self, value=0):
+        self.value = value  # Un int se lee y se reemplaza de forma atómica
+        self.lock = threading.Lock()
+
+    def tick(self):
+        """Evento local; devuelve el nuevo valor"""
+        with self.lock:
+            self.value += 1
+            return self.value
+
+    def tick_many(self, count):
+        """count eventos locales seguidos; devuelve sus marcas"""
+        with self.lock:
+            first = self.value + 1
+            self.value += count
+        return np.arange(first, first + count, dtype=np.int64)
+
+    def update(self, remote):
+        """Regla de Lamport para un reloj recibido; devuelve el nuevo valor"""
+        with self.lock:
+            self.value = max(self.value, remote) + 1
+            return self.value
+
+    def update_many(self, remotes):
+        """Aplica la regla de Lamport a varios relojes recibidos, en orden, con
+        una sola toma del lock; devuelve la marca asignada a cada evento"""
+        remotes = np.asarray(remotes, dtype=np.int64)
+        steps = np.arange(1, len(remotes) + 1, dtype=np.int64)
+        with self.lock:
+            # v_k = max(v_k-1, r_k) + 1 equivale a v_k = k + max(v_0, max_{j<=k}(r_j - j + 1))
+            stamps = np.maximum.accumulate(np.maximum(remotes - steps + 1, self.value)) + steps
+            if len(stamps):
+                self.value = int(stamps[-1])
+        return stamps
@@ -1,29 +1,115 @@
-import socket
-import threading
-
-reloj_logico = 0
-
-def manejar_cliente(conn, addr):
-    global reloj_logico
-    print(f"\n[Servidor] Conexión entrante de {addr} | Reloj actual: {reloj_logico}")
-    
-    reloj_remoto = int(conn.recv(1024).decode())
-    print(f"[Servidor] Reloj recibido del cliente: {reloj_remoto}")
-    
-    reloj_logico = max(reloj_logico, reloj_remoto) + 1
-    print(f"[Servidor] Reloj actualizado: {reloj_logico} (max({reloj_logico}, {reloj_remoto}) + 1)")
-    
-    conn.close()
-
-def iniciar_servidor(puerto):
-    servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    servidor.bind(("localhost", puerto))
-    servidor.listen()
-    print(f"[Servidor] Escuchando en puerto {puerto}...")
-
-    while True:
-        conn, addr = servidor.accept()
-        threading.Thread(target=manejar_cliente, args=(conn, addr)).start()
-
-
-iniciar_servidor(9099)
+import argparse
+import socket
+import threading
+import wire
+from lamport_clock import LamportClock
+try:
+    from vector_clock import as_counters  # Solo los lotes ('clock_batch') usan NumPy
+except ImportError:
+    as_counters = None
+import metrics
+from metrics import REGISTRY, log
+
+# Compartido por los hilos de todas las conexiones; cada actualización es atómica
+reloj_logico = LamportClock()
+
+# Registro de eventos opcional (abrir_registro): vectores de una posición con
+# la marca de Lamport de cada evento. La marca y su escritura en el registro
+# van bajo un mismo lock para que los eventos queden en orden
+registro = None
+registro_lock = threading.Lock()
+RECEIVE = None  # event_log.RECEIVE; event_log (y NumPy) se cargan al abrir el registro
+
+def abrir_registro(directorio):
+    global registro, RECEIVE
+    import event_log
+    RECEIVE = event_log.RECEIVE
+    registro = event_log.EventLog(directorio, 0, 1)
+    return registro
+
+def actualizar_reloj(reloj_remoto):
+    """Aplica la regla de Lamport a un reloj recibido"""
+    log(f"[Servidor] Reloj recibido del cliente: {reloj_remoto}")
+    
+    if registro is None:
+        nuevo = reloj_logico.update(reloj_remoto)
+    else:
+        with registro_lock:
+            nuevo = reloj_logico.update(reloj_remoto)
+            registro.append(RECEIVE, (nuevo,))
+    REGISTRY.counter('lamport_events').inc()
+    REGISTRY.gauge('lamport_server_clock').set(nuevo)
+    log(f"[Servidor] Reloj actualizado: {nuevo} (max(local, {reloj_remoto}) + 1)")
+    return nuevo
+
+def actualizar_lote(relojes_remotos):
+    """Aplica la regla de Lamport a cada evento de un lote, en orden"""
+    if registro is None:
+        marcas = reloj_logico.update_many(relojes_remotos)
+    else:
+        with registro_lock:
+            marcas = reloj_logico.update_many(relojes_remotos)
+            registro.append_many(RECEIVE, marcas[:, None])
+    REGISTRY.counter('lamport_events').inc(len(marcas))
+    REGISTRY.gauge('lamport_server_clock').set(reloj_logico.value)
+    if len(marcas):
+        log(f"[Servidor] Lote de {len(marcas)} eventos | Reloj actualizado: {marcas[-1]}")
+    return reloj_logico.value
+
+def procesar_mensaje(mensaje):
+    """Aplica un mensaje 'clock' (un evento) o 'clock_batch' (varios eventos).
+    Si el cliente pide respuesta (data='reply') devuelve un mensaje 'clock'
+    con el reloj actualizado; si no, devuelve None"""
+    if mensaje['type'] == 'clock_batch':
+        if as_counters is None:
+            raise ValueError("los lotes requieren NumPy en el servidor")
+        nuevo = actualizar_lote(as_counters(mensaje['vector']))
+    else:
+        nuevo = actualizar_reloj(mensaje['clock'])
+    if mensaje['data'] == 'reply':
+        return wire.new_message('clock', 0, nuevo)
+    return None
+
+def manejar_cliente(conn, addr):
+    log(f"\n[Servidor] Conexión entrante de {addr} | Reloj actual: {reloj_logico.value}")
+    
+    # Una conexión puede traer muchos mensajes seguidos (sin esperar respuesta)
+    with conn, conn.makefile('rb') as stream:
+        try:
+            for mensaje in wire.read_messages(stream, raw_vector=True):
+                respuesta = procesar_mensaje(mensaje)
+                if respuesta is not None:
+                    wire.send_message(conn, respuesta)
+        except ValueError as e:
+            log(f"[Servidor] Mensaje inválido de {addr}: {e}")
+        except OSError:
+            pass  # El cliente cerró la conexión sin leer las respuestas
+    if registro is not None:
+        registro.commit()  # Fin de la conexión: confirmar su último lote
+
+def iniciar_servidor(puerto, host="localhost"):
+    servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    servidor.bind((host, puerto))
+    servidor.listen()
+    log(f"[Servidor] Escuchando en puerto {puerto}...")
+
+    while True:
+        conn, addr = servidor.accept()
+        threading.Thread(target=manejar_cliente, args=(conn, addr)).start()
+
+
+if __name__ == '__main__':
+    metrics.configure_from_env()
+    parser = argparse.ArgumentParser(description="Servidor del reloj de Lamport")
+    parser.add_argument('--host', default="localhost", help="Dirección de escucha (0.0.0.0: todas)")
+    parser.add_argument('--puerto', type=int, default=9099)
+    parser.add_argument('--registro', metavar='DIR',
+                        help="Registrar cada evento con su marca en DIR (consultas: python event_log.py DIR)")
+    args = parser.parse_args()
+    if args.registro:
+        abrir_registro(args.registro)
+    try:
+        iniciar_servidor(args.puerto, args.host)
+    finally:
+        if registro is not None:
+            registro.close()
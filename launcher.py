@@ -0,0 +1,99 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from membership import Membership
+
+# Script y ID del primer miembro de cada algoritmo
+ALGORITHMS = {
+    'bully': ('bully_algorithm.py', 1),
+    'ricart': ('mutual_exclusion.py', 0),
+}
+
+def node_command(algorithm, member_id, members_path, engine=None):
+    script, _ = ALGORITHMS[algorithm]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script)
+    if algorithm == 'bully':
+        return [sys.executable, path, '--id', str(member_id), '--members', members_path]
+    command = [sys.executable, path, str(member_id)]
+    if engine:
+        command.append(engine)
+    return command + ['--members', members_path]
+
+def launch(algorithm, membership, members_path, engine=None, log_dir=None, metrics_base_port=None):
+    """Arranca un proceso del sistema operativo por miembro, todos a la vez;
+    devuelve {id: subprocess.Popen}"""
+    membership.save(members_path)
+    processes = {}
+    for member_id in membership:
+        env = dict(os.environ)
+        if metrics_base_port:
+            env['PROYECTO2_METRICS_PORT'] = str(metrics_base_port + member_id)
+        output = None
+        if log_dir:
+            output = open(os.path.join(log_dir, f"{algorithm}-{member_id}.log"), 'w')
+        processes[member_id] = subprocess.Popen(
+            node_command(algorithm, member_id, members_path, engine),
+            stdout=output, stderr=subprocess.STDOUT if output else None,
+            stdin=subprocess.DEVNULL, env=env)
+        if output:
+            output.close()  # El hijo conserva su copia del descriptor
+    return processes
+
+def stop(processes, timeout=5.0):
+    """Termina los procesos (SIGTERM y, si no responden, SIGKILL); los nodos
+    del abusón atienden SIGTERM como Ctrl+C y anuncian su salida con LEAVE"""
+    for process in processes.values():
+        if process.poll() is None:
+            process.terminate()
+    deadline = time.monotonic() + timeout
+    for process in processes.values():
+        try:
+            process.wait(max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Arranca un clúster local de N nodos en paralelo (un proceso por nodo)")
+    parser.add_argument('algorithm', choices=ALGORITHMS)
+    parser.add_argument('--nodes', type=int, default=5)
+    parser.add_argument('--base-port', type=int, default=6000, help="El nodo i escucha en base-port + i")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--engine', help="Motor de exclusión mutua (solo ricart)")
+    parser.add_argument('--seconds', type=float, default=0, help="Duración (0: hasta Ctrl+C)")
+    parser.add_argument('--members', help="Dónde escribir el archivo de miembros (por defecto, uno temporal)")
+    parser.add_argument('--log-dir', help="Guardar la salida de cada nodo en un archivo en lugar de la terminal")
+    parser.add_argument('--metrics-base-port', type=int,
+                        help="Exportar las métricas del nodo i por HTTP en este puerto + i")
+    args = parser.parse_args()
+
+    _, first_id = ALGORITHMS[args.algorithm]
+    membership = Membership.local(range(first_id, first_id + args.nodes), args.base_port, args.host)
+    members_path = args.members or os.path.join(tempfile.mkdtemp(prefix='proyecto2-'), 'members.txt')
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    processes = launch(args.algorithm, membership, members_path, args.engine,
+                       args.log_dir, args.metrics_base_port)
+    print(f"[Lanzador] {len(processes)} nodos de {args.algorithm} arrancados en "
+          f"{time.perf_counter() - start:.2f} s | Miembros: {members_path}", flush=True)
+    try:
+        deadline = time.monotonic() + args.seconds if args.seconds else None
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(0.5)
+            exited = [member_id for member_id, p in processes.items() if p.poll() is not None]
+            if exited:
+                print(f"[Lanzador] Nodos terminados inesperadamente: {exited}")
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop(processes)
+        print("[Lanzador] Clúster detenido")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+import asyncio
+import contextlib
+import json
+import threading
+import time
+from collections import deque
+from runtime import ThreadRuntime
+from membership import Membership
+from wire import new_message
+from metrics import REGISTRY, log
+
+class Resource:
+    """Estado de Ricart-Agrawala de un recurso con nombre"""
+    __slots__ = ('requesting', 'held', 'request_clock', 'requested_at', 'pending', 'deferred', 'waiters')
+
+    def __init__(self):
+        self.requesting = False  # Hay una solicitud en curso (o el recurso está tomado)
+        self.held = False  # Dentro de la sección crítica del recurso
+        self.request_clock = 0  # Marca de la solicitud en curso
+        self.requested_at = 0.0
+        self.pending = set()  # Pares cuyo OK falta
+        self.deferred = []  # Pares a los que se debe el OK al liberar
+        self.waiters = deque()  # Funciones de los clientes locales que esperan el recurso
+
+
+class LockManager:
+    """Exclusión mutua de Ricart-Agrawala para muchos recursos con nombre
+    sobre un único conjunto de pares y un único transporte. Cada recurso
+    tiene su propio estado (solicitud, OKs pendientes, diferidos), así que
+    recursos distintos se toman a la vez; los recursos sin uso no ocupan
+    memoria.
+
+    Las solicitudes y OKs para un mismo par se acumulan y salen juntos en un
+    mensaje 'lock_batch': con asyncio o el simulador, todo lo generado en
+    una vuelta del bucle; con hilos, todo lo generado por una operación
+    (por ejemplo, los OK diferidos de una liberación o las respuestas a un
+    lote recibido)"""
+
+    def __init__(self, pid, members, runtime=None):
+        """- pid: ID propio en members
+        - members: Membership o lista/dict de puertos en localhost"""
+        self.runtime = runtime or ThreadRuntime()
+        self.pid = pid
+        self.membership = Membership.coerce(members)
+        self.clock = 0  # Reloj de Lamport compartido por todos los recursos
+        self.resources = {}  # {nombre: Resource} solo de los recursos en uso
+        self.outbox = {}  # {par: {'request': [[nombre, marca], ...], 'ok': [nombre, ...]}}
+        self.flush_scheduled = False
+        self.lock = contextlib.nullcontext() if self.runtime.serial else self.runtime.lock
+        self.transport = self.runtime.listen(self.membership.address(pid), self.handle_message)
+
+    def peers(self):
+        return [pid for pid in self.membership if pid != self.pid]
+
+    # --- API ---
+
+    def request(self, name, callback):
+        """Pide el recurso name; callback() se llama (con el lock del nodo
+        tomado) cuando este proceso lo tiene. Nunca bloquea"""
+        with self.lock:
+            resource = self.resources.get(name)
+            if resource is None:
+                resource = self.resources[name] = Resource()
+            resource.waiters.append(callback)
+            if not resource.requesting:
+                self.start_request(name, resource)
+            self.finish()
+
+    def acquire(self, name, timeout=None):
+        """Bloquea hasta tener el recurso (solo con hilos); devuelve False si se agota timeout"""
+        if self.runtime.serial:
+            raise RuntimeError("acquire bloquea: con asyncio use acquire_async o request")
+        granted = threading.Event()
+        self.request(name, granted.set)
+        if granted.wait(timeout):
+            return True
+        with self.lock:
+            resource = self.resources.get(name)
+            if resource is not None and granted.set in resource.waiters:
+                resource.waiters.remove(granted.set)
+                return False
+        # Se concedió justo al agotarse el tiempo: el recurso es nuestro
+        return True
+
+    async def acquire_async(self, name):
+        """Espera (sin bloquear el bucle) hasta tener el recurso"""
+        granted = asyncio.get_running_loop().create_future()
+        grant = lambda: granted.done() or granted.set_result(True)
+        self.request(name, grant)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            # Cancelado (por ejemplo, por asyncio.wait_for): dejar de esperar o,
+            # si el recurso ya se concedió, liberarlo para no dejarlo sin dueño
+            with self.lock:
+                resource = self.resources.get(name)
+                if resource is not None and grant in resource.waiters:
+                    resource.waiters.remove(grant)
+                    raise
+            self.release(name)
+            raise
+
+    def release(self, name):
+        """Libera el recurso name; el siguiente cliente local, si lo hay, lo pide de nuevo"""
+        with self.lock:
+            resource = self.resources.get(name)
+            if resource is None or not resource.held:
+                raise RuntimeError(f"Proceso {self.pid}: el recurso {name!r} no está tomado")
+            self.leave(name, resource)
+            self.finish()
+
+    @contextlib.contextmanager
+    def locked(self, name, timeout=None):
+        """with manager.locked('nombre'): ... (solo con hilos)"""
+        if not self.acquire(name, timeout):
+            raise TimeoutError(f"Proceso {self.pid}: no se obtuvo {name!r} en {timeout} s")
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    @contextlib.asynccontextmanager
+    async def locked_async(self, name):
+        """async with manager.locked_async('nombre'): ..."""
+        await self.acquire_async(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    # --- Protocolo ---
+
+    def start_request(self, name, resource):
+        self.clock += 1
+        resource.requesting = True
+        resource.request_clock = self.clock
+        resource.requested_at = self.runtime.now()
+        resource.pending = set(self.peers())
+        for pid in resource.pending:
+            self.queue(pid, 'request', [name, resource.request_clock])
+        if not resource.pending:
+            self.enter(name, resource)
+
+    def enter(self, name, resource):
+        resource.held = True
+        if not resource.waiters:
+            self.leave(name, resource)  # El único cliente se cansó de esperar (acquire con timeout)
+            return
+        REGISTRY.counter('lock_acquisitions').inc()
+        REGISTRY.histogram('lock_wait_seconds').observe(self.runtime.now() - resource.requested_at)
+        resource.waiters.popleft()()
+
+    def leave(self, name, resource):
+        """Sale de la sección crítica: envía los OK diferidos y, si hay otro
+        cliente local esperando, empieza otra ronda (los pares que esperaban
+        tienen marcas anteriores y pasan primero)"""
+        resource.held = resource.requesting = False
+        self.clock += 1
+        for pid in resource.deferred:
+            self.queue(pid, 'ok', name)
+        resource.deferred.clear()
+        if resource.waiters:
+            self.start_request(name, resource)
+        else:
+            del self.resources[name]
+
+    def handle_message(self, message):
+        """Procesa un lote de solicitudes y OKs de un par"""
+        with self.lock:
+            sender = message['sender_id']
+            self.clock = max(self.clock, message['clock']) + 1
+            batch = json.loads(message['data'])
+            REGISTRY.counter('messages_received', algorithm='lock-manager', type='lock_batch').inc()
+            for name, their_clock in batch.get('request', ()):
+                self.handle_request(sender, name, their_clock)
+            for name in batch.get('ok', ()):
+                self.handle_ok(sender, name)
+            self.finish()
+
+    def handle_request(self, sender, name, their_clock):
+        resource = self.resources.get(name)
+        should_defer = resource is not None and (resource.held or (
+            resource.requesting and (resource.request_clock, self.pid) < (their_clock, sender)))
+        if should_defer:
+            REGISTRY.counter('deferred_requests', algorithm='lock-manager').inc()
+            resource.deferred.append(sender)
+        else:
+            self.queue(sender, 'ok', name)
+
+    def handle_ok(self, sender, name):
+        resource = self.resources.get(name)
+        if resource is None or not resource.requesting or resource.held:
+            return
+        resource.pending.discard(sender)
+        if not resource.pending:
+            self.enter(name, resource)
+
+    # --- Envío en lotes ---
+
+    def queue(self, pid, kind, entry):
+        batch = self.outbox.get(pid)
+        if batch is None:
+            batch = self.outbox[pid] = {'request': [], 'ok': []}
+        batch[kind].append(entry)
+
+    def finish(self):
+        """Fin de una operación: con un bucle de eventos el envío espera al
+        final de la vuelta para juntar más entradas; con hilos sale ya"""
+        if not self.outbox:
+            return
+        if not self.runtime.serial:
+            self.flush()
+        elif not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.runtime.call_later(0, self.flush)
+
+    def flush(self):
+        with self.lock:
+            self.flush_scheduled = False
+            outbox, self.outbox = self.outbox, {}
+            self.clock += 1
+            for pid, batch in outbox.items():
+                message = new_message('lock_batch', self.pid, self.clock,
+                                      data=json.dumps(batch, separators=(',', ':')))
+                start = time.perf_counter()
+                sent = self.transport.send(self.membership.address(pid), message)
+                REGISTRY.histogram('send_seconds', algorithm='lock-manager').observe(time.perf_counter() - start)
+                REGISTRY.counter('messages_sent', algorithm='lock-manager', type='lock_batch').inc()
+                REGISTRY.counter('lock_batch_entries').inc(len(batch['request']) + len(batch['ok']))
+                if not sent:
+                    log(f"Proceso {self.pid}: proceso {pid} no alcanzable")
@@ -0,0 +1,180 @@
+import heapq
+import math
+from ricart_agrawala import Process
+from metrics import REGISTRY, log
+
+def grid_quorum(pid, total_processes):
+    """Quórum de pid en una cuadrícula de ceil(√N) columnas: su fila y su
+    columna (unos 2√N - 1 procesos). Dos quórums siempre se cortan: si la
+    celda (fila de i, columna de j) cae fuera de la última fila incompleta,
+    la celda (fila de j, columna de i) está en una fila completa"""
+    columns = math.ceil(math.sqrt(total_processes))
+    row, column = divmod(pid, columns)
+    members = set(range(row * columns, min((row + 1) * columns, total_processes)))
+    members.update(range(column, total_processes, columns))
+    return sorted(members)
+
+
+class QuorumProcess(Process):
+    """Exclusión mutua de Maekawa: cada proceso pide permiso solo a su quórum
+    (grid_quorum) y cada proceso concede un único permiso a la vez, así que
+    entrar cuesta unos 3√N mensajes en lugar de 2(N-1). Misma interfaz que
+    Process.
+
+    Las solicitudes se ordenan por (marca de Lamport, pid). Para evitar
+    interbloqueos, un árbitro que recibe una solicitud anterior a la que
+    tiene concedida envía INQUIRE al dueño del permiso, y este lo devuelve
+    (RELINQUISH) si ya sabe que no puede ganar porque recibió FAILED. Toda
+    solicitud en espera que no es la primera de la cola de su árbitro
+    recibió un FAILED, lo que garantiza que la cadena de esperas termina"""
+
+    def __init__(self, pid, ports, all_ports, runtime=None):
+        super().__init__(pid, ports, all_ports, runtime, start=False)
+        self.algorithm = 'maekawa'
+        self.quorum = grid_quorum(pid, self.total_processes)
+
+        # Como solicitante
+        self.granted = set()  # Árbitros que concedieron su permiso a la solicitud en curso
+        self.failed = False  # Algún árbitro respondió FAILED a la solicitud en curso
+        self.inquired = set()  # Árbitros que preguntaron si devolvemos su permiso
+
+        # Como árbitro
+        self.locked_for = None  # (marca, pid) de la solicitud que tiene el permiso
+        self.waiting = []  # Montículo de (marca, pid) en espera
+        self.inquiry_sent = False  # Ya se envió INQUIRE al dueño del permiso
+        self.start()
+
+    def handle_message(self, message):
+        """Maneja los diferentes tipos de mensajes"""
+        msg_type = message['type']
+        self.clock = max(self.clock, message['clock']) + 1
+        REGISTRY.counter('messages_received', algorithm=self.algorithm, type=msg_type).inc()
+
+        sender = message['sender_id']
+        if msg_type == 'request':
+            self.handle_request(message)
+        elif msg_type == 'ok':
+            self.handle_ok(message)
+        elif msg_type == 'release':
+            self.handle_release(sender)
+        elif msg_type == 'inquire':
+            self.handle_inquire(message)
+        elif msg_type == 'failed':
+            self.handle_failed(message)
+        elif msg_type == 'relinquish':
+            self.handle_relinquish(sender)
+
+    def transmit(self, dest_pid, message):
+        """Los mensajes a sí mismo (es miembro de su propio quórum) no pasan por la red"""
+        if dest_pid == self.pid:
+            self.handle_message(message)
+        else:
+            super().transmit(dest_pid, message)
+
+    # --- Árbitro ---
+
+    def grant(self, request):
+        """Concede el permiso a request = (marca, pid). La marca de la solicitud
+        viaja en 'clock' en OK, INQUIRE y FAILED para descartar los de rondas viejas"""
+        self.locked_for = request
+        self.inquiry_sent = False
+        self.send_message(request[1], 'ok', request[0])
+
+    def handle_request(self, message):
+        """Concede el permiso si está libre; si no, encola la solicitud"""
+        request = (message['clock'], message['sender_id'])
+        if self.locked_for is None:
+            self.grant(request)
+            return
+
+        head = self.waiting[0] if self.waiting else None
+        heapq.heappush(self.waiting, request)
+        if request < self.locked_for and (head is None or request < head):
+            # Nueva primera de la cola: la anterior ya no puede ganar aquí
+            if head is not None:
+                self.send_message(head[1], 'failed', head[0])
+            if not self.inquiry_sent:
+                self.inquiry_sent = True
+                self.send_message(self.locked_for[1], 'inquire', self.locked_for[0])
+        else:
+            log(f"Proceso {self.pid}: Solicitud de {request[1]} en espera")
+            REGISTRY.counter('deferred_requests', algorithm=self.algorithm).inc()
+            self.send_message(request[1], 'failed', request[0])
+
+    def handle_relinquish(self, sender):
+        """El dueño devolvió el permiso: pasa a la solicitud más antigua"""
+        if self.locked_for is None or self.locked_for[1] != sender:
+            return
+        heapq.heappush(self.waiting, self.locked_for)
+        self.grant(heapq.heappop(self.waiting))
+
+    def handle_release(self, sender):
+        """El dueño salió de la sección crítica: pasa a la siguiente solicitud"""
+        if self.locked_for is None or self.locked_for[1] != sender:
+            return
+        self.locked_for = None
+        if self.waiting:
+            self.grant(heapq.heappop(self.waiting))
+
+    # --- Solicitante ---
+
+    def handle_ok(self, message):
+        """Un árbitro concedió su permiso"""
+        if not self.requesting or message['clock'] != self.request_clock:
+            return  # Permiso de una solicitud anterior
+        self.granted.add(message['sender_id'])
+        log(f"Proceso {self.pid}: Permiso de {message['sender_id']} ({len(self.granted)}/{len(self.quorum)})")
+        if not self.in_cs and len(self.granted) == len(self.quorum):
+            self.inquired.clear()
+            self.access_resource()
+
+    def handle_inquire(self, message):
+        """Un árbitro pregunta si devolvemos su permiso"""
+        arbiter = message['sender_id']
+        if (self.in_cs or message['clock'] != self.request_clock
+                or arbiter not in self.granted):
+            return  # Ya entramos (liberaremos) o es de una solicitud anterior
+        if self.failed:
+            self.relinquish(arbiter)
+        else:
+            self.inquired.add(arbiter)
+
+    def handle_failed(self, message):
+        """Otra solicitud tiene prioridad en algún árbitro: devolver los permisos pedidos"""
+        if self.in_cs or message['clock'] != self.request_clock:
+            return
+        self.failed = True
+        for arbiter in list(self.inquired):
+            self.relinquish(arbiter)
+        self.inquired.clear()
+
+    def relinquish(self, arbiter):
+        self.granted.discard(arbiter)
+        REGISTRY.counter('quorum_relinquished', algorithm=self.algorithm).inc()
+        self.send_message(arbiter, 'relinquish')
+
+    def request_resource(self):
+        """Solicita acceso al recurso compartido a su quórum"""
+        if self.requesting:
+            return
+
+        self.requesting = True
+        self.requested_at = self.runtime.now()
+        self.granted.clear()
+        self.inquired.clear()
+        self.failed = False
+        self.clock += 1
+        self.request_clock = self.clock
+
+        log(f"\nProceso {self.pid}: Solicitando recurso a {self.quorum} (ts={self.clock})")
+        for pid in self.quorum:
+            self.send_message(pid, 'request', self.request_clock)
+
+    def release_resource(self):
+        """Libera el recurso y devuelve los permisos del quórum"""
+        self.requesting = False
+        self.in_cs = False
+        self.granted.clear()
+        self.clock += 1
+        for pid in self.quorum:
+            self.send_message(pid, 'release')
@@ -0,0 +1,137 @@
+import os
+
+DEFAULT_HOST = 'localhost'
+
+def parse_address(text, default_host=DEFAULT_HOST):
+    """'host:puerto' o solo 'puerto' -> (host, puerto)"""
+    host, _, port = text.strip().rpartition(':')
+    return (host or default_host, int(port))
+
+def format_address(address):
+    return f"{address[0]}:{address[1]}"
+
+class Membership:
+    """Miembros del clúster: {id: (host, puerto)}. Se carga de un archivo o
+    de la línea de comandos y cambia en ejecución con join/leave, de modo que
+    el tamaño del clúster no está fijo en el código.
+
+    Los cambios se hacen desde los manejadores de mensajes del nodo, que el
+    runtime ejecuta de uno en uno; ids() devuelve una copia para poder
+    recorrerla mientras llegan altas y bajas"""
+
+    def __init__(self, members=None):
+        self.members = {int(member_id): (host, int(port))
+                        for member_id, (host, port) in dict(members or {}).items()}
+        self.listeners = []  # Funciones llamadas con (evento, id, dirección)
+
+    @classmethod
+    def local(cls, ids, base_port, host=DEFAULT_HOST):
+        """Clúster en una sola máquina: el miembro i escucha en base_port + i"""
+        return cls({member_id: (host, base_port + member_id) for member_id in ids})
+
+    @classmethod
+    def parse(cls, spec, first_id=0):
+        """Lista separada por comas: 'id=host:puerto,...' o 'host:puerto,...'
+        (en el segundo caso los ids se numeran desde first_id)"""
+        members = {}
+        for position, item in enumerate(part for part in spec.split(',') if part.strip()):
+            member_id, separator, address = item.partition('=')
+            if not separator:
+                member_id, address = first_id + position, item
+            members[int(member_id)] = parse_address(address)
+        return cls(members)
+
+    @classmethod
+    def load(cls, path):
+        """Archivo de texto con una línea 'id host:puerto' por miembro ('#' inicia un comentario)"""
+        members = {}
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                try:
+                    member_id, address = line.split()
+                    members[int(member_id)] = parse_address(address)
+                except ValueError:
+                    raise ValueError(f"{path}:{number}: se esperaba 'id host:puerto', no {line!r}")
+        return cls(members)
+
+    @classmethod
+    def coerce(cls, value, host=DEFAULT_HOST):
+        """Acepta una Membership, un dict {id: puerto o (host, puerto)} o una
+        lista de puertos indexada por id (la forma de configurar los nodos
+        antes de que existiera esta clase)"""
+        if isinstance(value, cls):
+            return value
+        items = value.items() if isinstance(value, dict) else enumerate(value)
+        return cls({member_id: address if isinstance(address, tuple) else (host, address)
+                    for member_id, address in items})
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            for member_id in self.ids():
+                f.write(f"{member_id} {format_address(self.members[member_id])}\n")
+
+    def address(self, member_id):
+        """(host, puerto) del miembro, o None si no pertenece al clúster"""
+        return self.members.get(member_id)
+
+    def ids(self):
+        return sorted(self.members)
+
+    def subscribe(self, callback):
+        """callback(evento, id, dirección) con evento 'join' o 'leave'"""
+        self.listeners.append(callback)
+
+    def join(self, member_id, address):
+        """Agrega (o actualiza) un miembro; devuelve True si es nuevo"""
+        new = member_id not in self.members
+        self.members[member_id] = tuple(address)
+        if new:
+            for callback in self.listeners:
+                callback('join', member_id, self.members[member_id])
+        return new
+
+    def leave(self, member_id):
+        """Quita un miembro; devuelve True si pertenecía al clúster"""
+        address = self.members.pop(member_id, None)
+        if address is not None:
+            for callback in self.listeners:
+                callback('leave', member_id, address)
+        return address is not None
+
+    def __contains__(self, member_id):
+        return member_id in self.members
+
+    def __iter__(self):
+        return iter(self.ids())
+
+    def __len__(self):
+        return len(self.members)
+
+    def __repr__(self):
+        return f"Membership({', '.join(f'{i}={format_address(self.members[i])}' for i in self.ids())})"
+
+
+def add_arguments(parser, nodes, base_port):
+    """Opciones de línea de comandos para describir el clúster"""
+    group = parser.add_argument_group("clúster")
+    group.add_argument('--members', metavar='ARCHIVO',
+                       default=os.environ.get('PROYECTO2_MEMBERS'),
+                       help="Archivo con una línea 'id host:puerto' por miembro (o PROYECTO2_MEMBERS)")
+    group.add_argument('--peers', metavar='LISTA',
+                       help="Miembros separados por comas: 'id=host:puerto,...' o 'host:puerto,...'")
+    group.add_argument('--nodes', type=int, default=nodes,
+                       help="Sin --members ni --peers: número de miembros en esta máquina")
+    group.add_argument('--base-port', type=int, default=base_port,
+                       help="Sin --members ni --peers: el miembro i escucha en base-port + i")
+    group.add_argument('--host', default=DEFAULT_HOST, help="Host de los miembros locales")
+
+def from_args(args, first_id=0):
+    """Membership descrita por las opciones de add_arguments"""
+    if args.members:
+        return Membership.load(args.members)
+    if args.peers:
+        return Membership.parse(args.peers, first_id)
+    return Membership.local(range(first_id, first_id + args.nodes), args.base_port, args.host)
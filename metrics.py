@@ -0,0 +1,186 @@
+import bisect
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Salida de texto de los nodos: PROYECTO2_LOG=0 la apaga por completo
+LOG_ENABLED = os.environ.get('PROYECTO2_LOG', '1') != '0'
+
+def set_logging(enabled):
+    global LOG_ENABLED
+    LOG_ENABLED = enabled
+
+def log(*args, **kwargs):
+    """Reemplazo de print para los mensajes de estado de los nodos"""
+    if LOG_ENABLED:
+        print(*args, **kwargs)
+
+# Límites de los histogramas en segundos: de 10 µs a ~84 s, duplicando
+BUCKETS = tuple(1e-5 * 2 ** i for i in range(24))
+
+class Counter:
+    """Contador que solo aumenta"""
+    kind = 'counter'
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def export(self):
+        return self.value
+
+
+class Gauge:
+    """Valor actual (líder, reloj, tamaño de una cola...)"""
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value  # Reemplazar una referencia es atómico
+
+    def export(self):
+        return self.value
+
+
+class Histogram:
+    """Distribución de latencias en cubetas fijas (observe cuesta una búsqueda binaria)"""
+    kind = 'histogram'
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # La última cubeta es +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q):
+        """Límite superior de la cubeta que contiene el cuantil q (0-1)"""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0.0
+
+    def export(self):
+        return {'count': self.count, 'sum': self.sum,
+                'p50': self.quantile(0.5), 'p99': self.quantile(0.99)}
+
+
+class Registry:
+    """Métricas por nombre y etiquetas, creadas la primera vez que se piden"""
+
+    def __init__(self):
+        self.metrics = {}  # {(nombre, ((etiqueta, valor), ...)): métrica}
+        self.lock = threading.Lock()
+
+    def get(self, cls, name, labels):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self.metrics.get(key)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.setdefault(key, cls())
+        return metric
+
+    def counter(self, name, **labels):
+        return self.get(Counter, name, labels)
+
+    def gauge(self, name, **labels):
+        return self.get(Gauge, name, labels)
+
+    def histogram(self, name, **labels):
+        return self.get(Histogram, name, labels)
+
+    def reset(self):
+        with self.lock:
+            self.metrics.clear()
+
+    def snapshot(self):
+        """{nombre: [{'labels': {...}, 'value': ...}]} listo para JSON"""
+        result = {}
+        for (name, labels), metric in list(self.metrics.items()):
+            result.setdefault(name, []).append({'labels': dict(labels), 'value': metric.export()})
+        return result
+
+    def render_text(self):
+        """Formato de texto de Prometheus"""
+        lines = []
+        for (name, labels), metric in sorted(self.metrics.items(), key=lambda item: str(item[0])):
+            label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+            if metric.kind != 'histogram':
+                lines.append(f"{name}{{{label_text}}} {metric.value}")
+                continue
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float('inf'),), metric.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f"{bound:g}"
+                lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{label_text}}} {metric.sum}")
+            lines.append(f"{name}_count{{{label_text}}} {metric.count}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+def serve_http(port, registry=REGISTRY):
+    """Expone las métricas en http://localhost:port/ (texto) y /json en un hilo aparte"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/json'):
+                body, content_type = json.dumps(registry.snapshot()).encode(), 'application/json'
+            else:
+                body, content_type = registry.render_text().encode(), 'text/plain; version=0.0.4'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Sin una línea por consulta
+
+    server = ThreadingHTTPServer(('localhost', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def dump_json(path, registry=REGISTRY):
+    """Escribe las métricas en path de forma atómica"""
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump({'time': time.time(), 'metrics': registry.snapshot()}, f)
+    os.replace(temporary, path)
+
+def start_json_dump(path, interval=5.0, registry=REGISTRY):
+    """Vuelca las métricas a path cada interval segundos en un hilo aparte"""
+    def loop():
+        while True:
+            time.sleep(interval)
+            dump_json(path, registry)
+    threading.Thread(target=loop, daemon=True).start()
+
+def configure_from_env():
+    """Activa los exportadores pedidos por variables de entorno:
+    PROYECTO2_METRICS_PORT (HTTP) y PROYECTO2_METRICS_FILE (volcado JSON periódico)"""
+    port = os.environ.get('PROYECTO2_METRICS_PORT')
+    if port:
+        serve_http(int(port))
+    path = os.environ.get('PROYECTO2_METRICS_FILE')
+    if path:
+        start_json_dump(path, float(os.environ.get('PROYECTO2_METRICS_INTERVAL', '5')))
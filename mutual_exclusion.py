@@ -0,0 +1,48 @@
+import argparse
+import os
+import time
+import metrics
+from membership import add_arguments, from_args
+from ricart_agrawala import Process
+from suzuki_kasami import TokenProcess
+from maekawa import QuorumProcess
+
+# Motores de exclusión mutua disponibles; todos ofrecen request_resource,
+# access_resource y release_resource
+ENGINES = {
+    'ricart-agrawala': Process,
+    'roucairol-carvalho': lambda pid, ports, all_ports, runtime=None:
+        Process(pid, ports, all_ports, runtime, keep_permissions=True),
+    'suzuki-kasami': TokenProcess,
+    'maekawa': QuorumProcess,
+}
+
+DEFAULT_ENGINE = os.environ.get('PROYECTO2_MUTEX', 'ricart-agrawala')
+
+def create_process(pid, ports, all_ports, runtime=None, engine=None):
+    """Crea un proceso con el motor indicado (por defecto DEFAULT_ENGINE)"""
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Motor desconocido: {engine} (opciones: {', '.join(ENGINES)})")
+    return ENGINES[engine](pid, ports, all_ports, runtime)
+
+def main():
+    metrics.configure_from_env()  # PROYECTO2_METRICS_PORT / PROYECTO2_METRICS_FILE
+    
+    # Uso: python mutual_exclusion.py <pid> [motor] [--members ARCHIVO]
+    parser = argparse.ArgumentParser(description="Proceso de exclusión mutua")
+    parser.add_argument('pid', type=int, nargs='?', default=0)
+    parser.add_argument('engine', nargs='?', default=None, choices=ENGINES)
+    add_arguments(parser, nodes=3, base_port=5000)  # Por defecto: 3 procesos en los puertos 5000-5002
+    args = parser.parse_args()
+    membership = from_args(args)
+    
+    process = create_process(args.pid, membership, membership, engine=args.engine)
+    process.simulate()
+    
+    # Mantener programa ejecutando
+    while True:
+        time.sleep(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,160 +1,245 @@
-import socket
-import threading
-import time
-import json
-from collections import defaultdict
-from queue import Queue
-
-class Process:
-    def __init__(self, pid, ports, all_ports):
-        self.pid = pid  # Identificador único del proceso
-        self.ports = ports  # Puertos de todos los procesos
-        self.all_ports = all_ports  # Todos los puertos en el sistema
-        self.clock = 0  # Reloj lógico de Lamport
-        self.deferred = []  # Solicitudes diferidas
-        self.requesting = False  # Indica si está solicitando el recurso
-        self.ok_received = 0  # Contador de OKs recibidos
-        self.total_processes = len(all_ports)
-        self.queue = Queue()  # Cola para manejar mensajes entrantes
-        
-        # Inicializar el socket
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.bind(('localhost', ports[pid]))
-        self.sock.listen()
-        
-        # Iniciar hilo para escuchar mensajes
-        threading.Thread(target=self.listen_for_messages, daemon=True).start()
-        threading.Thread(target=self.process_messages, daemon=True).start()
-
-    def listen_for_messages(self):
-        """Escucha continuamente mensajes entrantes"""
-        while True:
-            conn, addr = self.sock.accept()
-            data = conn.recv(1024).decode()
-            conn.close()
-            self.queue.put(json.loads(data))
-
-    def process_messages(self):
-        """Procesa los mensajes recibidos"""
-        while True:
-            if not self.queue.empty():
-                message = self.queue.get()
-                self.handle_message(message)
-
-    def handle_message(self, message):
-        """Maneja los diferentes tipos de mensajes"""
-        msg_type = message['type']
-        self.clock = max(self.clock, message['clock']) + 1
-        
-        if msg_type == 'request':
-            self.handle_request(message)
-        elif msg_type == 'ok':
-            self.handle_ok()
-        elif msg_type == 'release':
-            self.handle_release()
-
-    def handle_request(self, message):
-        """Procesa una solicitud de otro proceso"""
-        their_pid = message['pid']
-        their_clock = message['clock']
-        
-        # Reglas del algoritmo:
-        # 1. Si no estoy solicitando o ya tengo el recurso
-        # 2. Si su solicitud es anterior (menor timestamp o mismo timestamp pero PID menor)
-        should_defer = (self.requesting and 
-                       ((their_clock < self.clock) or 
-                        (their_clock == self.clock and their_pid < self.pid)))
-        
-        if should_defer:
-            print(f"Proceso {self.pid}: Diferiendo solicitud de {their_pid}")
-            self.deferred.append(their_pid)
-        else:
-            print(f"Proceso {self.pid}: Enviando OK a {their_pid}")
-            self.send_message(their_pid, 'ok')
-
-    def handle_ok(self):
-        """Procesa un mensaje OK recibido"""
-        self.ok_received += 1
-        print(f"Proceso {self.pid}: Recibió OK ({self.ok_received}/{self.total_processes-1})")
-        
-        if self.ok_received == self.total_processes - 1:
-            self.access_resource()
-
-    def handle_release(self):
-        """Procesa un mensaje de liberación"""
-        if self.deferred:
-            next_pid = self.deferred.pop(0)
-            print(f"Proceso {self.pid}: Enviando OK diferido a {next_pid}")
-            self.send_message(next_pid, 'ok')
-
-    def send_message(self, dest_pid, msg_type):
-        """Envía un mensaje a otro proceso"""
-        self.clock += 1
-        message = {
-            'type': msg_type,
-            'pid': self.pid,
-            'clock': self.clock
-        }
-        
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect(('localhost', self.ports[dest_pid]))
-            s.send(json.dumps(message).encode())
-            s.close()
-        except Exception as e:
-            print(f"Error enviando mensaje a {dest_pid}: {e}")
-
-    def request_resource(self):
-        """Solicita acceso al recurso compartido"""
-        if self.requesting:
-            return
-            
-        self.requesting = True
-        self.ok_received = 0
-        self.clock += 1
-        
-        print(f"\nProceso {self.pid}: Solicitando recurso (ts={self.clock})")
-        
-        # Enviar solicitud a todos los demás procesos
-        for pid in range(self.total_processes):
-            if pid != self.pid:
-                self.send_message(pid, 'request')
-
-    def access_resource(self):
-        """Accede al recurso compartido"""
-        print(f"\n=== Proceso {self.pid} ENTRANDO a la sección crítica ===")
-        time.sleep(2)  # Simular trabajo en la sección crítica
-        print(f"=== Proceso {self.pid} SALIENDO de la sección crítica ===\n")
-        self.release_resource()
-
-    def release_resource(self):
-        """Libera el recurso compartido"""
-        self.requesting = False
-        self.clock += 1
-        
-        # Enviar mensaje de liberación a procesos diferidos
-        for pid in self.deferred:
-            self.send_message(pid, 'ok')
-        self.deferred.clear()
-        
-        # Notificar a todos que ha liberado el recurso
-        for pid in range(self.total_processes):
-            if pid != self.pid:
-                self.send_message(pid, 'release')
-
-    def simulate(self):
-        """Simula el comportamiento del proceso"""
-        while True:
-            time.sleep(5)  # Esperar antes de hacer otra solicitud
-            self.request_resource()
-
-
-# Configuración: lista de puertos para cada proceso
-ports = [5000, 5001, 5002]  # Puertos para 3 procesos
-    
-# Obtener el ID del proceso del argumento de línea de comandos
-import sys
-pid = int(sys.argv[1]) if len(sys.argv) > 1 else 0
-    
-process = Process(pid,ports, ports)
-process.simulate()
+import argparse
+import threading
+import time
+from collections import defaultdict
+from queue import Queue
+from runtime import ThreadRuntime
+from membership import Membership, add_arguments, from_args, format_address
+from wire import new_message
+import metrics
+from metrics import REGISTRY, log
+
+class Process:
+    def __init__(self, pid, ports, all_ports, runtime=None, keep_permissions=False, start=True):
+        """- ports: Membership con los ids 0..N-1 o lista de puertos en localhost
+        - all_ports: Se conserva por compatibilidad; el tamaño sale de ports
+        - start: Iniciar ya el despacho de mensajes; las subclases pasan False
+          y llaman a start() al terminar de inicializar su propio estado"""
+        self.runtime = runtime or ThreadRuntime()  # Hilos, asyncio o simulación
+        self.pid = pid  # Identificador único del proceso
+        # Miembros del sistema. Las solicitudes se cuentan sobre los ids 0..N-1,
+        # así que el conjunto queda fijo mientras el proceso corre
+        self.membership = Membership.coerce(ports)
+        if self.membership.ids() != list(range(len(self.membership))):
+            raise ValueError(f"Los ids de exclusión mutua deben ser 0..N-1: {self.membership}")
+        self.ports = ports  # Puertos de todos los procesos
+        self.all_ports = all_ports  # Todos los puertos en el sistema
+        self.clock = 0  # Reloj lógico de Lamport
+        self.deferred = []  # Solicitudes diferidas
+        self.requesting = False  # Indica si está solicitando el recurso
+        self.request_clock = 0  # Marca de tiempo de la solicitud en curso
+        self.requested_at = 0.0  # Instante de la solicitud en curso (para la espera en métricas)
+        self.cs_duration = 2  # Segundos de trabajo simulado en la sección crítica
+        self.ok_received = 0  # Contador de OKs recibidos
+        self.in_cs = False  # Indica si está dentro de la sección crítica
+        self.total_processes = len(self.membership)
+        
+        # Optimización de Roucairol-Carvalho: los permisos recibidos se conservan
+        # hasta que el otro proceso los pide. Cada par de procesos comparte un
+        # único permiso; al inicio lo tiene el de menor PID
+        self.keep_permissions = keep_permissions
+        self.algorithm = 'roucairol-carvalho' if keep_permissions else 'ricart-agrawala'
+        self.permissions = set(range(pid + 1, self.total_processes)) if keep_permissions else set()
+        self.queue = Queue()  # Cola para manejar mensajes entrantes
+        
+        if self.runtime.serial:
+            # El bucle de eventos ya procesa los mensajes de uno en uno
+            self.transport = self.runtime.listen(self.membership.address(pid), self.handle_message)
+        else:
+            # Transporte con una conexión persistente por proceso; los mensajes
+            # esperan en la cola hasta que start inicia el hilo de despacho
+            self.transport = self.runtime.listen(self.membership.address(pid), self.queue.put)
+        if start:
+            self.start()
+
+    def start(self):
+        """Inicia el hilo que procesa los mensajes (solo con hilos)"""
+        if not self.runtime.serial:
+            threading.Thread(target=self.process_messages, daemon=True).start()
+
+    def process_messages(self):
+        """Procesa en orden de llegada los mensajes recibidos (y las tareas
+        programadas con schedule); un error en uno no detiene a los demás"""
+        while True:
+            message = self.queue.get()  # Bloquea sin consumir CPU hasta que llegue algo
+            try:
+                if callable(message):
+                    message()
+                else:
+                    self.handle_message(message)
+            except Exception as e:
+                log(f"Proceso {self.pid}: Error procesando mensaje: {e}")
+
+    def schedule(self, delay, callback):
+        """Ejecuta callback dentro de delay segundos en el mismo hilo que los mensajes"""
+        if self.runtime.serial:
+            self.runtime.call_later(delay, callback)
+        else:
+            self.runtime.call_later(delay, self.queue.put, callback)
+
+    def handle_message(self, message):
+        """Maneja los diferentes tipos de mensajes"""
+        msg_type = message['type']
+        self.clock = max(self.clock, message['clock']) + 1
+        REGISTRY.counter('messages_received', algorithm=self.algorithm, type=msg_type).inc()
+        REGISTRY.gauge('lamport_clock', pid=self.pid).set(self.clock)
+        
+        if msg_type == 'request':
+            self.handle_request(message)
+        elif msg_type == 'ok':
+            self.handle_ok(message)
+        elif msg_type == 'release':
+            self.handle_release()
+
+    def handle_request(self, message):
+        """Procesa una solicitud de otro proceso"""
+        their_pid = message['sender_id']
+        their_clock = message['clock']
+        
+        # Reglas del algoritmo:
+        # 1. Si no estoy solicitando o ya tengo el recurso
+        # 2. Si su solicitud es anterior (menor timestamp o mismo timestamp pero PID menor)
+        # Se compara contra la marca de mi solicitud, no contra el reloj actual
+        # (que ya avanzó al recibir el mensaje), para que el orden sea total
+        should_defer = self.in_cs or (self.requesting and 
+                       ((self.request_clock < their_clock) or 
+                        (self.request_clock == their_clock and self.pid < their_pid)))
+        
+        if should_defer:
+            log(f"Proceso {self.pid}: Diferiendo solicitud de {their_pid}")
+            REGISTRY.counter('deferred_requests', algorithm=self.algorithm).inc()
+            self.deferred.append(their_pid)
+        else:
+            log(f"Proceso {self.pid}: Enviando OK a {their_pid}")
+            self.send_message(their_pid, 'ok')
+            if self.keep_permissions:
+                # Se cede el permiso; si sigo esperando el recurso hay que recuperarlo
+                self.permissions.discard(their_pid)
+                if self.requesting:
+                    self.send_message(their_pid, 'request', self.request_clock)
+
+    def handle_ok(self, message):
+        """Procesa un mensaje OK recibido"""
+        if self.keep_permissions:
+            self.permissions.add(message['sender_id'])
+            if self.requesting and not self.in_cs and len(self.permissions) == self.total_processes - 1:
+                self.access_resource()
+            return
+        
+        self.ok_received += 1
+        log(f"Proceso {self.pid}: Recibió OK ({self.ok_received}/{self.total_processes-1})")
+        
+        if self.ok_received == self.total_processes - 1:
+            self.access_resource()
+
+    def handle_release(self):
+        """Procesa un mensaje de liberación"""
+        # Los OK diferidos solo se envían al salir de la propia sección crítica
+        # (release_resource); enviarlos aquí dejaría entrar a otro proceso
+        # mientras este sigue dentro
+        if self.deferred and not self.requesting:
+            next_pid = self.deferred.pop(0)
+            log(f"Proceso {self.pid}: Enviando OK diferido a {next_pid}")
+            self.send_message(next_pid, 'ok')
+
+    def send_message(self, dest_pid, msg_type, clock=None):
+        """Envía un mensaje a otro proceso (clock fija la marca de tiempo enviada)"""
+        self.clock += 1
+        message = new_message(msg_type, self.pid, self.clock if clock is None else clock)
+        self.transmit(dest_pid, message)
+
+    def transmit(self, dest_pid, message):
+        """Envía un mensaje ya construido, registrando su latencia de envío"""
+        start = time.perf_counter()
+        sent = self.transport.send(self.membership.address(dest_pid), message)
+        REGISTRY.histogram('send_seconds', algorithm=self.algorithm).observe(time.perf_counter() - start)
+        REGISTRY.counter('messages_sent', algorithm=self.algorithm, type=message['type']).inc()
+        if not sent:
+            log(f"Error enviando mensaje a {dest_pid}: proceso no alcanzable")
+
+    def request_resource(self):
+        """Solicita acceso al recurso compartido"""
+        if self.requesting:
+            return
+            
+        self.requesting = True
+        self.requested_at = self.runtime.now()
+        self.ok_received = 0
+        self.clock += 1
+        self.request_clock = self.clock
+        
+        log(f"\nProceso {self.pid}: Solicitando recurso (ts={self.clock})")
+        
+        # Enviar solicitud a todos los demás procesos, todas con la misma marca
+        # (con keep_permissions, solo a los que tienen el permiso)
+        missing = [pid for pid in range(self.total_processes)
+                   if pid != self.pid and pid not in self.permissions]
+        for pid in missing:
+            self.send_message(pid, 'request', self.request_clock)
+        
+        if not missing:
+            self.access_resource()
+
+    def access_resource(self):
+        """Accede al recurso compartido"""
+        self.in_cs = True
+        REGISTRY.counter('cs_entries', algorithm=self.algorithm).inc()
+        REGISTRY.histogram('cs_wait_seconds', algorithm=self.algorithm).observe(self.runtime.now() - self.requested_at)
+        log(f"\n=== Proceso {self.pid} ENTRANDO a la sección crítica ===")
+        self.schedule(self.cs_duration, self.leave_resource)  # Simular trabajo en la sección crítica
+
+    def leave_resource(self):
+        """Sale de la sección crítica al terminar el trabajo simulado"""
+        log(f"=== Proceso {self.pid} SALIENDO de la sección crítica ===\n")
+        self.release_resource()
+
+    def release_resource(self):
+        """Libera el recurso compartido"""
+        self.requesting = False
+        self.in_cs = False
+        self.clock += 1
+        
+        # Enviar mensaje de liberación a procesos diferidos
+        for pid in self.deferred:
+            self.send_message(pid, 'ok')
+            self.permissions.discard(pid)
+        self.deferred.clear()
+        
+        if self.keep_permissions:
+            return  # Los demás no esperan la liberación: piden el permiso cuando lo necesitan
+        
+        # Notificar a todos que ha liberado el recurso
+        for pid in range(self.total_processes):
+            if pid != self.pid:
+                self.send_message(pid, 'release')
+
+    def simulate(self):
+        """Simula el comportamiento del proceso"""
+        self.schedule(5, self.simulation_step)  # Esperar antes de hacer otra solicitud
+
+    def simulation_step(self):
+        self.request_resource()
+        self.simulate()
+
+
+def main():
+    metrics.configure_from_env()  # PROYECTO2_METRICS_PORT / PROYECTO2_METRICS_FILE
+    
+    # Uso: python ricart_agrawala.py <pid> [--keep-permissions] [--members ARCHIVO]
+    parser = argparse.ArgumentParser(description="Proceso de Ricart-Agrawala")
+    parser.add_argument('pid', type=int, nargs='?', default=0)
+    parser.add_argument('--keep-permissions', action='store_true', help="Modo Roucairol-Carvalho")
+    add_arguments(parser, nodes=3, base_port=5000)  # Por defecto: 3 procesos en los puertos 5000-5002
+    args = parser.parse_args()
+    membership = from_args(args)
+    log(f"Proceso {args.pid}: {format_address(membership.address(args.pid))} ({len(membership)} procesos)")
+    
+    process = Process(args.pid, membership, membership, keep_permissions=args.keep_permissions)
+    process.simulate()
+    
+    # Mantener programa ejecutando
+    while True:
+        time.sleep(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import threading
+import time
+import random
+from transport import Transport
+
+class ThreadRuntime:
+    """Entorno de ejecución por defecto: sockets bloqueantes, un hilo por
+    conexión y temporizadores de threading. Los mensajes y los temporizadores
+    de un mismo nodo se ejecutan de uno en uno (self.lock)"""
+    serial = False  # Los manejadores corren en hilos distintos
+
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+        # Lo toman el transporte y los temporizadores al entregar; los nodos que
+        # reciben llamadas desde otros hilos (BullyNode.current_leader,
+        # LockManager.acquire) toman el mismo lock para no cruzarse con ellos
+        self.lock = threading.RLock()
+
+    def now(self):
+        return time.monotonic()
+
+    def call_later(self, delay, callback, *args):
+        """Ejecuta callback(*args) dentro de delay segundos; devuelve un objeto con cancel()"""
+        def run():
+            with self.lock:
+                callback(*args)
+        timer = threading.Timer(delay, run)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def listen(self, address, handler):
+        """Crea el transporte del nodo escuchando en address"""
+        return Transport(address, handler, dispatch_lock=self.lock)
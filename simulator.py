@@ -0,0 +1,240 @@
+import argparse
+import heapq
+import itertools
+import json
+import random
+from collections import Counter
+import metrics
+import wire
+
+class SimTimer:
+    """Temporizador del simulador; cancel() evita que se ejecute"""
+    __slots__ = ('cancelled',)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class SimTransport:
+    def __init__(self, runtime, address, handler):
+        """Transporte en memoria: misma interfaz que transport.Transport"""
+        self.runtime = runtime
+        self.address = address
+        self.handler = handler
+        self.sent = 0
+        self.dropped = 0  # Mensajes hacia nodos inexistentes o cerrados
+        self.closed = False
+
+    def send(self, address, message):
+        if self.closed:
+            return False
+        return self.runtime.transmit(self, address, message)
+
+    def deliver(self, message):
+        if not self.closed:
+            self.handler(message)
+
+    def stats(self):
+        return {'sent': self.sent, 'dropped': self.dropped, 'connections': 0}
+
+    def close(self):
+        self.closed = True
+        self.runtime.transports.pop(self.address, None)
+
+
+class SimRuntime:
+    """Entorno de ejecución simulado y determinista: reloj virtual, red en
+    memoria con retardo y pérdida configurables, y aleatoriedad con semilla.
+    Con la misma semilla y parámetros, una simulación se repite exactamente"""
+    serial = True  # Mensajes y temporizadores se ejecutan de uno en uno
+
+    def __init__(self, seed=0, delay=(0.001, 0.005), loss=0.0):
+        """- seed: Semilla de los nodos y de la red
+        - delay: (mínimo, máximo) del retardo de cada mensaje en segundos
+        - loss: Probabilidad de perder cada mensaje"""
+        self.random = random.Random(seed)  # Para los nodos (fallas simuladas, etc.)
+        self.network_random = random.Random(f"red-{seed}")  # Para retardos y pérdidas
+        self.delay = delay
+        self.loss = loss
+        self.time = 0.0
+        self.events = []  # Montículo de (instante, secuencia, temporizador, función, argumentos)
+        self.sequence = itertools.count()  # Desempate estable entre eventos simultáneos
+        self.transports = {}  # {(host, puerto): SimTransport}
+        self.channels = {}  # {(origen, destino): última entrega} para mantener el orden FIFO
+        self.messages = Counter()  # Mensajes enviados por tipo
+        self.lost = 0
+
+    def now(self):
+        return self.time
+
+    def call_later(self, delay, callback, *args):
+        timer = SimTimer()
+        heapq.heappush(self.events, (self.time + delay, next(self.sequence), timer, callback, args))
+        return timer
+
+    def listen(self, address, handler):
+        transport = SimTransport(self, address, handler)
+        self.transports[address] = transport
+        return transport
+
+    def transmit(self, source, address, message):
+        """Programa la entrega de un mensaje con el retardo y la pérdida configurados"""
+        target = self.transports.get(address)
+        if target is None:
+            source.dropped += 1
+            return False  # Como una conexión rechazada
+        source.sent += 1
+        self.messages[message['type']] += 1
+        if self.loss and self.network_random.random() < self.loss:
+            self.lost += 1
+            return True  # El emisor no se entera de la pérdida
+
+        # Los mensajes de un mismo canal llegan en orden, como en TCP
+        arrival = self.time + self.network_random.uniform(*self.delay)
+        channel = (source.address, address)
+        arrival = max(arrival, self.channels.get(channel, 0.0))
+        self.channels[channel] = arrival
+        self.call_later(arrival - self.time, target.deliver, wire.local_copy(message))
+        return True
+
+    def step(self):
+        """Ejecuta el siguiente evento; devuelve False si no quedan"""
+        while self.events:
+            when, _, timer, callback, args = heapq.heappop(self.events)
+            if timer.cancelled:
+                continue
+            self.time = when
+            callback(*args)
+            return True
+        return False
+
+    def run(self, seconds):
+        """Avanza el reloj virtual seconds segundos"""
+        until = self.time + seconds
+        while self.events and self.events[0][0] <= until:
+            self.step()
+        self.time = until
+
+    def run_until(self, condition, timeout):
+        """Avanza hasta que condition() sea verdadera; devuelve False si se agota timeout"""
+        until = self.time + timeout
+        while not condition():
+            if not self.events or self.events[0][0] > until:
+                self.time = until
+                return False
+            self.step()
+        return True
+
+
+def simulate_bully(nodes=5, seconds=600, seed=0, delay=(0.001, 0.005), loss=0.0,
+                   failure_probability=0.1, heartbeat_interval=1.0, probing=False):
+    """Simula un clúster del algoritmo del abusón y devuelve sus métricas"""
+    from bully_algorithm import BullyNode
+    metrics.REGISTRY.reset()
+    runtime = SimRuntime(seed, delay, loss)
+    all_ports = {node_id: 5000 + node_id for node_id in range(1, nodes + 1)}
+    cluster = [BullyNode(node_id, port, all_ports, runtime, heartbeat_interval, probing=probing)
+               for node_id, port in all_ports.items()]
+    for node in cluster:
+        node.failure_probability = failure_probability
+
+    # Una vez por segundo: ¿todos los nodos activos reconocen al mismo líder activo?
+    samples = agreed = 0
+    for _ in range(int(seconds)):
+        runtime.run(1.0)
+        alive = [n for n in cluster if n.active]
+        leaders = {n.leader_id for n in alive}
+        samples += 1
+        if len(leaders) == 1 and any(n.node_id in leaders for n in alive):
+            agreed += 1
+
+    return {
+        'algorithm': 'bully',
+        'nodes': nodes,
+        'seed': seed,
+        'seconds': seconds,
+        'elections': sum(n.election_round for n in cluster),
+        'suspicions': sum(n.suspicions for n in cluster),
+        'agreement': agreed / max(1, samples),
+        'election_seconds': metrics.REGISTRY.histogram('election_seconds').export(),
+        'messages': dict(runtime.messages),
+        'lost': runtime.lost,
+    }
+
+def simulate_mutex(processes=3, seconds=600, seed=0, delay=(0.001, 0.005), loss=0.0,
+                   engine=None, cs_duration=2.0):
+    """Simula un grupo de procesos de exclusión mutua y devuelve sus métricas"""
+    from mutual_exclusion import DEFAULT_ENGINE, create_process
+    metrics.REGISTRY.reset()
+    runtime = SimRuntime(seed, delay, loss)
+    ports = [5000 + pid for pid in range(processes)]
+    cluster = [create_process(pid, ports, ports, runtime, engine) for pid in range(processes)]
+    stats = {'entries': 0, 'violations': 0, 'wait': 0.0}
+
+    for process in cluster:
+        process.cs_duration = cs_duration
+        access = process.access_resource
+
+        def checked_access(process=process, access=access):
+            if any(p.in_cs for p in cluster):
+                stats['violations'] += 1
+            stats['entries'] += 1
+            stats['wait'] += runtime.now() - process.requested_at
+            access()
+        process.access_resource = checked_access
+        process.simulate()
+
+    runtime.run(seconds)
+    return {
+        'algorithm': engine or DEFAULT_ENGINE,
+        'processes': processes,
+        'seed': seed,
+        'seconds': seconds,
+        'entries': stats['entries'],
+        'violations': stats['violations'],
+        'mean_wait': stats['wait'] / max(1, stats['entries']),
+        'deferred': metrics.REGISTRY.counter('deferred_requests', algorithm=cluster[0].algorithm).value,
+        'messages': dict(runtime.messages),
+        'lost': runtime.lost,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación determinista en memoria con reloj virtual")
+    sub = parser.add_subparsers(dest='mode', required=True)
+    bully = sub.add_parser('bully', help="Algoritmo del abusón")
+    bully.add_argument('--nodes', type=int, default=5)
+    bully.add_argument('--failure-probability', type=float, default=0.1)
+    bully.add_argument('--heartbeat-interval', type=float, default=1.0)
+    bully.add_argument('--probing', action='store_true', help="Elección por sondeo descendente")
+    mutex = sub.add_parser('ricart', help="Exclusión mutua (Ricart-Agrawala por defecto)")
+    mutex.add_argument('--processes', type=int, default=3)
+    mutex.add_argument('--engine', default=None)
+    mutex.add_argument('--cs-duration', type=float, default=2.0)
+    for p in (bully, mutex):
+        p.add_argument('--seconds', type=float, default=600, help="Segundos simulados")
+        p.add_argument('--seeds', type=int, nargs='+', default=[0])
+        p.add_argument('--delay', type=float, nargs=2, default=[0.001, 0.005])
+        p.add_argument('--loss', type=float, default=0.0)
+        p.add_argument('--verbose', action='store_true', help="Mostrar la salida de los nodos")
+    args = parser.parse_args()
+
+    metrics.set_logging(args.verbose)
+    failed = False
+    for seed in args.seeds:
+        if args.mode == 'bully':
+            result = simulate_bully(args.nodes, args.seconds, seed, tuple(args.delay), args.loss,
+                                    args.failure_probability, args.heartbeat_interval, args.probing)
+        else:
+            result = simulate_mutex(args.processes, args.seconds, seed, tuple(args.delay), args.loss,
+                                    args.engine, args.cs_duration)
+        print(json.dumps(result))
+        failed = failed or result.get('violations', 0) > 0
+
+    # Código de salida distinto de cero si se violó la exclusión mutua (útil en CI)
+    raise SystemExit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+from collections import deque
+from ricart_agrawala import Process
+from wire import new_message
+from metrics import REGISTRY, log
+
+class TokenProcess(Process):
+    """Exclusión mutua de Suzuki-Kasami: un token circula entre los procesos.
+    Entrar cuesta N mensajes (N-1 solicitudes y el token), o ninguno si el
+    proceso ya tiene el token. Misma interfaz que Process"""
+
+    def __init__(self, pid, ports, all_ports, runtime=None):
+        super().__init__(pid, ports, all_ports, runtime, start=False)
+        self.algorithm = 'suzuki-kasami'
+        self.request_numbers = [0] * self.total_processes  # RN: última solicitud conocida de cada proceso
+        self.has_token = pid == 0  # Al inicio el token lo tiene el proceso 0
+        self.last_served = [0] * self.total_processes  # LN: viaja con el token
+        self.token_queue = deque()  # Procesos en espera del token: viaja con el token
+        self.start()
+
+    def handle_message(self, message):
+        """Maneja los diferentes tipos de mensajes"""
+        msg_type = message['type']
+        REGISTRY.counter('messages_received', algorithm=self.algorithm, type=msg_type).inc()
+        
+        if msg_type == 'request':
+            self.handle_request(message)
+        elif msg_type == 'token':
+            self.handle_token(message)
+
+    def handle_request(self, message):
+        """Registra la solicitud y cede el token si está libre"""
+        their_pid = message['sender_id']
+        number = message['clock']  # Número de secuencia de la solicitud
+        self.request_numbers[their_pid] = max(self.request_numbers[their_pid], number)
+        
+        # Solicitudes viejas (ya atendidas) se descartan
+        if (self.has_token and not self.requesting
+                and self.request_numbers[their_pid] == self.last_served[their_pid] + 1):
+            log(f"Proceso {self.pid}: Enviando TOKEN a {their_pid}")
+            self.send_token(their_pid)
+
+    def handle_token(self, message):
+        """Recibe el token junto con LN y la cola de espera"""
+        self.has_token = True
+        self.last_served = message['vector']
+        self.token_queue = deque(int(pid) for pid in message['data'].split(',') if pid)
+        log(f"Proceso {self.pid}: Recibió TOKEN")
+        if self.requesting:
+            self.access_resource()
+
+    def send_token(self, dest_pid):
+        """Envía el token a otro proceso"""
+        self.has_token = False
+        message = new_message('token', self.pid, vector=self.last_served,
+                              data=','.join(str(pid) for pid in self.token_queue))
+        self.transmit(dest_pid, message)
+
+    def request_resource(self):
+        """Solicita acceso al recurso compartido"""
+        if self.requesting:
+            return
+        
+        self.requesting = True
+        self.requested_at = self.runtime.now()
+        if self.has_token:
+            self.access_resource()  # Sin mensajes: ya tiene el token
+            return
+        
+        self.request_numbers[self.pid] += 1
+        number = self.request_numbers[self.pid]
+        log(f"\nProceso {self.pid}: Solicitando token (n={number})")
+        
+        # Difundir la solicitud con su número de secuencia
+        for pid in range(self.total_processes):
+            if pid != self.pid:
+                self.send_message(pid, 'request', number)
+
+    def release_resource(self):
+        """Libera el recurso y pasa el token al siguiente en espera"""
+        self.requesting = False
+        self.in_cs = False
+        self.last_served[self.pid] = self.request_numbers[self.pid]
+        
+        # Agregar a la cola a quienes tienen una solicitud pendiente
+        for pid in range(self.total_processes):
+            if (pid != self.pid and pid not in self.token_queue
+                    and self.request_numbers[pid] == self.last_served[pid] + 1):
+                self.token_queue.append(pid)
+        
+        if self.token_queue:
+            self.send_token(self.token_queue.popleft())
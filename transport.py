@@ -0,0 +1,192 @@
+import socket
+import threading
+import time
+from queue import Queue, Full, Empty
+import wire
+from metrics import log
+
+class PeerConnection:
+    def __init__(self, address, max_queue=1024, connect_timeout=1.0, retry_delay=0.5):
+        """Conexión persistente hacia un par:
+        - address: (host, puerto) del par
+        - max_queue: Tamaño máximo de la cola de envío
+        - connect_timeout: Tiempo máximo para conectar
+        - retry_delay: Espera mínima antes de reintentar tras un fallo"""
+        self.address = address
+        self.connect_timeout = connect_timeout
+        self.retry_delay = retry_delay
+        self.queue = Queue(maxsize=max_queue)  # Cola de envío acotada
+        self.sock = None
+        self.lock = threading.Lock()  # Protege self.sock
+        self.retry_at = 0.0  # Momento a partir del cual se puede reconectar
+        self.sent = 0  # Mensajes escritos en el socket
+        self.dropped = 0  # Mensajes descartados (cola llena o par caído)
+        self.reconnects = 0  # Conexiones abiertas hacia el par
+        threading.Thread(target=self.sender_loop, daemon=True).start()
+
+    def connect(self):
+        """Abre la conexión si no existe (solo desde sender_loop, con self.lock tomado)"""
+        if self.sock is not None:
+            return True
+        if time.monotonic() < self.retry_at:
+            return False
+        try:
+            s = socket.create_connection(self.address, timeout=self.connect_timeout)
+            s.settimeout(None)
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock = s
+            self.reconnects += 1
+            return True
+        except OSError:
+            self.retry_at = time.monotonic() + self.retry_delay
+            return False
+
+    def reset(self, sock):
+        """Cierra la conexión rota para que el siguiente envío reconecte"""
+        with self.lock:
+            if self.sock is sock:
+                self.sock = None
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def send(self, data):
+        """Encola datos ya serializados; devuelve False si el par no es alcanzable.
+        Nunca conecta: lo hace sender_loop, así quien envía (a menudo con el
+        lock de despacho del nodo tomado) no espera a un par caído"""
+        if self.sock is None and time.monotonic() < self.retry_at:
+            self.dropped += 1
+            return False
+        try:
+            self.queue.put_nowait(data)
+            return True
+        except Full:
+            self.dropped += 1
+            return False
+
+    def sender_loop(self):
+        """Vacía la cola de envío, agrupando lo pendiente en una sola escritura"""
+        while True:
+            chunks = [self.queue.get()]
+            while len(chunks) < 64:
+                try:
+                    chunks.append(self.queue.get_nowait())
+                except Empty:
+                    break
+            payload = b''.join(chunks)
+
+            # Un reintento tras reconectar si la conexión se había caído
+            for _ in range(2):
+                with self.lock:
+                    connected = self.connect()
+                    sock = self.sock
+                if not connected:
+                    self.dropped += len(chunks)
+                    break
+                try:
+                    sock.sendall(payload)
+                    self.sent += len(chunks)
+                    break
+                except OSError:
+                    self.reset(sock)
+            else:
+                self.dropped += len(chunks)
+
+    def close(self):
+        with self.lock:
+            sock, self.sock = self.sock, None
+        if sock is not None:
+            sock.close()
+
+
+class Transport:
+    def __init__(self, address, handler, max_queue=1024, codec=None, dispatch_lock=None):
+        """Capa de transporte compartida por los algoritmos:
+        - address: (host, puerto) donde escuchar
+        - handler: Función llamada con cada mensaje recibido (dict)
+        - max_queue: Tamaño de la cola de envío de cada par
+        - codec: 'binary' o 'json' (por defecto wire.DEFAULT_CODEC)
+        - dispatch_lock: Lock compartido con otros eventos del nodo"""
+        self.address = address
+        self.handler = handler
+        self.max_queue = max_queue
+        self.codec = codec
+        self.peers = {}  # {(host, puerto): PeerConnection}
+        self.peers_lock = threading.Lock()
+        self.connections = set()  # Conexiones entrantes abiertas
+        self.dispatch_lock = dispatch_lock or threading.Lock()  # Los mensajes se procesan de uno en uno
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(address)
+        self.sock.listen(128)
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    def peer(self, address):
+        """Devuelve (creándola si hace falta) la conexión persistente hacia address"""
+        with self.peers_lock:
+            peer = self.peers.get(address)
+            if peer is None:
+                peer = PeerConnection(address, self.max_queue)
+                self.peers[address] = peer
+            return peer
+
+    def send(self, address, message):
+        """Envía un mensaje (dict) a address por su conexión persistente"""
+        data = wire.encode_frame(message, self.codec)
+        return self.peer(address).send(data)
+
+    def accept_loop(self):
+        """Acepta conexiones entrantes; cada una transporta muchos mensajes"""
+        while True:
+            try:
+                conn, addr = self.sock.accept()
+            except OSError:
+                return  # Listener cerrado
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connections.add(conn)
+            threading.Thread(target=self.read_loop, args=(conn,), daemon=True).start()
+
+    def read_loop(self, conn):
+        """Lee los mensajes (con su longitud como prefijo) de una conexión"""
+        with conn, conn.makefile('rb') as stream:
+            try:
+                for message in wire.read_messages(stream):
+                    with self.dispatch_lock:
+                        try:
+                            self.handler(message)
+                        except Exception as e:
+                            log(f"[Transporte {self.address[1]}] Error procesando mensaje: {e}")
+            except OSError:
+                pass
+            except ValueError as e:
+                log(f"[Transporte {self.address[1]}] Conexión descartada: {e}")
+        self.connections.discard(conn)
+
+    def stats(self):
+        """Contadores agregados de todas las conexiones salientes"""
+        with self.peers_lock:
+            peers = list(self.peers.values())
+        return {
+            'sent': sum(p.sent for p in peers),
+            'dropped': sum(p.dropped for p in peers),
+            'connections': sum(p.reconnects for p in peers),
+        }
+
+    def close(self):
+        """Cierra el listener y todas las conexiones salientes"""
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)  # Despierta a accept_loop
+        except OSError:
+            pass
+        self.sock.close()
+        for conn in list(self.connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        with self.peers_lock:
+            peers = list(self.peers.values())
+        for peer in peers:
+            peer.close()
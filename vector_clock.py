@@ -0,0 +1,141 @@
+import numpy as np
+
+# Contadores de 64 bits sin signo en little-endian, igual que en el cable (wire.py)
+DTYPE = np.dtype('<u8')
+
+def as_counters(value):
+    """Arreglo de contadores a partir de una lista o de bytes little-endian
+    (los bytes se comparten, no se copian)"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return np.frombuffer(value, dtype=DTYPE)
+    return np.asarray(value, dtype=DTYPE)
+
+class VectorClock:
+    """Reloj vectorial respaldado por un arreglo de enteros de ancho fijo;
+    la fusión y las comparaciones se hacen sobre todo el arreglo a la vez"""
+    __slots__ = ('counters',)
+
+    def __init__(self, counters):
+        self.counters = counters  # np.ndarray de DTYPE
+
+    @classmethod
+    def zeros(cls, size):
+        return cls(np.zeros(size, dtype=DTYPE))
+
+    @classmethod
+    def from_list(cls, values):
+        return cls(np.array(values, dtype=DTYPE))
+
+    @classmethod
+    def from_bytes(cls, data, copy=True):
+        """Construye el reloj desde bytes little-endian; con copy=False el
+        arreglo comparte la memoria de data (solo lectura si data lo es)"""
+        counters = np.frombuffer(data, dtype=DTYPE)
+        return cls(counters.copy() if copy else counters)
+
+    @classmethod
+    def coerce(cls, value):
+        """Acepta un VectorClock, una lista o bytes little-endian"""
+        if isinstance(value, cls):
+            return value
+        return cls(as_counters(value))
+
+    def to_bytes(self):
+        """Vista de los contadores en little-endian, sin copiarlos"""
+        return memoryview(self.counters).cast('B')
+
+    def copy(self):
+        return VectorClock(self.counters.copy())
+
+    def tolist(self):
+        return self.counters.tolist()
+
+    def increment(self, process_id):
+        self.counters[process_id] += 1
+
+    def merge(self, other):
+        """Fusiona con otro reloj: máximo elemento a elemento"""
+        np.maximum(self.counters, VectorClock.coerce(other).counters, out=self.counters)
+
+    def entries(self, indices):
+        """Pares (índice, valor) intercalados de las posiciones indicadas, en
+        bytes little-endian listos para el campo 'vector' de un mensaje"""
+        pairs = np.empty(2 * len(indices), dtype=DTYPE)
+        pairs[0::2] = indices
+        pairs[1::2] = self.counters[indices]
+        return memoryview(pairs).cast('B')
+
+    def merge_entries(self, entries):
+        """Fusiona pares (índice, valor) intercalados (lista o bytes);
+        devuelve los índices que aumentaron"""
+        pairs = as_counters(entries)
+        indices, values = pairs[0::2].astype(np.intp), pairs[1::2]
+        changed = values > self.counters[indices]
+        indices = indices[changed]
+        self.counters[indices] = values[changed]
+        return indices
+
+    def happens_before(self, other):
+        """True si este reloj precede causalmente a other"""
+        other = VectorClock.coerce(other).counters
+        return not (self.counters > other).any() and bool((self.counters < other).any())
+
+    def concurrent(self, other):
+        """True si ninguno de los dos relojes precede al otro"""
+        other = VectorClock.coerce(other).counters
+        return bool((self.counters > other).any()) and bool((self.counters < other).any())
+
+    def __getitem__(self, index):
+        return int(self.counters[index])
+
+    def __len__(self):
+        return len(self.counters)
+
+    def __eq__(self, other):
+        if not isinstance(other, VectorClock):
+            return NotImplemented
+        return np.array_equal(self.counters, other.counters)
+
+    def __repr__(self):
+        return np.array2string(self.counters, separator=', ', threshold=20)
+
+
+class DeltaTracker:
+    """Envío diferencial del reloj vectorial (Singhal-Kshemkalyani): a cada
+    par solo se le envían las posiciones que cambiaron desde el último envío
+    hacia él. Supone canales FIFO sin pérdidas, como las conexiones TCP"""
+
+    def __init__(self, clock, process_id):
+        """- clock: VectorClock del proceso (se actualiza en el lugar)
+        - process_id: Posición propia en el vector"""
+        self.clock = clock
+        self.process_id = process_id
+        # last_update[j]: valor propio del reloj cuando cambió la posición j
+        self.last_update = np.zeros(len(clock), dtype=DTYPE)
+        self.last_sent = {}  # {par: valor propio del reloj en el último envío}
+
+    def tick(self):
+        """Evento local: incrementa la posición propia"""
+        self.clock.increment(self.process_id)
+        self.last_update[self.process_id] = self.clock[self.process_id]
+
+    def delta_for(self, peer):
+        """Pares (índice, valor) que peer todavía no conoce; registra el envío"""
+        own = self.clock[self.process_id]
+        indices = np.flatnonzero(self.last_update > self.last_sent.get(peer, 0))
+        self.last_sent[peer] = own
+        return self.clock.entries(indices)
+
+    def merge(self, received_vector):
+        """Evento de recepción con un vector completo"""
+        received = as_counters(received_vector)
+        self.tick()
+        changed = np.flatnonzero(received > self.clock.counters)
+        self.clock.merge(received)
+        self.last_update[changed] = self.clock[self.process_id]
+
+    def merge_delta(self, entries):
+        """Evento de recepción con pares (índice, valor) de delta_for"""
+        self.tick()
+        changed = self.clock.merge_entries(entries)
+        self.last_update[changed] = self.clock[self.process_id]
@@ -1,56 +1,81 @@
-import socket
-import time
-import random
-import json
-
-class VectorClockClient:
-    def __init__(self, server_port, process_id, total_processes):
-        """Inicializa el cliente con:
-        - server_port: Puerto del servidor
-        - process_id: Identificador único (1 para cliente)
-        - total_processes: Número total de procesos"""
-        self.server_port = server_port
-        self.process_id = process_id
-        self.total_processes = total_processes
-        self.vector_clock = [0] * total_processes  # Reloj vectorial inicializado en ceros
-        
-    def internal_event(self):
-        """Evento interno: Incrementa solo su propio contador"""
-        self.vector_clock[self.process_id] += 1
-        print(f"\n[Cliente {self.process_id}] Evento interno")
-        print(f"[Cliente {self.process_id}] Vector actualizado: {self.vector_clock}")
-
-    def send_message(self):
-        """Envía un mensaje al servidor:
-        1. Incrementa su contador
-        2. Serializa y envía su vector"""
-        self.vector_clock[self.process_id] += 1
-        print(f"\n[Cliente {self.process_id}] Preparando mensaje")
-        print(f"[Cliente {self.process_id}] Vector actual: {self.vector_clock}")
-        
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect(('localhost', self.server_port))
-            s.send(json.dumps(self.vector_clock).encode())  # Serializa el vector a JSON
-            print(f"[Cliente {self.process_id}] Mensaje enviado")
-            s.close()
-        except Exception as e:
-            print(f"[Cliente {self.process_id}] Error al conectar: {e}")
-
-    def simulate(self, num_events):
-        """Simula eventos aleatorios:
-        - num_events: Número total de eventos a generar"""
-        print(f"[Cliente {self.process_id}] Iniciando simulación...")
-        for _ in range(num_events):
-            time.sleep(random.randint(1, 3))  # Espera aleatoria entre eventos
-            action = random.choice(["interno", "enviar"])
-            if action == "interno":
-                self.internal_event()
-            else:
-                self.send_message()
-        print(f"[Cliente {self.process_id}] Simulación completada")
-
-
-    
-client = VectorClockClient(9099, 1, 2)
-client.simulate(5)  # Genera 5 eventos aleatorios
\ No newline at end of file
+import argparse
+import socket
+import time
+import random
+import wire
+from vector_clock import VectorClock, DeltaTracker
+from metrics import log
+from membership import add_arguments, from_args
+
+class VectorClockClient:
+    def __init__(self, server_port, process_id, total_processes, delta=False, server_host='localhost'):
+        """Inicializa el cliente con:
+        - server_port: Puerto del servidor
+        - process_id: Identificador único (1 para cliente)
+        - total_processes: Número total de procesos
+        - delta: Enviar solo las posiciones que cambiaron desde el último envío
+        - server_host: Host del servidor"""
+        self.server_host = server_host
+        self.server_port = server_port
+        self.process_id = process_id
+        self.total_processes = total_processes
+        self.vector_clock = VectorClock.zeros(total_processes)  # Reloj vectorial inicializado en ceros
+        self.tracker = DeltaTracker(self.vector_clock, process_id)
+        self.delta = delta
+        
+    def internal_event(self):
+        """Evento interno: Incrementa solo su propio contador"""
+        self.tracker.tick()
+        log(f"\n[Cliente {self.process_id}] Evento interno")
+        log(f"[Cliente {self.process_id}] Vector actualizado: {self.vector_clock}")
+
+    def send_message(self):
+        """Envía un mensaje al servidor:
+        1. Incrementa su contador
+        2. Serializa y envía su vector"""
+        self.tracker.tick()
+        log(f"\n[Cliente {self.process_id}] Preparando mensaje")
+        log(f"[Cliente {self.process_id}] Vector actual: {self.vector_clock}")
+        
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.connect((self.server_host, self.server_port))
+            if self.delta:
+                message = wire.new_message('vector_delta', self.process_id,
+                                           vector=self.tracker.delta_for(self.server_port))
+            else:
+                message = wire.new_message('vector', self.process_id, vector=self.vector_clock.to_bytes())
+            wire.send_message(s, message)  # Serializa el vector con su longitud
+            log(f"[Cliente {self.process_id}] Mensaje enviado")
+            s.close()
+        except Exception as e:
+            # El servidor pudo no recibir el delta: el próximo envío repite todo lo cambiado
+            self.tracker.last_sent.pop(self.server_port, None)
+            log(f"[Cliente {self.process_id}] Error al conectar: {e}")
+
+    def simulate(self, num_events):
+        """Simula eventos aleatorios:
+        - num_events: Número total de eventos a generar"""
+        log(f"[Cliente {self.process_id}] Iniciando simulación...")
+        for _ in range(num_events):
+            time.sleep(random.randint(1, 3))  # Espera aleatoria entre eventos
+            action = random.choice(["interno", "enviar"])
+            if action == "interno":
+                self.internal_event()
+            else:
+                self.send_message()
+        log(f"[Cliente {self.process_id}] Simulación completada")
+
+
+    
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cliente de reloj vectorial")
+    parser.add_argument('--id', type=int, default=1, help="Posición propia en el vector")
+    parser.add_argument('--server', type=int, default=0, help="ID del servidor en el clúster")
+    parser.add_argument('--delta', action='store_true')
+    add_arguments(parser, nodes=2, base_port=9099)
+    args = parser.parse_args()
+    membership = from_args(args)
+    host, port = membership.address(args.server)
+    client = VectorClockClient(port, args.id, len(membership), delta=args.delta, server_host=host)
+    client.simulate(5)  # Genera 5 eventos aleatorios
\ No newline at end of file
@@ -1,60 +1,129 @@
-import socket
-import threading
-import json
-
-class VectorClockServer:
-    def __init__(self, port, process_id, total_processes):
-        """Inicializa el servidor con:
-        - port: Puerto de escucha
-        - process_id: Identificador único del proceso (0 para servidor)
-        - total_processes: Número total de procesos en el sistema"""
-        self.port = port
-        self.process_id = process_id
-        self.total_processes = total_processes
-        self.vector_clock = [0] * total_processes  # Inicializa el reloj vectorial
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        
-    def update_vector_clock(self, received_vector):
-        """Actualiza el reloj vectorial al recibir un mensaje:
-        1. Incrementa su propio contador
-        2. Actualiza cada posición con el máximo entre su valor y el recibido"""
-        print(f"\n[Servidor {self.process_id}] Vector recibido: {received_vector}")
-        print(f"[Servidor {self.process_id}] Vector actual antes de actualizar: {self.vector_clock}")
-        
-        # Regla de actualización de relojes vectoriales
-        self.vector_clock[self.process_id] += 1  # Paso 1: Incremento local
-        for i in range(self.total_processes):
-            self.vector_clock[i] = max(self.vector_clock[i], received_vector[i])  # Paso 2: Actualización por máximos
-            
-        print(f"[Servidor {self.process_id}] Vector actualizado: {self.vector_clock}")
-
-    def handle_client(self, conn, addr):
-        """Maneja la conexión entrante:
-        1. Recibe el vector del cliente
-        2. Actualiza su reloj vectorial"""
-        data = conn.recv(1024).decode()
-        received_vector = json.loads(data)  # Deserializa el vector recibido
-        self.update_vector_clock(received_vector)
-        conn.close()
-
-    def start(self):
-        """Inicia el servidor en el puerto configurado"""
-        self.server_socket.bind(('localhost', self.port))
-        self.server_socket.listen()
-        print(f"[Servidor {self.process_id}] Escuchando en puerto {self.port}...")
-        
-        while True:
-            conn, addr = self.server_socket.accept()
-            # Maneja cada conexión en un hilo separado
-            threading.Thread(target=self.handle_client, args=(conn, addr)).start()
-
-    def internal_event(self):
-        """Simula un evento interno incrementando su propio contador"""
-        self.vector_clock[self.process_id] += 1
-        print(f"\n[Servidor {self.process_id}] Evento interno")
-        print(f"[Servidor {self.process_id}] Vector actualizado: {self.vector_clock}")
-
-
-    
-server = VectorClockServer(9099, 0, 2)
-server.start()
\ No newline at end of file
+import argparse
+import socket
+import threading
+import wire
+from vector_clock import VectorClock, as_counters
+from clock_store import StripedVectorClock
+from event_log import EventLog, INTERNAL, RECEIVE
+import metrics
+from metrics import REGISTRY, log
+from membership import add_arguments, from_args, format_address
+
+class VectorClockServer:
+    def __init__(self, port, process_id, total_processes, host='localhost', event_log=None):
+        """Inicializa el servidor con:
+        - port: Puerto de escucha
+        - process_id: Identificador único del proceso (0 para servidor)
+        - total_processes: Número total de procesos en el sistema
+        - host: Dirección de escucha
+        - event_log: EventLog donde registrar cada evento con su vector (opcional)"""
+        self.host = host
+        self.port = port
+        self.process_id = process_id
+        self.total_processes = total_processes
+        # Reloj vectorial compartido por los hilos de las conexiones (un lock por franja)
+        self.clock_store = StripedVectorClock(total_processes, process_id)
+        self.vector_clock = self.clock_store.clock  # Inicializa el reloj vectorial
+        # Con registro, cada evento se aplica y se copia al registro bajo un
+        # mismo lock: la marca registrada es exactamente la del evento y los
+        # eventos quedan en el orden de su contador propio
+        self.event_log = event_log
+        self.event_lock = threading.Lock()
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        
+    def update_vector_clock(self, received_vector, delta=False, sender=None):
+        """Actualiza el reloj vectorial al recibir un mensaje:
+        1. Incrementa su propio contador
+        2. Actualiza cada posición con el máximo entre su valor y el recibido
+        (received_vector puede ser un VectorClock, una lista o bytes little-endian;
+        con delta son pares (índice, valor) con solo las posiciones que cambiaron)"""
+        if not delta:
+            received_vector = VectorClock.coerce(received_vector)
+        if metrics.LOG_ENABLED:  # Copiar el vector para imprimirlo cuesta tanto como fusionarlo
+            if delta:
+                log(f"\n[Servidor {self.process_id}] Delta recibido: {len(as_counters(received_vector)) // 2} posiciones")
+            else:
+                log(f"\n[Servidor {self.process_id}] Vector recibido: {received_vector}")
+            log(f"[Servidor {self.process_id}] Vector actual antes de actualizar: {self.clock_store.snapshot()}")
+        
+        # Regla de actualización de relojes vectoriales (vectorizada); el
+        # incremento local se hace junto con la fusión, de forma atómica por franja
+        if self.event_log is None:
+            self.merge(received_vector, delta)
+        else:
+            with self.event_lock:
+                self.merge(received_vector, delta)
+                self.event_log.append(RECEIVE, self.vector_clock.counters, sender)
+        REGISTRY.counter('vector_merges', delta=delta).inc()
+        REGISTRY.gauge('vector_clock_own', process=self.process_id).set(self.vector_clock[self.process_id])
+            
+        if metrics.LOG_ENABLED:
+            log(f"[Servidor {self.process_id}] Vector actualizado: {self.clock_store.snapshot()}")
+
+    def merge(self, received_vector, delta):
+        if delta:
+            self.clock_store.merge_delta(received_vector)
+        else:
+            self.clock_store.merge(received_vector.counters)
+
+    def handle_message(self, message):
+        """Fusiona un mensaje 'vector' (completo) o 'vector_delta' (diferencial)"""
+        self.update_vector_clock(message['vector'], delta=message['type'] == 'vector_delta',
+                                 sender=message['sender_id'])
+
+    def handle_client(self, conn, addr):
+        """Maneja la conexión entrante:
+        1. Recibe cada vector del cliente (puede enviar varios por conexión)
+        2. Actualiza su reloj vectorial"""
+        with conn, conn.makefile('rb') as stream:
+            try:
+                for message in wire.read_messages(stream, raw_vector=True):  # El vector llega sin copiarse
+                    self.handle_message(message)
+            except ValueError as e:
+                log(f"[Servidor {self.process_id}] Mensaje inválido de {addr}: {e}")
+        if self.event_log is not None:
+            self.event_log.commit()  # Fin de la conexión: confirmar su último lote
+
+    def start(self):
+        """Inicia el servidor en el puerto configurado"""
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen()
+        log(f"[Servidor {self.process_id}] Escuchando en puerto {self.port}...")
+        
+        while True:
+            conn, addr = self.server_socket.accept()
+            # Maneja cada conexión en un hilo separado
+            threading.Thread(target=self.handle_client, args=(conn, addr)).start()
+
+    def internal_event(self):
+        """Simula un evento interno incrementando su propio contador"""
+        if self.event_log is None:
+            self.clock_store.tick()
+        else:
+            with self.event_lock:
+                self.clock_store.tick()
+                self.event_log.append(INTERNAL, self.vector_clock.counters)
+        if metrics.LOG_ENABLED:
+            log(f"\n[Servidor {self.process_id}] Evento interno")
+            log(f"[Servidor {self.process_id}] Vector actualizado: {self.clock_store.snapshot()}")
+
+
+    
+if __name__ == '__main__':
+    metrics.configure_from_env()
+    parser = argparse.ArgumentParser(description="Servidor de reloj vectorial")
+    parser.add_argument('--id', type=int, default=0, help="Posición propia en el vector")
+    parser.add_argument('--event-log', metavar='DIR',
+                        help="Registrar cada evento con su vector en DIR (consultas: python event_log.py DIR)")
+    add_arguments(parser, nodes=2, base_port=9099)  # Por defecto: servidor 0 en 9099 y cliente 1
+    args = parser.parse_args()
+    membership = from_args(args)  # El tamaño del vector es el número de miembros
+    host, port = membership.address(args.id)
+    log(f"[Servidor {args.id}] {format_address((host, port))} ({len(membership)} procesos)")
+    event_log = EventLog(args.event_log, args.id, len(membership)) if args.event_log else None
+    server = VectorClockServer(port, args.id, len(membership), host, event_log)
+    try:
+        server.start()
+    finally:
+        if event_log is not None:
+            event_log.close()
\ No newline at end of file
@@ -0,0 +1,167 @@
+import os
+import asyncio
+import sys
+import json
+import struct
+from array import array
+
+# Tipos de mensaje conocidos; el código binario es la posición en la lista
+# (solo se agregan al final para no cambiar los códigos existentes)
+MESSAGE_TYPES = [
+    'election', 'answer', 'victory', 'ping',  # Algoritmo del abusón
+    'request', 'ok', 'release',  # Ricart-Agrawala
+    'clock',  # Reloj de Lamport
+    'vector',  # Reloj vectorial
+    'token',  # Suzuki-Kasami
+    'heartbeat',  # Detector de fallas
+    'vector_delta',  # Reloj vectorial diferencial: pares (índice, valor) en 'vector'
+    'clock_batch',  # Lote de eventos de Lamport: un reloj por evento en 'vector'
+    'causal',  # Difusión causal: secuencia en 'clock', entregas vistas en 'vector'
+    'join', 'leave',  # Altas y bajas del clúster: 'join' lleva 'host:puerto' en 'data'
+    'inquire', 'relinquish', 'failed',  # Quórums de Maekawa
+    'lock_batch',  # Gestor de recursos con nombre: solicitudes y OKs en JSON en 'data'
+]
+TYPE_CODES = {name: code for code, name in enumerate(MESSAGE_TYPES)}
+
+FRAME_HEADER = struct.Struct('!I')  # Longitud del mensaje
+MAX_FRAME = 64 * 1024 * 1024
+
+# Cabecera binaria: tipo, emisor, reloj de Lamport, longitud del vector, longitud de data
+BINARY_HEADER = struct.Struct('<BiQII')
+
+DEFAULT_CODEC = os.environ.get('PROYECTO2_CODEC', 'binary')
+
+def new_message(msg_type, sender_id, clock=0, vector=(), data=''):
+    """Construye un mensaje con los campos del protocolo"""
+    return {
+        'type': msg_type,
+        'sender_id': sender_id,
+        'clock': clock,
+        # Un memoryview (VectorClock.to_bytes) viaja tal cual, sin pasar por una lista
+        'vector': vector if isinstance(vector, memoryview) else list(vector),
+        'data': data
+    }
+
+def vector_from_bytes(data):
+    """Convierte un vector en bytes little-endian en un array('Q')"""
+    vector = array('Q')
+    vector.frombytes(data)
+    if sys.byteorder == 'big':
+        vector.byteswap()
+    return vector
+
+def vector_to_bytes(vector):
+    """Bytes little-endian de un vector (lista o memoryview ya en little-endian)"""
+    if isinstance(vector, memoryview):
+        return vector
+    vector = array('Q', vector)
+    if sys.byteorder == 'big':
+        vector.byteswap()  # En el cable el vector va en little-endian
+    return vector.tobytes()
+
+def local_copy(message):
+    """Copia de un mensaje para entregarlo en memoria: el vector pasa por su
+    forma en el cable y llega como lista de enteros, igual que por el socket,
+    sea una lista, un memoryview o un arreglo de NumPy"""
+    return dict(message, vector=vector_from_bytes(vector_to_bytes(message.get('vector', ()))).tolist())
+
+def encode_binary(message):
+    """Codificación compacta para los campos fijos del protocolo"""
+    vector = vector_to_bytes(message.get('vector', ()))
+    data = message.get('data', '').encode()
+    header = BINARY_HEADER.pack(TYPE_CODES[message['type']], message['sender_id'],
+                                message.get('clock', 0), len(vector) // 8, len(data))
+    return header + vector + data
+
+def decode_binary(payload, raw_vector=False):
+    """Inverso de encode_binary; con raw_vector el vector queda como un
+    memoryview little-endian sobre payload en lugar de una lista"""
+    code, sender_id, clock, size, data_size = BINARY_HEADER.unpack_from(payload)
+    start = BINARY_HEADER.size
+    vector = memoryview(payload)[start:start + 8 * size]
+    if len(vector) < 8 * size:
+        raise IndexError("vector incompleto")
+    start += 8 * size
+    return {
+        'type': MESSAGE_TYPES[code],
+        'sender_id': sender_id,
+        'clock': clock,
+        'vector': vector if raw_vector else vector_from_bytes(vector).tolist(),
+        'data': payload[start:start + data_size].decode()
+    }
+
+def encode_json(message):
+    """Codificación legible para depuración (PROYECTO2_CODEC=json)"""
+    vector = message.get('vector', ())
+    if isinstance(vector, memoryview):
+        message = dict(message, vector=vector_from_bytes(vector).tolist())
+    return json.dumps(message).encode()
+
+def decode_json(payload, raw_vector=False):
+    message = json.loads(payload)
+    message.setdefault('clock', 0)
+    message.setdefault('vector', [])
+    message.setdefault('data', '')
+    if raw_vector:
+        message['vector'] = memoryview(vector_to_bytes(message['vector']))
+    return message
+
+ENCODERS = {'binary': encode_binary, 'json': encode_json}
+
+def encode(message, codec=None):
+    """Serializa un mensaje con el códec indicado (por defecto DEFAULT_CODEC)"""
+    return ENCODERS[codec or DEFAULT_CODEC](message)
+
+def decode(payload, raw_vector=False):
+    """Deserializa un mensaje detectando el códec por su primer byte;
+    lanza ValueError si el mensaje está mal formado"""
+    if payload[:1] == b'{':
+        return decode_json(payload, raw_vector)
+    try:
+        return decode_binary(payload, raw_vector)
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"Mensaje binario inválido: {e}")
+
+def frame(payload):
+    """Antepone la longitud al mensaje serializado"""
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+def encode_frame(message, codec=None):
+    return frame(encode(message, codec))
+
+def read_frame(stream):
+    """Lee un mensaje completo de un archivo binario (socket.makefile('rb'));
+    devuelve None cuando la conexión se cierra"""
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > MAX_FRAME:
+        raise ValueError(f"Mensaje demasiado grande: {size} bytes")
+    payload = stream.read(size)
+    if len(payload) < size:
+        return None
+    return payload
+
+async def read_frame_async(reader):
+    """Versión asyncio de read_frame para un asyncio.StreamReader"""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        (size,) = FRAME_HEADER.unpack(header)
+        if size > MAX_FRAME:
+            raise ValueError(f"Mensaje demasiado grande: {size} bytes")
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError:
+        return None
+
+def read_messages(stream, raw_vector=False):
+    """Itera sobre los mensajes de una conexión hasta que se cierre"""
+    while True:
+        payload = read_frame(stream)
+        if payload is None:
+            return
+        yield decode(payload, raw_vector)
+
+def send_message(sock, message, codec=None):
+    """Envía un solo mensaje con su longitud por un socket conectado"""
+    sock.sendall(encode_frame(message, codec))